@@ -0,0 +1,87 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from mcp_server_mql5.core.compact import estimate_tokens, render_blocks
+from mcp_server_mql5.core.scraper import MQL5Scraper
+
+"""
+Output compaction benchmark.
+
+Renders each documentation page of the fixture corpus as the server returns it,
+without compaction, compacted, and compacted with Markdown tables and code, and
+reports the estimated tokens of each and the tokens saved per page.
+"""
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "docs"
+
+
+def measure_page(html: str, max_chars: int) -> dict[str, float]:
+    """
+    Estimated output tokens of one page, by rendering mode.
+
+    Returns:
+        The tokens of the `raw`, `compact` and `markdown` renderings, and the
+        time to compact the page (ms).
+    """
+    blocks = MQL5Scraper().parse_page(html).blocks(max_chars)
+    start = time.perf_counter()
+    markdown = render_blocks(blocks, markdown=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "raw": estimate_tokens(render_blocks(blocks, compact=False)),
+        "compact": estimate_tokens(render_blocks(blocks)),
+        "markdown": estimate_tokens(markdown),
+        "compact_ms": elapsed * 1000,
+    }
+
+
+def run(max_chars: int) -> dict[str, dict[str, float]]:
+    """Measures every fixture page; keyed by file name."""
+    return {
+        path.name: measure_page(path.read_text(encoding="utf-8"), max_chars)
+        for path in sorted(FIXTURES.glob("*.html"))
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Output compaction benchmark")
+    parser.add_argument("--max-chars", type=int, default=sys.maxsize)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("OUTPUT COMPACTION BENCHMARK (estimated tokens)")
+    print("=" * 60)
+
+    results = run(args.max_chars)
+    print(
+        f"\n  {'page':<34} {'raw':>6} {'compact':>8} {'markdown':>9} "
+        f"{'saved':>7} {'ms':>6}"
+    )
+    for name, r in results.items():
+        saved = 1 - r["markdown"] / r["raw"]
+        print(
+            f"  {name:<34} {r['raw']:>6.0f} {r['compact']:>8.0f} "
+            f"{r['markdown']:>9.0f} {saved:>7.1%} {r['compact_ms']:>6.2f}"
+        )
+
+    totals = {
+        mode: sum(r[mode] for r in results.values())
+        for mode in ("raw", "compact", "markdown")
+    }
+    print(
+        f"\n  Total: {totals['raw']:.0f} raw, {totals['compact']:.0f} compact "
+        f"({1 - totals['compact'] / totals['raw']:.1%} saved), "
+        f"{totals['markdown']:.0f} Markdown "
+        f"({1 - totals['markdown'] / totals['raw']:.1%} saved)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
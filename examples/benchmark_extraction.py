@@ -0,0 +1,102 @@
+import functools
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from mcp_server_mql5.core.scraper import EXTRACTION_BACKENDS, MQL5Scraper
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "docs"
+BUDGETS = [500, 4000, 20000, 1_000_000]
+
+
+def load_corpus() -> dict[str, str]:
+    """Fixture pages plus a large synthetic reference page built from them."""
+    corpus = {f.name: f.read_text(encoding="utf-8") for f in sorted(FIXTURES.glob("*"))}
+
+    # Real reference pages carry a long menu before the content and many
+    # sections inside it: concatenate every fixture's content 10 times.
+    bodies = [
+        re.search(r'<div class="doc-content">(.*?)</div>\s*</div>', html, re.S)
+        for html in corpus.values()
+    ]
+    content = "".join(m.group(1) for m in bodies if m) * 10
+    menu = "".join(
+        f'<li><a href="/en/docs/p{i}">Page {i}</a></li>' for i in range(2000)
+    )
+    corpus["large_reference_page"] = (
+        f"<html><body><nav><ul>{menu}</ul></nav>"
+        f'<div class="doc-content">{content}</div><footer>footer</footer></body></html>'
+    )
+    return corpus
+
+
+def timed(func: Callable[[], object], rounds: int) -> float:
+    """Best-of-three average time per call, in milliseconds."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        best = min(best, (time.perf_counter() - start) / rounds)
+    return best * 1000
+
+
+def benchmark_extraction() -> None:
+    """Checks that all backends agree, then compares their speed"""
+
+    print("=" * 60)
+    print("EXTRACTION BACKEND BENCHMARK")
+    print("=" * 60)
+
+    corpus = load_corpus()
+    scrapers = {name: MQL5Scraper(backend=name) for name in EXTRACTION_BACKENDS}
+    reference = scrapers["bs4"]
+
+    # Test 1: Identical output
+    print("\n[TEST 1] Output equivalence")
+    print("-" * 60)
+
+    mismatches = 0
+    for name, html in corpus.items():
+        for budget in BUDGETS:
+            expected = reference.extract_content(html, max_chars=budget)
+            for backend, scraper in scrapers.items():
+                if scraper.extract_content(html, max_chars=budget) != expected:
+                    mismatches += 1
+                    print(f"  ❌ {backend} differs on {name} (max_chars={budget})")
+    checks = len(corpus) * len(BUDGETS) * len(scrapers)
+    print(f"  {checks - mismatches}/{checks} identical")
+
+    # Test 2: Speed
+    print("\n[TEST 2] Time per page (ms)")
+    print("-" * 60)
+
+    for budget in BUDGETS:
+        print(f"\n  max_chars={budget}")
+        for name, html in corpus.items():
+            rounds = 3 if len(html) > 100_000 else 30
+            times = {
+                backend: timed(
+                    functools.partial(scraper.extract_content, html, budget), rounds
+                )
+                for backend, scraper in scrapers.items()
+            }
+            speedup = times["bs4"] / times["stream"]
+            print(
+                f"  {name:<32} {len(html) // 1024:>5} KB  "
+                + "  ".join(f"{b}={t:7.2f}" for b, t in times.items())
+                + f"  x{speedup:.1f}"
+            )
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    benchmark_extraction()
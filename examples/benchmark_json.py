@@ -0,0 +1,91 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from examples.benchmark_ranking import make_response
+from mcp_server_mql5.core.search import json_decoder
+
+"""
+Search API JSON decoding benchmark.
+
+Decodes the recorded search API responses and synthetic responses of increasing
+size with each JSON backend, and reports the time per response. The standard
+library is measured on the text, as the server decoded it before, and on the
+raw bytes; orjson on the raw bytes, as the server decodes it now.
+"""
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures" / "search_api"
+SIZES = (10, 100, 1000, 10000)
+
+
+def load_responses() -> list[bytes]:
+    """The recorded search API responses, as raw bytes."""
+    return [
+        json.dumps(json.loads(path.read_text(encoding="utf-8"))["response"]).encode()
+        for path in sorted(FIXTURES.glob("*.json"))
+    ]
+
+
+def measure(payloads: list[bytes], rounds: int) -> dict[str, float]:
+    """
+    Decodes each payload `rounds` times with each available backend.
+
+    Returns:
+        The mean time per response (µs) of `json (text)` (UTF-8 decoding then
+        `json.loads`), `json` (`json.loads` on the bytes) and, if installed,
+        `orjson`.
+    """
+    decoders = {
+        "json (text)": lambda raw: json.loads(raw.decode("utf-8")),
+        "json": json_decoder("json"),
+    }
+    try:
+        decoders["orjson"] = json_decoder("orjson")
+    except ImportError:
+        pass
+
+    results = {}
+    for name, decode in decoders.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for raw in payloads:
+                decode(raw)
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed * 1e6 / (rounds * len(payloads))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Search API JSON decoding benchmark")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("SEARCH API JSON DECODING BENCHMARK (µs per response)")
+    print("=" * 60)
+
+    rng = random.Random(0)
+    cases = [("recorded", load_responses())] + [
+        (f"{size} results", [make_response("OrderSend", size, rng).encode()])
+        for size in SIZES
+    ]
+    for label, payloads in cases:
+        size = sum(map(len, payloads)) // len(payloads)
+        results = measure(payloads, args.rounds)
+        baseline = results["json (text)"]
+        timings = ", ".join(
+            f"{name} {us:.1f} ({baseline / us:.1f}x)" for name, us in results.items()
+        )
+        print(f"\n  {label} ({size:,} bytes): {timings}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Any
+
+from mcp_server_mql5.core.search import MQL5Searcher
+
+"""
+Search result ranking benchmark.
+
+Builds synthetic search API responses of increasing size, in which the page
+named exactly like the searched function sits among prefix matches (`OrderSend`
+among `OrderSendAsync`, `OrderSendEx`...), forum threads and articles, in random
+order. Reports the time to rank each response and how often the exact page
+comes first, for the former first-title-match rule and for `MQL5Searcher`.
+"""
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+SIZES = (10, 100, 1000, 10000)
+MODULES = ("docs", "docs", "forum", "articles", "code")
+
+
+def make_response(term: str, size: int, rng: random.Random) -> str:
+    """A search API response with one exact page among `size` results."""
+    results: list[dict[str, Any]] = []
+    for i in range(size - 1):
+        module = MODULES[i % len(MODULES)]
+        name = f"{term}{rng.choice(('Async', 'Ex', 'Check', ''))}"
+        results.append(
+            {
+                "module": f"mql5.com.en.{module}",
+                "info": {
+                    "url": f"https://www.mql5.com/en/{module}/{i}/{name.lower()}{i}",
+                    "title": f"{name} in a {module} page - MQL5",
+                },
+            }
+        )
+    exact = {
+        "module": "mql5.com.en.docs",
+        "info": {
+            "url": f"https://www.mql5.com/en/docs/trading/{term.lower()}",
+            "title": f"{term} - Trade Functions - MQL5 Reference",
+        },
+    }
+    results.insert(rng.randrange(size), exact)
+    return json.dumps({"results": results})
+
+
+def legacy_best_match(json_response: str, search_term: str) -> str | None:
+    """The former rule: first title containing the term, docs first."""
+    results = json.loads(json_response).get("results", [])
+    docs = [r for r in results if r.get("module") == "mql5.com.en.docs"]
+    ordered = docs + [r for r in results if r.get("module") != "mql5.com.en.docs"]
+    term = search_term.lower()
+    for result in ordered:
+        if term in result.get("info", {}).get("title", "").lower():
+            url: str | None = result["info"].get("url")
+            return url
+    return ordered[0].get("info", {}).get("url") if ordered else None
+
+
+def measure(size: int, responses: int, seed: int = 0) -> dict[str, float]:
+    """
+    Ranks `responses` synthetic responses of `size` results with each rule.
+
+    Returns:
+        The mean time per response (ms) and the share of responses whose exact
+        page comes first, for the `legacy` and `ranked` rules.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for _ in range(responses):
+        term = rng.choice(("OrderSend", "PositionOpen", "SymbolInfo"))
+        cases.append((make_response(term, size, rng), term))
+
+    stats: dict[str, float] = {}
+    for name, rule in (
+        ("legacy", legacy_best_match),
+        ("ranked", MQL5Searcher.find_best_match_api),
+    ):
+        hits = 0
+        start = time.perf_counter()
+        for response, term in cases:
+            url = rule(response, term)
+            hits += url is not None and url.endswith(f"/trading/{term.lower()}")
+        stats[f"{name}_ms"] = (time.perf_counter() - start) * 1000 / len(cases)
+        stats[f"{name}_hits"] = hits / len(cases)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Search result ranking benchmark")
+    parser.add_argument("--responses", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("SEARCH RESULT RANKING BENCHMARK")
+    print("=" * 60)
+    print(f"\n  {'results':>8} {'legacy':>9} {'hits':>6} {'ranked':>9} {'hits':>6}")
+    for size in SIZES:
+        r = measure(size, args.responses)
+        print(
+            f"  {size:>8} {r['legacy_ms']:>7.3f}ms {r['legacy_hits']:>6.0%} "
+            f"{r['ranked_ms']:>7.3f}ms {r['ranked_hits']:>6.0%}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
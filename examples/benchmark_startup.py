@@ -0,0 +1,136 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+"""
+Cold start benchmark of the server entry point.
+
+Imports `mcp_server_mql5.server` in fresh interpreters, as an MCP client does
+when it spawns the server, and reports the wall time and the `-X importtime`
+breakdown. Fails if the import exceeds the time budget or loads a dependency
+that must stay off the startup path.
+"""
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+ENTRY_MODULE = "mcp_server_mql5.server"
+# Imported on first use only (HTTP client, HTML parsing)
+DEFERRED_MODULES = ("aiohttp", "bs4")
+# Cumulative `-X importtime` of the entry module, MCP SDK included
+DEFAULT_BUDGET_MS = 1500.0
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _run(*args: str) -> subprocess.CompletedProcess[str]:
+    # Project root first, so the working tree is measured
+    root = str(Path(__file__).parent.parent)
+    env = dict(os.environ, PYTHONPATH=root)
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def import_breakdown() -> dict[str, tuple[float, float]]:
+    """
+    Returns the `-X importtime` self and cumulative times (ms) of each module.
+    """
+    stderr = _run("-X", "importtime", "-c", f"import {ENTRY_MODULE}").stderr
+    times = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            times[name] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def loaded_deferred_modules() -> list[str]:
+    """Returns the deferred modules that are imported at startup anyway."""
+    code = (
+        f"import sys, {ENTRY_MODULE}; "
+        f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    return _run("-c", code).stdout.split()
+
+
+def measure_startup(rounds: int = 5) -> dict[str, float]:
+    """
+    Times the import of the entry module in `rounds` fresh interpreters.
+
+    Returns:
+        Wall-clock mean, median and max in ms (interpreter start included), the
+        cumulative import time of the entry module and the self time of the
+        project's own modules.
+    """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        _run("-c", f"import {ENTRY_MODULE}")
+        samples.append(time.perf_counter() - start)
+
+    breakdown = import_breakdown()
+    ordered = sorted(samples)
+    return {
+        "ops": rounds,
+        "ops_per_s": rounds / sum(samples),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[-1] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "import_ms": breakdown[ENTRY_MODULE][1],
+        "own_modules_ms": sum(
+            self_ms
+            for name, (self_ms, _) in breakdown.items()
+            if name.startswith("mcp_server_mql5")
+        ),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("COLD START BENCHMARK")
+    print("=" * 60)
+
+    result = measure_startup(args.rounds)
+    breakdown = import_breakdown()
+    print(f"\n  Process start + import: {result['p50_ms']:.0f} ms (median)")
+    print(f"  Import of {ENTRY_MODULE}: {result['import_ms']:.0f} ms")
+    print(f"  Own modules (self time): {result['own_modules_ms']:.0f} ms")
+
+    print(f"\n  Slowest imports (cumulative, top {args.top}):")
+    slowest = sorted(breakdown.items(), key=lambda item: -item[1][1])
+    for name, (_, cumulative_ms) in slowest[1 : args.top + 1]:
+        print(f"  {cumulative_ms:>8.1f} ms  {name}")
+
+    failed = False
+    loaded = loaded_deferred_modules()
+    if loaded:
+        print(f"\n  ❌ Imported at startup: {', '.join(loaded)}")
+        failed = True
+    if result["import_ms"] > args.budget_ms:
+        print(
+            f"\n  ❌ Import took {result['import_ms']:.0f} ms, "
+            f"budget {args.budget_ms:.0f} ms"
+        )
+        failed = True
+    if not failed:
+        print(f"\n  ✅ Within the {args.budget_ms:.0f} ms budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
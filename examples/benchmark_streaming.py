@@ -0,0 +1,111 @@
+import asyncio
+import sys
+import time
+
+from aiohttp import web
+
+from examples.benchmark_extraction import load_corpus
+from mcp_server_mql5.core.scraper import MQL5Scraper, PageReader
+from mcp_server_mql5.core.web_client import WebClient
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+BUDGETS = [500, 1000, 2000, 4000, 20000]
+# Simulated link: 16 KB every 10 ms (~1.6 MB/s)
+SEND_CHUNK = 16 * 1024
+SEND_DELAY = 0.01
+
+
+async def start_server(corpus: dict[str, str]) -> tuple[web.AppRunner, str]:
+    """Serves the corpus over a throttled local connection."""
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        body = corpus[request.match_info["name"]].encode("utf-8")
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/html; charset=utf-8"}
+        )
+        response.content_length = len(body)
+        await response.prepare(request)
+        try:
+            for start in range(0, len(body), SEND_CHUNK):
+                await response.write(body[start : start + SEND_CHUNK])
+                await asyncio.sleep(SEND_DELAY)
+        except (ConnectionResetError, RuntimeError):
+            pass  # The client stopped reading
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}/"
+
+
+async def full_fetch(client: WebClient, url: str, budget: int) -> tuple[str, int]:
+    html = await client.get(url) or ""
+    page = MQL5Scraper().parse_page(html, url)
+    return page.render(budget), len(html.encode("utf-8"))
+
+
+async def streamed_fetch(client: WebClient, url: str, budget: int) -> tuple[str, int]:
+    reader = PageReader(url, budget)
+
+    async def feed(text: str) -> bool:
+        return reader.feed(text)
+
+    read = await client.get_partial(url, feed) or 0
+    page = reader.page()
+    assert page is not None
+    return page.render(budget), read
+
+
+async def benchmark_streaming() -> None:
+    """Compares full and streamed page fetches by bytes read and latency"""
+
+    print("=" * 60)
+    print("STREAMING FETCH BENCHMARK")
+    print("=" * 60)
+
+    corpus = load_corpus()
+    runner, base_url = await start_server(corpus)
+    client = WebClient()
+    mismatches = 0
+    try:
+        for name, html in corpus.items():
+            size = len(html.encode("utf-8"))
+            print(f"\n  {name} ({size // 1024} KB)")
+            print(
+                f"  {'max_chars':>9}  {'full KB':>8} {'full ms':>8}  "
+                f"{'stream KB':>9} {'stream ms':>9}  {'saved':>6}"
+            )
+            for budget in BUDGETS:
+                start = time.perf_counter()
+                full_text, full_read = await full_fetch(client, base_url + name, budget)
+                full_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                text, read = await streamed_fetch(client, base_url + name, budget)
+                stream_ms = (time.perf_counter() - start) * 1000
+
+                if text != full_text:
+                    mismatches += 1
+                    print(f"  ❌ output differs (max_chars={budget})")
+                print(
+                    f"  {budget:>9}  {full_read / 1024:>8.1f} {full_ms:>8.1f}  "
+                    f"{read / 1024:>9.1f} {stream_ms:>9.1f}  "
+                    f"{1 - read / full_read:>6.0%}"
+                )
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_streaming())
@@ -0,0 +1,359 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import web
+
+from examples.benchmark_startup import measure_startup
+from mcp_server_mql5 import server
+from mcp_server_mql5.core.compact import render_blocks
+from mcp_server_mql5.core.scraper import MQL5Scraper
+from mcp_server_mql5.core.search import MQL5Searcher
+from mcp_server_mql5.core.utils import RateLimiter
+
+"""
+Offline benchmark suite.
+
+Replays a recorded corpus (search API responses and documentation pages in
+tests/fixtures) through a local stand-in for mql5.com, so results do not depend
+on the network or the rate limiter. Searches go through the server's own HTTP
+client, pointed at the stand-in by its configuration. Measures scraper parsing,
+searcher ranking, output compaction, cached and uncached searches, concurrent
+tool calls and the server cold start.
+Results can be saved as a baseline and later runs compared against it:
+
+    python -m examples.benchmark_suite --save .benchmarks/baseline.json
+    python -m examples.benchmark_suite --compare .benchmarks/baseline.json
+"""
+
+# Force UTF-8 for Windows console
+if sys.platform == "win32" and hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+LIVE_ORIGIN = "https://www.mql5.com"
+# Concurrent tool calls per round of the end-to-end benchmark
+CONCURRENCY = 32
+# A slower median than the baseline by more than this ratio is a regression
+DEFAULT_THRESHOLD = 0.25
+# Stand-in responses skip the disk cache, so cache misses reach the stand-in
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+@dataclass
+class Recording:
+    """A recorded search: the API response and the page it leads to."""
+
+    keyword: str
+    response: str
+    path: str
+    html: str
+
+
+def load_recordings() -> list[Recording]:
+    """Pairs each recorded search API response with its documentation page."""
+    recordings = []
+    for api_file in sorted((FIXTURES / "search_api").glob("*.json")):
+        data = json.loads(api_file.read_text(encoding="utf-8"))
+        url = MQL5Searcher.find_best_match_api(
+            json.dumps(data["response"]), data["keyword"]
+        )
+        assert url is not None, f"No page for {api_file.name}"
+        recordings.append(
+            Recording(
+                keyword=data["keyword"],
+                response=json.dumps(data["response"]),
+                path=url.removeprefix(LIVE_ORIGIN),
+                html=(FIXTURES / "docs" / f"{api_file.stem}.html").read_text(
+                    encoding="utf-8"
+                ),
+            )
+        )
+    return recordings
+
+
+async def start_stand_in(recordings: list[Recording]) -> tuple[web.AppRunner, str]:
+    """Serves the recordings; result URLs are rewritten to point back here."""
+    responses = {server.term_key(r.keyword): r.response for r in recordings}
+    pages = {r.path: r.html for r in recordings}
+    origin = ""
+
+    async def search(request: web.Request) -> web.Response:
+        response = responses.get(server.term_key(request.query.get("keyword", "")))
+        if response is None:
+            return web.json_response({"total": 0, "results": []})
+        return web.Response(
+            text=response.replace(LIVE_ORIGIN, origin),
+            content_type="application/json",
+            headers=NO_STORE,
+        )
+
+    async def page(request: web.Request) -> web.Response:
+        html = pages.get(request.path)
+        if html is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=html, content_type="text/html", headers=NO_STORE)
+
+    app = web.Application()
+    app.router.add_get("/api/search", search)
+    app.router.add_get("/en/docs/{path:.*}", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    origin = f"http://127.0.0.1:{runner.addresses[0][1]}"
+    return runner, origin
+
+
+def summarize(samples: list[float], elapsed: float) -> dict[str, float]:
+    """Latency percentiles (ms) of the samples and throughput (ops/s)."""
+    ordered = sorted(samples)
+    return {
+        "ops": len(ordered),
+        "ops_per_s": len(ordered) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func: Callable[[], object], rounds: int) -> dict[str, float]:
+    """Times `rounds` sequential calls of a function."""
+    func()  # Warm-up
+    samples = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        call_start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - call_start)
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def measure_async(
+    func: Callable[[], Awaitable[object]],
+    rounds: int,
+    before: Callable[[], None] | None = None,
+    concurrency: int = 1,
+) -> dict[str, float]:
+    """Times `rounds` batches of `concurrency` concurrent calls."""
+    samples: list[float] = []
+
+    async def timed() -> None:
+        call_start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - call_start)
+
+    await func()  # Warm-up
+    elapsed = 0.0
+    for _ in range(rounds):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        await asyncio.gather(*(timed() for _ in range(concurrency)))
+        elapsed += time.perf_counter() - start
+    return summarize(samples, elapsed)
+
+
+def clear_caches() -> None:
+    server.term_cache.clear()
+    server.page_cache.clear()
+
+
+async def close_client() -> None:
+    """Closes the server's HTTP client, if built; the next use builds a new one."""
+    if server._lazy_client.created:
+        await server.client.close()
+        server._lazy_client._discard()
+
+
+async def run_suite(
+    rounds: int = 200, startup_rounds: int = 5
+) -> dict[str, dict[str, float]]:
+    """
+    Runs every benchmark against the recorded corpus, and the cold start.
+
+    Args:
+        rounds: Base number of timed calls per benchmark.
+        startup_rounds: Number of fresh interpreters importing the server.
+
+    Returns:
+        The results keyed by benchmark name.
+    """
+    recordings = load_recordings()
+    scraper = MQL5Scraper()
+    results: dict[str, dict[str, float]] = {
+        "startup.import_server": measure_startup(startup_rounds)
+    }
+    pages = iter(range(sys.maxsize))
+    responses = iter(range(sys.maxsize))
+
+    def parse() -> None:
+        r = recordings[next(pages) % len(recordings)]
+        scraper.parse_page(r.html, LIVE_ORIGIN + r.path)
+
+    # The server passes the raw response bytes to the searcher
+    raw_responses = [r.response.encode("utf-8") for r in recordings]
+
+    def rank() -> None:
+        i = next(responses) % len(recordings)
+        MQL5Searcher.find_best_match_api(raw_responses[i], recordings[i].keyword)
+
+    parsed = [scraper.parse_page(r.html).blocks(sys.maxsize) for r in recordings]
+
+    def compact() -> None:
+        render_blocks(parsed[next(pages) % len(parsed)], markdown=True)
+
+    results["scraper.parse_page"] = measure(parse, rounds)
+    results["searcher.find_best_match_api"] = measure(rank, rounds * 5)
+    results["compact.render_blocks"] = measure(compact, rounds * 5)
+
+    runner, origin = await start_stand_in(recordings)
+    cache_dir = tempfile.TemporaryDirectory()
+    terms = iter(range(sys.maxsize))
+
+    async def search() -> None:
+        r = recordings[next(terms) % len(recordings)]
+        result = await server.search_mql5_docs(r.keyword, max_chars=4000)
+        assert f"SOURCE: {origin}" in result, result[:200]
+
+    try:
+        with ExitStack() as stack:
+            # The server's client is built on first use, with this configuration:
+            # no rate limit and a throwaway disk cache, so that only the
+            # server's own work is timed
+            await close_client()
+            stack.enter_context(
+                patch.object(server, "limiter", RateLimiter(calls_per_minute=10**9))
+            )
+            stack.enter_context(
+                patch.object(
+                    server,
+                    "HTTP_CACHE_PATH",
+                    Path(cache_dir.name) / "http_cache.sqlite3",
+                )
+            )
+            stack.enter_context(patch.object(server, "searcher", MQL5Searcher()))
+            stack.enter_context(
+                patch.object(server, "MQL5_SEARCH_API", f"{origin}/api/search")
+            )
+            stack.enter_context(patch.object(server, "PREFETCH_ENABLED", False))
+
+            clear_caches()
+            for _ in recordings:
+                await search()
+            results["search.cache_hit"] = await measure_async(search, rounds * 5)
+            results["search.cache_miss"] = await measure_async(
+                search, rounds, before=clear_caches
+            )
+            results["search.concurrent"] = await measure_async(
+                search,
+                max(1, rounds // CONCURRENCY),
+                before=clear_caches,
+                concurrency=CONCURRENCY,
+            )
+    finally:
+        clear_caches()
+        await close_client()
+        await runner.cleanup()
+        cache_dir.cleanup()
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """
+    Compares median latencies with a baseline.
+
+    Args:
+        results: The current results.
+        baseline: Results of a previous run.
+        threshold: Allowed slowdown ratio of the median.
+
+    Returns:
+        The names of the benchmarks that regressed.
+    """
+    regressed = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None or not before["p50_ms"]:
+            continue
+        if current["p50_ms"] / before["p50_ms"] - 1 > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def print_results(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None = None,
+) -> None:
+    header = (
+        f"  {'benchmark':<30} {'ops/s':>10} {'mean ms':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+    )
+    print(header + ("  vs baseline" if baseline else ""))
+    for name, r in results.items():
+        line = (
+            f"  {name:<30} {r['ops_per_s']:>10.1f} {r['mean_ms']:>9.3f} "
+            f"{r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['max_ms']:>9.3f}"
+        )
+        if baseline and name in baseline and baseline[name]["p50_ms"]:
+            line += f"  {r['p50_ms'] / baseline[name]['p50_ms'] - 1:>+11.0%}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--save", type=Path, help="write the results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline file to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("OFFLINE BENCHMARK SUITE")
+    print("=" * 60)
+
+    results = asyncio.run(run_suite(args.rounds))
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+    print_results(results, baseline)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        meta: dict[str, Any] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rounds": args.rounds,
+        }
+        args.save.write_text(
+            json.dumps({"meta": meta, "results": results}, indent=2), encoding="utf-8"
+        )
+        print(f"\n  Saved to {args.save}")
+
+    if baseline is not None:
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n  ❌ Slower than baseline: {', '.join(regressed)}")
+            return 1
+        print("\n  ✅ No regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
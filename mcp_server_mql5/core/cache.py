@@ -0,0 +1,240 @@
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from .config import logger
+from .singleflight import SingleFlight
+
+"""
+In-memory result caching for the MQL5 MCP Server.
+
+This module provides an asyncio-aware LRU cache with TTL expiry and single-flight
+loading, so that concurrent identical requests share one upstream fetch. Expired
+entries can keep being served while they are refreshed in the background
+(stale-while-revalidate).
+"""
+
+T = TypeVar("T")
+
+
+class AsyncTTLCache(Generic[T]):
+    """
+    Bounded LRU cache with per-entry TTL and single-flight loading.
+
+    Entries expire `ttl` seconds after being stored. When the cache is full, the
+    least recently used entry is evicted. Concurrent `fetch` calls for the
+    same missing key await a single shared task instead of each running the
+    loader.
+
+    With a `hard_ttl` longer than `ttl`, an expired entry is still returned by
+    `fetch` until `hard_ttl`, and a background task reloads it. If the reload
+    fails, the stale entry is kept.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float = 3600.0,
+        name: str = "cache",
+        hard_ttl: float | None = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept. Defaults to 128.
+            ttl: Time-to-live of each entry, in seconds. Defaults to 3600.
+            name: Name used in log records and stats. Defaults to "cache".
+            hard_ttl: Age, in seconds, up to which an expired entry is served
+                while being refreshed. Defaults to `ttl` (no stale serving).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hard_ttl = max(ttl, hard_ttl) if hard_ttl is not None else ttl
+        self.name = name
+        # key -> (soft expiry, hard expiry, value)
+        self._data: OrderedDict[Hashable, tuple[float, float, T]] = OrderedDict()
+        self._flights: SingleFlight[T] = SingleFlight()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether `key` is cached (fresh or stale) or loading, without counting."""
+        entry = self._data.get(key)
+        return key in self._flights or (
+            entry is not None and time.monotonic() < entry[1]
+        )
+
+    def get(self, key: Hashable) -> T | None:
+        """
+        Returns the cached value for `key`, or None if absent or expired.
+
+        Stale entries count as misses here, since there is no loader to
+        refresh them.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        entry = self._lookup(key)
+        if entry is None or entry[1]:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: T) -> None:
+        """
+        Stores `value` under `key`, evicting the least recently used entries
+        if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        now = time.monotonic()
+        self._data[key] = (now + self.ttl, now + self.hard_ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+            logger.debug(
+                f"Evicted entry from {self.name}", extra={"operation": self.name}
+            )
+
+    async def get_or_set(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns the cached value for `key`, loading it once if missing.
+
+        See `fetch` for the single-flight semantics.
+
+        Args:
+            key: The cache key.
+            loader: Zero-argument coroutine factory producing the value.
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        value, _ = await self.fetch(key, loader)
+        return value
+
+    async def fetch(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        refresh: Callable[[], Awaitable[T]] | None = None,
+    ) -> tuple[T, bool]:
+        """
+        Returns the value for `key` and whether it was served from the cache.
+
+        If another caller is already loading the same key, this call waits for
+        that load instead of starting a new one. Exceptions raised by the loader
+        are propagated to every waiter and nothing is cached. A stale entry is
+        returned as a hit and reloaded in the background.
+
+        Args:
+            key: The cache key.
+            loader: Zero-argument coroutine factory producing the value.
+            refresh: Coroutine factory used instead of `loader` to reload a
+                stale entry in the background. Defaults to `loader`.
+
+        Returns:
+            A tuple of the value and True if it was a cache hit.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            value, stale = entry
+            self.hits += 1
+            if stale:
+                self.stale_hits += 1
+                if key not in self._flights:
+                    self.refreshes += 1
+                    self._flights.start(
+                        key,
+                        lambda: self._load(key, refresh or loader),
+                        on_error=self._on_refresh_failed,
+                    )
+            return value, True
+
+        self.misses += 1
+        result, joined = self._flights.join(key, lambda: self._load(key, loader))
+        if joined:
+            self.coalesced += 1
+        return await result, False
+
+    def loading(self) -> int:
+        """Returns the number of keys currently being loaded."""
+        return len(self._flights)
+
+    def discard(self, key: Hashable) -> None:
+        """Removes the entry for `key`, if any. A load in progress is kept."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes all entries. Counters are kept."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            A dictionary with size, hit/miss/eviction counters and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, key: Hashable) -> tuple[T, bool] | None:
+        """Returns the value and whether it is stale, or None if absent/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        soft_expiry, hard_expiry, value = entry
+        now = time.monotonic()
+        if now >= hard_expiry:
+            del self._data[key]
+            self.expirations += 1
+            return None
+
+        self._data.move_to_end(key)
+        return value, now >= soft_expiry
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        value = await loader()
+        self.set(key, value)
+        return value
+
+    def _on_refresh_failed(self, error: BaseException) -> None:
+        self.refresh_failures += 1
+        logger.debug(
+            f"Background refresh failed in {self.name}",
+            extra={"operation": self.name, "error": str(error)},
+        )
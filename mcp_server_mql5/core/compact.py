@@ -0,0 +1,214 @@
+import re
+from collections.abc import Iterable, Sequence
+
+from .html_stream import TRUNCATION_MARKER
+
+"""
+Output compaction for the MQL5 MCP Server.
+
+The blocks selected from a page (headings, paragraphs, code) are rewritten to
+spend fewer LLM tokens before they are returned: whitespace is normalized (the
+docs indent code with runs of non-breaking spaces, which cost about a token
+each), repeated blocks are dropped, and optionally code becomes fenced Markdown
+and name/description tables become compact Markdown lists or tables. Token
+counts are estimated locally, without a model tokenizer, so that results can
+also be budgeted in tokens.
+"""
+
+# Upper bound of characters per token of extracted text: the character budget
+# used to read enough of a page for a token budget.
+MAX_CHARS_PER_TOKEN = 8
+# Blocks at least this long are dropped when repeated anywhere on the page;
+# shorter ones (field names, "Description") only when repeated in a row.
+DEDUPE_MIN_CHARS = 40
+
+# Pre-tokenization close to that of BPE tokenizers (cl100k-style): words and
+# punctuation runs take a leading space, numbers are split by three digits.
+_PIECE_RE = re.compile(
+    r"(?P<word> ?[A-Za-z]+)|(?P<number> ?\d{1,3})"
+    r"|(?P<space>\s+)|(?P<other> ?[^\sA-Za-z\d]+)"
+)
+_INNER_SPACES_RE = re.compile(r"(?<=\S) {2,}")
+# Text is extracted with a space between elements: "Period , Object properties"
+_SPACE_BEFORE_PUNCTUATION_RE = re.compile(r" +(?=[,.;:](?:\s|$))")
+_CODE_RE = re.compile(r"[;{}]|//")
+_NAME_RE = re.compile(r"^[A-Za-z_]\w*$")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens of a text.
+
+    Each pre-token counts as: one token per 8 letters of a word, one per number
+    of up to three digits, one per 8 ASCII whitespace characters, one per 2
+    other ASCII characters, and one per non-ASCII character (such as a
+    non-breaking space). Within about 15% of real BPE counts on documentation
+    text.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        The estimated token count.
+    """
+    tokens = 0
+    for match in _PIECE_RE.finditer(text):
+        piece = match.group()
+        kind = match.lastgroup
+        if kind == "word":
+            tokens += -(-len(piece.lstrip(" ")) // 8)
+        elif kind == "number":
+            tokens += 1
+        else:
+            wide = sum(1 for char in piece if char > "\x7f")
+            narrow = len(piece) - wide
+            tokens += wide + -(-narrow // (8 if kind == "space" else 2))
+    return tokens
+
+
+def is_code(block: str) -> bool:
+    """Whether a block is a multi-line code sample."""
+    return "\n" in block and _CODE_RE.search(block) is not None
+
+
+def normalize_block(block: str) -> str:
+    """
+    Normalizes the whitespace of a block.
+
+    Prose is collapsed to single spaces, without spaces before punctuation.
+    Code keeps its lines and leading indentation, with non-breaking spaces
+    made plain, alignment runs collapsed and blank lines removed.
+
+    Args:
+        block: A heading, paragraph or code block.
+
+    Returns:
+        The normalized block; empty if it holds only whitespace.
+    """
+    if block == TRUNCATION_MARKER:
+        return block
+    if not is_code(block):
+        return _SPACE_BEFORE_PUNCTUATION_RE.sub("", " ".join(block.split()))
+
+    lines = []
+    for line in block.replace("\xa0", " ").splitlines():
+        line = _INNER_SPACES_RE.sub(" ", line.rstrip())
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def compact_blocks(blocks: Iterable[str], markdown: bool = False) -> list[str]:
+    """
+    Rewrites the blocks of a result to spend fewer tokens.
+
+    Args:
+        blocks: The text blocks, in order; a trailing truncation marker is kept.
+        markdown: If True, code is fenced and runs of name/description blocks
+            (parameters, fields, enumeration values) are merged into Markdown
+            lists, or tables if they follow a header pair such as
+            `ID`/`Description`. Defaults to False.
+
+    Returns:
+        The compacted blocks.
+    """
+    compacted: list[str] = []
+    seen: set[str] = set()
+    for block in blocks:
+        block = normalize_block(block)
+        if not block or (compacted and block == compacted[-1]):
+            continue
+        if len(block) >= DEDUPE_MIN_CHARS:
+            if block in seen:
+                continue
+            seen.add(block)
+        compacted.append(block)
+    return _markdown(compacted) if markdown else compacted
+
+
+def _markdown(blocks: Sequence[str]) -> list[str]:
+    result: list[str] = []
+    i = 0
+    while i < len(blocks):
+        pairs = []
+        j = i
+        while j + 1 < len(blocks) and _is_entry(blocks[j], blocks[j + 1]):
+            pairs.append((blocks[j], blocks[j + 1]))
+            j += 2
+        if len(pairs) >= 2:
+            result.append(_entries(result, pairs))
+            i = j
+            continue
+
+        block = blocks[i]
+        result.append(f"```mql5\n{block}\n```" if is_code(block) else block)
+        i += 1
+    return result
+
+
+def _is_entry(name: str, description: str) -> bool:
+    return (
+        _NAME_RE.match(name) is not None
+        and _NAME_RE.match(description) is None
+        and description != TRUNCATION_MARKER
+        and not is_code(description)
+    )
+
+
+def _entries(result: list[str], pairs: list[tuple[str, str]]) -> str:
+    """Formats name/description pairs, taking a table header from `result`."""
+    if len(result) >= 2 and all(_NAME_RE.match(block) for block in result[-2:]):
+        header = result[-2:]
+        del result[-2:]
+        rows = [f"{name} | {text.replace('|', '/')}" for name, text in pairs]
+        return "\n".join([" | ".join(header), "--|--", *rows])
+    return "\n".join(f"- {name}: {text}" for name, text in pairs)
+
+
+def truncate_tokens(blocks: Sequence[str], max_tokens: int) -> list[str]:
+    """
+    Applies a token budget to the blocks of a result.
+
+    Args:
+        blocks: The blocks, in order.
+        max_tokens: Token budget, separators included.
+
+    Returns:
+        The leading blocks that fit, followed by the truncation marker if any
+        block was dropped.
+    """
+    kept: list[str] = []
+    tokens = 0
+    for block in blocks:
+        tokens += estimate_tokens(block) + 1  # Blank line separator
+        if tokens > max_tokens:
+            if kept[-1:] != [TRUNCATION_MARKER]:
+                kept.append(TRUNCATION_MARKER)
+            break
+        kept.append(block)
+    return kept
+
+
+def render_blocks(
+    blocks: Iterable[str],
+    max_tokens: int | None = None,
+    compact: bool = True,
+    markdown: bool = False,
+) -> str:
+    """
+    Formats the blocks of a result for the client.
+
+    Args:
+        blocks: The blocks, already cut to the character budget.
+        max_tokens: Optional token budget of the output.
+        compact: Whether to compact the blocks first. Defaults to True.
+        markdown: Whether to format code and tables as Markdown. Defaults to
+            False.
+
+    Returns:
+        The blocks separated by blank lines.
+    """
+    selected = compact_blocks(blocks, markdown) if compact else list(blocks)
+    if max_tokens is not None:
+        selected = truncate_tokens(selected, max_tokens)
+    return "\n\n".join(selected)
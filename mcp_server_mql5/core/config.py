@@ -1,9 +1,13 @@
+import atexit
 import json
 import logging
 import logging.handlers
+import os
+import queue
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 """
 Configuration and logging setup for the MQL5 MCP Server.
@@ -15,9 +19,12 @@ used throughout the application. It sets up structured JSON logging and file rot
 # ==================== CONSTANTS ====================
 
 LOG_DIR = Path.home() / ".mcp_server_mql5" / "logs"
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+CACHE_DIR = Path.home() / ".mcp_server_mql5" / "cache"
+INDEX_DIR = Path.home() / ".mcp_server_mql5" / "index"
 
 MQL5_SEARCH_API = "https://search.mql5.com/api/query"
+DOCS_BASE_URL = "https://www.mql5.com/en/docs"
 # Keeping as fallback if needed, but primary is now API
 DDG_URL = "https://html.duckduckgo.com/html/"
 
@@ -33,6 +40,156 @@ DEFAULT_HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# HTTP connection pool (connections, seconds)
+HTTP_POOL_LIMIT = 20
+HTTP_POOL_LIMIT_PER_HOST = 4
+HTTP_KEEPALIVE_TIMEOUT = 60
+HTTP_DNS_CACHE_TTL = 600
+
+# Request timeouts (seconds): connection setup, gap between reads, whole request
+HTTP_TIMEOUT_CONNECT = 5
+HTTP_TIMEOUT_READ = 10
+HTTP_TIMEOUT_TOTAL = 30
+
+# GET failures (timeouts, connection errors, HTTP_RETRY_STATUSES) are retried
+# HTTP_RETRIES times with exponential backoff and full jitter (seconds). With
+# HTTP_HEDGE_DELAY > 0, a GET still running after that many seconds is sent a
+# second time and the first response wins (0: no hedging).
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.5
+HTTP_RETRY_MAX_BACKOFF = 8
+HTTP_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+HTTP_HEDGE_DELAY = 0
+
+# Circuit breaker: after BREAKER_FAILURE_THRESHOLD consecutive failures, a host
+# gets no requests for BREAKER_RESET_TIMEOUT seconds; stale cached responses
+# are served meanwhile.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+# Streamed page reads (bytes per chunk): pages requested with max_chars up to
+# STREAM_FETCH_MAX_CHARS are extracted while downloading, and the download
+# stops once the budget is filled. Larger budgets fetch the complete page.
+HTTP_STREAM_CHUNK_SIZE = 16 * 1024
+STREAM_FETCH_MAX_CHARS = 1000
+
+# Persistent HTTP response cache (seconds, entries)
+HTTP_CACHE_PATH = CACHE_DIR / "http_cache.sqlite3"
+HTTP_CACHE_DEFAULT_TTL = 24 * 60 * 60
+HTTP_CACHE_MAX_ENTRIES = 5000
+
+# Rate limits, in calls per minute (per host, with a default for other hosts)
+RATE_LIMIT_PER_MINUTE = 10
+RATE_LIMIT_PER_HOST = {
+    "search.mql5.com": 10,
+    "www.mql5.com": 10,
+}
+
+# Offline docs index (built with `mcp-server-mql5-index`).
+# Search mode: "auto" (local index, API fallback), "local" or "api".
+DOC_INDEX_PATH = INDEX_DIR / "docs_index.json.gz"
+SYMBOL_INDEX_PATH = INDEX_DIR / "symbols.bin"
+SEARCH_MODE = "auto"
+
+# Ranking of search API results: feature weights (exact page name or URL slug
+# match, page name prefix, share of query words in the title, module weight, and
+# a penalty per URL path segment), and the weight of each module (last part of
+# e.g. "mql5.com.en.docs"; other modules weigh 0).
+RANK_WEIGHTS = {
+    "exact": 10.0,
+    "prefix": 3.0,
+    "overlap": 4.0,
+    "module": 5.0,
+    "depth": 0.1,
+}
+RANK_MODULE_WEIGHTS = {
+    "docs": 1.0,
+    "code": 0.3,
+    "articles": 0.2,
+    "forum": 0.1,
+}
+
+# Search API response decoder: "auto" (orjson if installed, else the standard
+# library), "orjson" or "json"
+JSON_BACKEND = "auto"
+
+# search_mql5_docs_batch: maximum number of terms per call
+BATCH_MAX_TERMS = 50
+
+# Page text extraction backend: "stream" (fast) or "bs4" (reference)
+EXTRACTION_BACKEND = "stream"
+
+# Output compaction of search results: whitespace normalized and repeated blocks
+# dropped. OUTPUT_MARKDOWN also fences code and merges parameter and enumeration
+# tables into Markdown lists and tables (clearer, but slightly more tokens).
+OUTPUT_COMPACT = True
+OUTPUT_MARKDOWN = False
+
+# Worker pool for HTML extraction and result parsing: "thread" or "process"
+# (true parallelism across cores). Further tasks wait beyond the queue size.
+WORKER_POOL_KIND = "thread"
+WORKER_POOL_SIZE = min(4, os.cpu_count() or 1)
+WORKER_POOL_MAX_QUEUE = 32
+
+# Caches of search_mql5_docs (entries, seconds): search term -> page URL, and
+# page URL -> cleaned sections (truncated to max_chars per request). Entries
+# older than the TTL (soft) but younger than the HARD_TTL are still returned at
+# once, and refreshed in the background (stale-while-revalidate).
+TERM_CACHE_SIZE = 1024
+TERM_CACHE_TTL = 6 * 60 * 60
+TERM_CACHE_HARD_TTL = 7 * 24 * 60 * 60
+PAGE_CACHE_SIZE = 128
+PAGE_CACHE_TTL = 6 * 60 * 60
+PAGE_CACHE_HARD_TTL = 7 * 24 * 60 * 60
+
+# Cache warm-up: in the background, preloads the terms listed in the terms file
+# (one per line) and the most searched terms in past logs. Runs at startup and
+# then every WARMUP_INTERVAL seconds (0: startup only), only while no client
+# request is in progress, and keeps WARMUP_MIN_TOKENS rate limit calls per host
+# in reserve for live traffic. Off by default, as it sends requests to mql5.com
+# at every start: set WARMUP_ENABLED = True to enable it.
+WARMUP_ENABLED = False
+WARMUP_TERMS_PATH = Path.home() / ".mcp_server_mql5" / "warmup_terms.txt"
+WARMUP_MAX_TERMS = 50
+WARMUP_INTERVAL = 0
+WARMUP_START_DELAY = 5
+WARMUP_MIN_TOKENS = 5
+
+# Speculative prefetch: after each search, loads the first PREFETCH_TOP_K
+# documentation pages linked from the result into the page cache, under the
+# same idle and rate limit rules as the warm-up. At most PREFETCH_MAX_QUEUE
+# pages wait; older predictions are dropped first. Off by default: each search
+# can then send up to PREFETCH_TOP_K extra requests to mql5.com, from the same
+# rate limit budget as user requests. Set PREFETCH_ENABLED = True to enable it.
+PREFETCH_ENABLED = False
+PREFETCH_TOP_K = 3
+PREFETCH_MAX_QUEUE = 16
+
+# Metrics: stage latencies and request counters are kept in memory and can be
+# read with the get_mql5_server_metrics tool. A non-zero METRICS_PORT also
+# serves them in the Prometheus text format at /metrics on METRICS_HOST.
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 0
+
+# Tracing: each search records nested spans (search API, DNS/connect, download,
+# parse, render) with timings and byte sizes. The last TRACE_MAX_SPANS spans are
+# kept in memory; the export_mql5_trace tool writes them to TRACE_DIR as a
+# Chrome trace or OpenTelemetry JSON file.
+TRACE_ENABLED = True
+TRACE_MAX_SPANS = 10_000
+TRACE_DIR = LOG_DIR.parent / "traces"
+
+# Logging: records are formatted and written by a background thread. Records
+# arriving while the buffer is full are dropped (and counted). Each sink has
+# its own level; "text" skips the per-request INFO records by default.
+LOG_QUEUE_SIZE = 10_000
+LOG_SINK_LEVELS = {
+    "json": logging.DEBUG,
+    "text": logging.WARNING,
+    "errors": logging.ERROR,
+    "stderr": logging.ERROR,
+}
+
 # ==================== LOGGING ====================
 
 
@@ -45,8 +202,10 @@ class StructuredFormatter(logging.Formatter):
     """
 
     def format(self, record: logging.LogRecord) -> str:
+        # Time of the event, not of formatting (done later by a background thread)
+        created = datetime.fromtimestamp(record.created, timezone.utc)
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": created.replace(tzinfo=None).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -63,6 +222,19 @@ class StructuredFormatter(logging.Formatter):
             "status_code",
             "operation",
             "error",
+            "resolved_by",
+            "symbol_kind",
+            "connections",
+            "symbols",
+            "workers",
+            "logging",
+            "warmup",
+            "prefetch",
+            "bytes_read",
+            "breaker",
+            "caches",
+            "metrics",
+            "trace_id",
         ]:
             if hasattr(record, key):
                 log_data[key] = getattr(record, key)
@@ -73,11 +245,109 @@ class StructuredFormatter(logging.Formatter):
         return json.dumps(log_data)
 
 
+class _LazyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that creates its directory and opens its file when
+    the first record is written, on the logging thread, instead of at import.
+    """
+
+    def __init__(self, filename: Path, **kwargs: Any) -> None:
+        super().__init__(filename, delay=True, encoding="utf-8", **kwargs)
+
+    def _open(self) -> Any:
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+class BackgroundLogHandler(logging.handlers.QueueHandler):
+    """
+    Non-blocking log handler with a bounded buffer.
+
+    Records are put on a queue and handed to the sink handlers by a background
+    thread, which does all formatting and disk I/O. When the queue is full, new
+    records are dropped and counted; ERROR and above replace the oldest queued
+    record instead.
+    """
+
+    def __init__(self, *handlers: logging.Handler, maxsize: int = 10_000) -> None:
+        """
+        Initialize the handler. Call `start()` to begin writing.
+
+        Args:
+            *handlers: The sink handlers; each applies its own level.
+            maxsize: Maximum number of buffered records. Defaults to 10000.
+        """
+        self.buffer: queue.Queue[logging.LogRecord] = queue.Queue(maxsize)
+        super().__init__(self.buffer)
+        self.maxsize = maxsize
+        self.listener = _DrainingQueueListener(
+            self.buffer, *handlers, respect_handler_level=True
+        )
+        self.dropped = 0
+        self.dropped_errors = 0
+
+    def start(self) -> None:
+        """Starts the background thread."""
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Writes all buffered records and stops the background thread."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only freeze the message; formatting is left to the sinks
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if record.levelno >= logging.ERROR:
+            try:
+                self.buffer.get_nowait()
+                self.buffer.put_nowait(record)
+                self.dropped += 1
+                return
+            except (queue.Empty, queue.Full):
+                self.dropped_errors += 1
+        self.dropped += 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns buffer counters.
+
+        Returns:
+            A dictionary with queued and dropped record counts.
+        """
+        return {
+            "queued": self.buffer.qsize(),
+            "capacity": self.maxsize,
+            "dropped": self.dropped,
+            "dropped_errors": self.dropped_errors,
+        }
+
+
 def setup_logging(logger_name: str = "mql5_server") -> logging.Logger:
     """
     Configures the application logger with MCP-safe settings.
 
-    Sets up rotating file handlers for JSON logs, text logs, and errors.
+    Sets up rotating file handlers for JSON logs, text logs, and errors, behind a
+    `BackgroundLogHandler` so that logging never blocks the event loop. Log files
+    (and the log directory) are only created when first written to.
     Ensures that logs are NOT propagated to the root logger or printed to stdout/stderr
     (unless in debug mode), as this would interfere with the MCP protocol stdio
     transport.
@@ -90,46 +360,64 @@ def setup_logging(logger_name: str = "mql5_server") -> logging.Logger:
     """
 
     logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.DEBUG)
     logger.propagate = False  # Important!
 
     # Only FileHandlers - NEVER stdout
-    json_handler = logging.handlers.RotatingFileHandler(
-        LOG_DIR / f"{logger_name}.json.log",
-        maxBytes=10_000_000,
-        backupCount=5,
-        encoding="utf-8",
+    json_handler = _LazyRotatingFileHandler(
+        LOG_DIR / f"{logger_name}.json.log", maxBytes=10_000_000, backupCount=5
     )
     json_handler.setFormatter(StructuredFormatter())
-    logger.addHandler(json_handler)
+    json_handler.setLevel(LOG_SINK_LEVELS["json"])
 
-    text_handler = logging.handlers.RotatingFileHandler(
-        LOG_DIR / f"{logger_name}.log",
-        maxBytes=10_000_000,
-        backupCount=5,
-        encoding="utf-8",
+    text_handler = _LazyRotatingFileHandler(
+        LOG_DIR / f"{logger_name}.log", maxBytes=10_000_000, backupCount=5
     )
     text_handler.setFormatter(
         logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     )
-    logger.addHandler(text_handler)
+    text_handler.setLevel(LOG_SINK_LEVELS["text"])
 
-    error_handler = logging.handlers.RotatingFileHandler(
-        LOG_DIR / "errors.log", maxBytes=10_000_000, backupCount=10, encoding="utf-8"
+    error_handler = _LazyRotatingFileHandler(
+        LOG_DIR / "errors.log", maxBytes=10_000_000, backupCount=10
     )
     error_handler.setFormatter(StructuredFormatter())
-    error_handler.setLevel(logging.ERROR)
-    logger.addHandler(error_handler)
+    error_handler.setLevel(LOG_SINK_LEVELS["errors"])
+
+    sinks: list[logging.Handler] = [json_handler, text_handler, error_handler]
 
     # Stderr only in debug (optional)
     if __debug__:
         stderr_handler = logging.StreamHandler(sys.stderr)
         stderr_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
-        stderr_handler.setLevel(logging.ERROR)  # Only critical errors
-        logger.addHandler(stderr_handler)
+        stderr_handler.setLevel(LOG_SINK_LEVELS["stderr"])  # Only critical errors
+        sinks.append(stderr_handler)
+
+    # Records below every sink's level are discarded before being queued
+    logger.setLevel(min(sink.level for sink in sinks))
+
+    background = BackgroundLogHandler(*sinks, maxsize=LOG_QUEUE_SIZE)
+    background.start()
+    atexit.register(background.stop)
+    logger.addHandler(background)
 
     return logger
 
 
+def logging_stats(logger_name: str = "mql5_server") -> dict[str, Any]:
+    """
+    Returns the buffer counters of a logger configured by `setup_logging`.
+
+    Args:
+        logger_name: The logger name. Defaults to "mql5_server".
+
+    Returns:
+        The `BackgroundLogHandler.stats()` dictionary, or an empty one.
+    """
+    for handler in logging.getLogger(logger_name).handlers:
+        if isinstance(handler, BackgroundLogHandler):
+            return handler.stats()
+    return {}
+
+
 # Global logger instance
 logger = setup_logging()
@@ -0,0 +1,443 @@
+import gzip
+import json
+import math
+import re
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urldefrag, urljoin
+
+from .config import DOCS_BASE_URL, logger
+from .scraper import MQL5Scraper
+
+if TYPE_CHECKING:
+    from .web_client import WebClient
+
+"""
+Offline full-text index of the MQL5 documentation.
+
+This module builds an inverted index of page titles, function signatures and
+section text, either from a saved HTML dump or by crawling the docs tree, and
+answers queries locally with BM25 ranking so that most searches need no network
+round trip to the MQL5 search API.
+"""
+
+INDEX_VERSION = 1
+
+# BM25 parameters, per-field weights and ranking bonuses
+BM25_K1 = 1.2
+BM25_B = 0.75
+FIELD_WEIGHTS = {"title": 5.0, "headings": 3.0, "signature": 2.0, "text": 1.0}
+PART_WEIGHT = 0.25  # Weight of identifier parts relative to whole words
+TITLE_BONUS = 10.0
+HEADING_BONUS = 5.0
+EXACT_TITLE_BONUS = 10.0
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def index_terms(text: str) -> Iterator[tuple[str, float]]:
+    """
+    Splits text into lowercase index terms with their weights.
+
+    Identifiers are indexed whole and, at `PART_WEIGHT`, by their
+    camel-case/underscore parts, so `OrderSend` yields `ordersend`, `order` and
+    `send`.
+
+    Args:
+        text: The text to tokenize.
+
+    Yields:
+        Tuples of (term, weight), with repetitions.
+    """
+    for word in _WORD_RE.findall(text):
+        yield word.lower(), 1.0
+        parts = [
+            part.lower()
+            for chunk in word.split("_")
+            for part in _CAMEL_RE.findall(chunk)
+        ]
+        if len(parts) > 1:
+            for part in parts:
+                yield part, PART_WEIGHT
+
+
+def query_terms(query: str) -> list[str]:
+    """
+    Returns the distinct whole words of a query, lowercased.
+
+    Args:
+        query: The search query.
+
+    Returns:
+        The query words in order of first appearance.
+    """
+    return list(dict.fromkeys(word.lower() for word in _WORD_RE.findall(query)))
+
+
+@dataclass
+class DocEntry:
+    """A documentation page stored in the index."""
+
+    url: str
+    title: str
+    headings: list[str]
+    signature: str
+
+
+@dataclass
+class SearchHit:
+    """A ranked index result."""
+
+    url: str
+    title: str
+    score: float
+    coverage: float  # Fraction of the query words in the title or headings
+
+
+class DocIndex:
+    """
+    Inverted index over MQL5 documentation pages with BM25 ranking.
+
+    Term frequencies are combined across fields (title, headings, signature,
+    text) using `FIELD_WEIGHTS`, BM25F-style. Pages whose title or headings
+    contain the query words get an additional bonus, so that the page defining
+    a symbol outranks pages that merely mention it.
+    """
+
+    def __init__(
+        self,
+        docs: list[DocEntry],
+        postings: dict[str, dict[int, float]],
+        doc_lengths: list[float],
+    ) -> None:
+        """
+        Initialize the index. Use `DocIndexBuilder` or `load` to create one.
+
+        Args:
+            docs: The indexed pages, by document id.
+            postings: Weighted term frequency per document, keyed by term.
+            doc_lengths: Weighted length of each document.
+        """
+        self.docs = docs
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.avg_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        self._title_terms = [{t for t, _ in index_terms(d.title)} for d in docs]
+        self._heading_terms = [
+            {t for h in d.headings for t, _ in index_terms(h)} for d in docs
+        ]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, query: str, limit: int = 5) -> list[SearchHit]:
+        """
+        Ranks the indexed pages for a query.
+
+        Args:
+            query: The search query.
+            limit: Maximum number of hits to return. Defaults to 5.
+
+        Returns:
+            The best hits, highest score first.
+        """
+        words = query_terms(query)
+        if not words or not self.docs:
+            return []
+
+        n_docs = len(self.docs)
+        scores: dict[int, float] = {}
+        for term in {t for t, _ in index_terms(query)}:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = BM25_K1 * (
+                    1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avg_length
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (
+                    tf + norm
+                )
+
+        normalized = " ".join(words)
+        coverage: dict[int, float] = {}
+        for doc_id in scores:
+            in_title = sum(1 for w in words if w in self._title_terms[doc_id])
+            in_headings = sum(
+                1
+                for w in words
+                if w in self._title_terms[doc_id] or w in self._heading_terms[doc_id]
+            )
+            coverage[doc_id] = in_headings / len(words)
+            scores[doc_id] += TITLE_BONUS * in_title / len(words)
+            scores[doc_id] += HEADING_BONUS * coverage[doc_id]
+            if " ".join(query_terms(self.docs[doc_id].title)) == normalized:
+                scores[doc_id] += EXACT_TITLE_BONUS
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [
+            SearchHit(
+                self.docs[doc_id].url,
+                self.docs[doc_id].title,
+                score,
+                coverage[doc_id],
+            )
+            for doc_id, score in ranked[:limit]
+        ]
+
+    def save(self, path: Path) -> None:
+        """
+        Writes the index to a gzip-compressed JSON file.
+
+        Args:
+            path: Destination file; parent directories are created.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "docs": [asdict(doc) for doc in self.docs],
+            "doc_lengths": self.doc_lengths,
+            "postings": {
+                term: [[doc_id, tf] for doc_id, tf in docs.items()]
+                for term, docs in self.postings.items()
+            },
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path) -> "DocIndex":
+        """
+        Reads an index written by `save`.
+
+        Args:
+            path: The index file.
+
+        Returns:
+            The loaded index.
+
+        Raises:
+            ValueError: If the file was written by an incompatible version.
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {data.get('version')}")
+
+        return cls(
+            docs=[DocEntry(**doc) for doc in data["docs"]],
+            postings={
+                term: {doc_id: tf for doc_id, tf in docs}
+                for term, docs in data["postings"].items()
+            },
+            doc_lengths=data["doc_lengths"],
+        )
+
+
+class DocIndexBuilder:
+    """
+    Accumulates documentation pages and produces a `DocIndex`.
+    """
+
+    def __init__(self, scraper: MQL5Scraper | None = None) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            scraper: Scraper used to extract page text. Defaults to a new one.
+        """
+        self.scraper = scraper or MQL5Scraper()
+        self.docs: list[DocEntry] = []
+        self.postings: dict[str, dict[int, float]] = {}
+        self.doc_lengths: list[float] = []
+        self._urls: set[str] = set()
+
+    def add_page(self, url: str, html: str) -> bool:
+        """
+        Parses a page and adds it to the index.
+
+        Args:
+            url: The canonical URL of the page.
+            html: The raw HTML of the page.
+
+        Returns:
+            True if the page was added, False if it was a duplicate or empty.
+        """
+        if url in self._urls:
+            return False
+
+        fields = page_fields(html, self.scraper)
+        if not fields["title"] and not fields["text"]:
+            return False
+
+        doc_id = len(self.docs)
+        weighted: defaultdict[str, float] = defaultdict(float)
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term, weight in index_terms(fields[field]):
+                weighted[term] += field_weight * weight
+
+        for term, tf in weighted.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        self.docs.append(
+            DocEntry(
+                url,
+                fields["title"],
+                fields["headings"].split("\n"),
+                fields["signature"],
+            )
+        )
+        self.doc_lengths.append(float(sum(weighted.values())))
+        self._urls.add(url)
+        return True
+
+    def build(self) -> DocIndex:
+        """Returns the index of all pages added so far."""
+        return DocIndex(self.docs, self.postings, self.doc_lengths)
+
+
+def page_fields(html: str, scraper: MQL5Scraper) -> dict[str, str]:
+    """
+    Extracts the indexed fields of a documentation page.
+
+    Args:
+        html: The raw HTML of the page.
+        scraper: Scraper used to extract the section text.
+
+    Returns:
+        A dictionary with `title` (first h1), `headings` (h2/h3 and bold titles,
+        one per line), `signature` (first code block) and `text` (the cleaned
+        page content).
+    """
+    # Index building only: bs4 is not imported by the server at startup
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    content = scraper._find_content_div(soup)
+    if not content:
+        return {"title": "", "headings": "", "signature": "", "text": ""}
+
+    h1 = content.find("h1")
+    pre = content.find("pre")
+    headings = content.find_all(["h2", "h3"]) + content.find_all(
+        "p", class_="p_BoldTitles"
+    )
+    return {
+        "title": h1.get_text(" ", strip=True) if h1 else "",
+        "headings": "\n".join(h.get_text(" ", strip=True) for h in headings),
+        "signature": pre.get_text(" ", strip=True)[:500] if pre else "",
+        "text": scraper.extract_content(html, max_chars=1_000_000),
+    }
+
+
+def canonical_url(html: str) -> str | None:
+    """
+    Returns the canonical URL declared by a page, if any.
+
+    Args:
+        html: The raw HTML of the page.
+
+    Returns:
+        The href of `<link rel="canonical">`, or None.
+    """
+    from bs4 import BeautifulSoup
+
+    link = BeautifulSoup(html, "html.parser").find("link", rel="canonical")
+    href = link.get("href") if link else None
+    return href if isinstance(href, str) else None
+
+
+def iter_html_dump(root: Path) -> Iterator[tuple[str, str]]:
+    """
+    Yields the pages of a saved HTML dump of the documentation.
+
+    The URL of each page is its canonical link, or is derived from its path
+    relative to `root` (e.g. `trading/ordersend.html`).
+
+    Args:
+        root: Directory containing `.html`/`.htm` files, possibly nested.
+
+    Yields:
+        Tuples of (url, html).
+    """
+    for path in sorted(root.rglob("*.htm*")):
+        html = path.read_text(encoding="utf-8", errors="replace")
+        url = canonical_url(html)
+        if not url:
+            relative = path.relative_to(root).with_suffix("").as_posix()
+            url = urljoin(DOCS_BASE_URL + "/", relative)
+        yield url, html
+
+
+async def crawl_docs(
+    client: "WebClient", start_url: str = DOCS_BASE_URL, max_pages: int = 10_000
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    Crawls the documentation tree breadth-first.
+
+    Only pages under `start_url` are followed. Requests go through `client`,
+    so its rate limiter and HTTP cache apply.
+
+    Args:
+        client: The HTTP client used to fetch pages.
+        start_url: Root of the crawl. Defaults to the English docs root.
+        max_pages: Maximum number of pages to fetch. Defaults to 10000.
+
+    Yields:
+        Tuples of (url, html) for each fetched page.
+    """
+    from bs4 import BeautifulSoup
+
+    queue = deque([start_url])
+    seen = {start_url}
+    fetched = 0
+
+    while queue and fetched < max_pages:
+        url = queue.popleft()
+        try:
+            html = await client.get(url)
+        except Exception as e:
+            logger.warning(f"Crawl failed for {url}", extra={"error": str(e)})
+            continue
+        fetched += 1
+        if not html:
+            continue
+
+        yield url, html
+
+        for a in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+            href = a.get("href")
+            if not isinstance(href, str):
+                continue
+            link, _ = urldefrag(urljoin(url, href))
+            if link.startswith(start_url) and "?" not in link and link not in seen:
+                seen.add(link)
+                queue.append(link)
+
+
+def load_doc_index(path: Path) -> DocIndex | None:
+    """
+    Loads the offline index if it has been built.
+
+    Args:
+        path: The index file.
+
+    Returns:
+        The index, or None if the file is missing or unreadable.
+    """
+    if not path.exists():
+        return None
+    try:
+        index = DocIndex.load(path)
+    except Exception as e:
+        logger.error("Failed to load docs index", extra={"error": str(e)})
+        return None
+
+    logger.info(f"Docs index loaded ({len(index)} pages)", extra={"url": str(path)})
+    return index
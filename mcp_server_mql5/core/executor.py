@@ -0,0 +1,213 @@
+import asyncio
+import contextvars
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from .config import logger
+
+"""
+Worker pool for CPU-bound work of the MQL5 MCP Server.
+
+This module runs HTML extraction and search result parsing outside the event loop,
+in a thread or process pool with a bounded number of queued tasks, so that a slow
+parse does not stall concurrent requests.
+"""
+
+T = TypeVar("T")
+
+POOL_KINDS = ("thread", "process")
+
+
+def _timed_call(func: Callable[..., T], args: tuple[Any, ...]) -> tuple[T, float]:
+    """Runs `func` in the worker and returns its result and execution time."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class WorkerPool:
+    """
+    Bounded executor stage with queueing metrics.
+
+    At most `max_workers` tasks run at once and `max_queue` more wait for a
+    worker; further callers wait (backpressure) until a slot frees up. Process
+    pools give true parallelism but require picklable functions and arguments.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 32,
+        name: str = "workers",
+    ) -> None:
+        """
+        Initialize the pool. Workers are started on first use.
+
+        Args:
+            kind: "thread" or "process". Defaults to "thread".
+            max_workers: Number of workers. Defaults to 4.
+            max_queue: Number of tasks allowed to wait for a worker. Defaults to 32.
+            name: Name used in log records and stats. Defaults to "workers".
+
+        Raises:
+            ValueError: If the kind is unknown or the sizes are not positive.
+        """
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError("max_workers must be >= 1 and max_queue >= 0")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.name = name
+        self._executor: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.failed = 0
+        self.queued_total = 0.0
+        self.queued_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Runs `func(*args)` in a worker and returns its result.
+
+        Waits for a free slot first if `max_workers + max_queue` tasks are
+        already in flight. If the caller is cancelled, a task that has already
+        started still runs to completion and keeps its slot until then.
+
+        Args:
+            func: The function to run.
+            *args: Positional arguments for `func`.
+
+        Returns:
+            The return value of `func`.
+
+        Raises:
+            Exception: Whatever `func` raised.
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots(loop)
+        start = time.perf_counter()
+
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            if self.kind == "thread":
+                # Threads see the caller's context, e.g. the current trace span
+                context = contextvars.copy_context()
+                future = self._get_executor().submit(
+                    context.run, _timed_call, func, args
+                )
+            else:
+                future = self._get_executor().submit(_timed_call, func, args)
+        except BaseException:
+            slots.release()
+            raise
+
+        self.in_flight += 1
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, slots))
+
+        try:
+            result, exec_time = await asyncio.wrap_future(future)
+        except Exception:
+            self.failed += 1
+            raise
+
+        self._record(time.perf_counter() - start - exec_time, exec_time)
+        return result
+
+    def queue_depth(self) -> int:
+        """Returns the number of tasks submitted or waiting but not running."""
+        return self.waiting + max(0, self.in_flight - self.max_workers)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns a snapshot of the pool counters.
+
+        Returns:
+            A dictionary with pool size, load, and queued/exec times in ms.
+        """
+        done = self.completed or 1
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued_avg_ms": self.queued_total / done * 1000,
+            "queued_max_ms": self.queued_max * 1000,
+            "exec_avg_ms": self.exec_total / done * 1000,
+            "exec_max_ms": self.exec_max * 1000,
+        }
+
+    def close(self) -> None:
+        """Shuts the workers down without waiting. The next task restarts them."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Spawn, since forking a process with running threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            logger.debug(
+                f"Started {self.kind} pool {self.name} ({self.max_workers} workers)",
+                extra={"operation": self.name},
+            )
+        return self._executor
+
+    def _get_slots(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # Semaphores bind to one event loop; start over on a new loop
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+            self._loop = loop
+            self.in_flight = 0
+        return self._slots
+
+    def _release_threadsafe(
+        self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore
+    ) -> None:
+        """Done callback of a worker future; may run in a worker thread."""
+        try:
+            loop.call_soon_threadsafe(self._release, slots)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        if slots is self._slots:
+            self.in_flight -= 1
+        slots.release()
+
+    def _record(self, queued: float, executed: float) -> None:
+        queued = max(0.0, queued)
+        self.completed += 1
+        self.queued_total += queued
+        self.queued_max = max(self.queued_max, queued)
+        self.exec_total += executed
+        self.exec_max = max(self.exec_max, executed)
@@ -0,0 +1,346 @@
+import html.entities
+import re
+from collections import deque
+from html.parser import HTMLParser
+
+"""
+Streaming text extraction for MQL5 documentation pages.
+
+This module reads a page with the standard library tokenizer (the same one used by
+BeautifulSoup's "html.parser" builder) without building a tree. It only tracks the
+stack of open tags, collects text and link targets inside the `doc-content`
+container, and stops as soon as the container is closed or the character budget is
+used. The output is identical to the BeautifulSoup extraction in `MQL5Scraper`.
+"""
+
+TEXT_TAGS = frozenset({"h1", "h2", "h3", "p", "pre"})
+JUNK_TAGS = frozenset(
+    {"script", "style", "nav", "footer", "header", "form", "aside", "iframe"}
+)
+TRUNCATION_MARKER = "\n[truncated]"
+CONTENT_CLASS = "doc-content"
+
+# Tree-building rules of BeautifulSoup's "html.parser" builder, copied so that
+# the reference behaviour does not depend on bs4 internals.
+# Tags closed on sight
+_EMPTY_ELEMENT_TAGS = frozenset(
+    "area base basefont bgsound br col command embed frame hr image img input "
+    "isindex keygen link menuitem meta nextid param source spacer track wbr".split()
+)
+# Tags whose strings are not main content
+_STRING_CONTAINER_TAGS = frozenset({"rt", "rp", "style", "script", "template"})
+# Named references, matched without the trailing ";" as the tokenizer reports them
+_ENTITIES = {
+    name.removesuffix(";"): character
+    for name, character in html.entities.html5.items()
+    if name.endswith(";")
+}
+
+
+def _numeric_reference(number: int) -> str:
+    """
+    Resolves a numeric character reference as the HTML spec does.
+
+    Out-of-range values and surrogates become U+FFFD; C1 control codes are read
+    as their Windows-1252 characters, which is what pages that use them mean.
+    """
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return "\ufffd"
+    if 0x80 <= number <= 0x9F:
+        try:
+            return bytes([number]).decode("cp1252")
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+
+_CLASS_VALUE_RE = re.compile(r"\S+")
+_DECIMAL_REFERENCE_RE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE_RE = re.compile("^([0-9a-f]+)(.*)")
+
+_CONTENT = object()
+_JUNK = object()
+
+
+class _Done(Exception):
+    """Raised from parser callbacks to stop reading the page."""
+
+
+class _Section:
+    """Text collected for one heading, paragraph or code block."""
+
+    __slots__ = ("parts", "length", "closed")
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self.length = 0
+        self.closed = False
+
+    def add(self, text: str) -> None:
+        self.length += len(text) + (1 if self.parts else 0)
+        self.parts.append(text)
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    Incremental extractor of the main documentation text.
+
+    Feed the page in one or more chunks and call `close()`; once `done` is True
+    the remaining input is ignored. `sections` then holds the same list of texts
+    (including the truncation marker) that the BeautifulSoup backend produces,
+    provided `found` is True, and `links` the raw `href` values of the links
+    read so far in the container, outside junk elements.
+    """
+
+    def __init__(self, max_chars: int = 4000) -> None:
+        """
+        Initialize the extractor.
+
+        Args:
+            max_chars: Character budget of the extracted text. Defaults to 4000.
+        """
+        super().__init__(convert_charrefs=False)
+        self.max_chars = max_chars
+        self.sections: list[str] = []
+        self.links: list[str] = []
+        self.found = False
+        self.done = False
+
+        self._chars = 0
+        self._data: list[str] = []
+        self._stack: list[tuple[str, object]] = []
+        self._open: dict[str, int] = {}
+        self._already_closed: list[str] = []
+        self._in_content = False
+        self._junk_depth = 0
+        self._containers = 0
+        self._open_sections: list[_Section] = []
+        self._pending: deque[_Section] = deque()
+
+    def feed(self, data: str) -> None:
+        """Parses a chunk of the page, unless extraction is already done."""
+        if self.done:
+            return
+        try:
+            super().feed(data)
+        except _Done:
+            self.done = True
+
+    def close(self) -> None:
+        """Parses any buffered input and closes all open elements."""
+        if self.done:
+            return
+        try:
+            super().close()
+            self._flush()
+            if self._stack:
+                self._pop(self._stack[0][0], all_tags=True)
+        except _Done:
+            pass
+        self.done = True
+
+    # ---- Tokenizer callbacks ----
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._flush()
+        self._push(tag, attrs)
+        if tag in _EMPTY_ELEMENT_TAGS:
+            self._pop(tag)
+            self._already_closed.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._flush()
+        self._push(tag, attrs)
+        self._pop(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+            return
+        self._flush()
+        self._pop(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def handle_entityref(self, name: str) -> None:
+        character = _ENTITIES.get(name)
+        self._data.append(character if character is not None else f"&{name}")
+
+    def handle_charref(self, name: str) -> None:
+        base = 10
+        pattern = _DECIMAL_REFERENCE_RE
+        if name.startswith(("x", "X")):
+            name = name[1:]
+            base = 16
+            pattern = _HEX_REFERENCE_RE
+
+        extra = ""
+        number: int | None = None
+        try:
+            number = int(name, base)
+        except ValueError:
+            match = pattern.search(name)
+            if match is not None:
+                number = int(match.group(1), base)
+                extra = match.group(2)
+
+        if number is None:
+            self._data.append(name)
+            return
+        self._data.append(_numeric_reference(number))
+        self._data.append(extra)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush()
+
+    def handle_decl(self, decl: str) -> None:
+        self._flush()
+
+    def handle_pi(self, data: str) -> None:
+        self._flush()
+
+    def unknown_decl(self, data: str) -> None:
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._data.append(data[len("CDATA[") :])
+            self._flush(cdata=True)
+
+    # ---- Tree tracking ----
+
+    def _push(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        role: object = None
+        if self._in_content:
+            if tag in JUNK_TAGS:
+                role = _JUNK
+                self._junk_depth += 1
+            elif tag in TEXT_TAGS and not self._junk_depth:
+                role = _Section()
+                self._open_sections.append(role)
+                self._pending.append(role)
+            if tag == "a" and not self._junk_depth:
+                href = dict(attrs).get("href")
+                if href:
+                    self.links.append(href)
+        elif not self.found and tag == "div" and self._is_content(attrs):
+            role = _CONTENT
+            self.found = self._in_content = True
+
+        if tag in _STRING_CONTAINER_TAGS:
+            self._containers += 1
+        self._open[tag] = self._open.get(tag, 0) + 1
+        self._stack.append((tag, role))
+
+    def _pop(self, tag: str, all_tags: bool = False) -> None:
+        """Closes the most recent open `tag` and everything opened after it."""
+        if not self._open.get(tag):
+            return
+
+        closed_content = closed_section = False
+        while self._stack:
+            name, role = self._stack.pop()
+            self._open[name] -= 1
+            if name in _STRING_CONTAINER_TAGS:
+                self._containers -= 1
+
+            if role is _JUNK:
+                self._junk_depth -= 1
+            elif role is _CONTENT:
+                self._in_content = False
+                closed_content = True
+            elif isinstance(role, _Section):
+                role.closed = True
+                self._open_sections.pop()
+                closed_section = True
+
+            if name == tag and not all_tags:
+                break
+
+        if closed_section:
+            self._drain()
+        if closed_content:
+            raise _Done
+
+    def _flush(self, cdata: bool = False) -> None:
+        """Ends the current string and adds it to the open sections."""
+        if not self._data:
+            return
+        if (
+            not self._open_sections
+            or self._junk_depth
+            or (self._containers and not cdata)
+        ):
+            self._data.clear()
+            return
+
+        text = "".join(self._data).strip()
+        self._data.clear()
+        if not text:
+            return
+
+        for section in self._open_sections:
+            section.add(text)
+
+        # The oldest pending section is always open here; once it alone
+        # exceeds the budget, the result is final.
+        if self._chars + self._pending[0].length > self.max_chars:
+            self._truncate()
+
+    def _drain(self) -> None:
+        """Emits completed sections in document order."""
+        while self._pending and self._pending[0].closed:
+            text = " ".join(self._pending.popleft().parts)
+            if self._chars + len(text) > self.max_chars:
+                self._truncate()
+            self.sections.append(text)
+            self._chars += len(text)
+
+    def _truncate(self) -> None:
+        self.sections.append(TRUNCATION_MARKER)
+        raise _Done
+
+    @staticmethod
+    def _is_content(attrs: list[tuple[str, str | None]]) -> bool:
+        value = None
+        for key, attr_value in attrs:
+            if key == "class":
+                value = attr_value or ""  # The last duplicate wins
+        return value is not None and CONTENT_CLASS in _CLASS_VALUE_RE.findall(value)
+
+
+def stream_sections(html: str, max_chars: int = 4000) -> list[str] | None:
+    """
+    Extracts the text sections of a documentation page without building a tree.
+
+    Args:
+        html: The raw HTML of the page.
+        max_chars: Character budget of the extracted text. Defaults to 4000.
+
+    Returns:
+        The extracted sections, or None if the page has no `doc-content`
+        container (callers should then fall back to the BeautifulSoup backend).
+    """
+    page = stream_page(html, max_chars)
+    return page[0] if page is not None else None
+
+
+def stream_page(html: str, max_chars: int = 4000) -> tuple[list[str], list[str]] | None:
+    """
+    Extracts the text sections and link targets of a documentation page.
+
+    Args:
+        html: The raw HTML of the page.
+        max_chars: Character budget of the extracted text. Defaults to 4000.
+
+    Returns:
+        The extracted sections and the raw `href` values of the content links
+        read before extraction stopped, or None if the page has no
+        `doc-content` container.
+    """
+    if CONTENT_CLASS not in html:
+        return None
+
+    extractor = StreamingExtractor(max_chars)
+    extractor.feed(html)
+    extractor.close()
+    return (extractor.sections, extractor.links) if extractor.found else None
@@ -0,0 +1,273 @@
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+from .config import logger
+
+"""
+Persistent HTTP response cache for the MQL5 MCP Server.
+
+This module stores response bodies on disk (SQLite, zlib-compressed) together with
+their validators, so that a restarted server starts warm and unchanged pages can be
+revalidated with a conditional request instead of downloaded again.
+"""
+
+
+def request_key(url: str, params: Mapping[str, Any] | None = None) -> str:
+    """
+    Builds the cache key of a GET request.
+
+    Args:
+        url: The request URL.
+        params: Optional query parameters; their order does not matter.
+
+    Returns:
+        The URL with its parameters appended in sorted order.
+    """
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+def parse_cache_control(header: str | None) -> dict[str, str | None]:
+    """
+    Parses a Cache-Control header into its directives.
+
+    Args:
+        header: The raw header value, or None.
+
+    Returns:
+        A dictionary mapping lowercase directive names to their value (or None).
+    """
+    directives: dict[str, str | None] = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else None
+    return directives
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body with its freshness and validators."""
+
+    body: str
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """Returns True if the response can be served without revalidation."""
+        return (now if now is not None else time.time()) < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Returns the conditional request headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """
+    SQLite-backed store of HTTP responses keyed by request.
+
+    Freshness follows the response's Cache-Control (`no-store`, `no-cache`,
+    `max-age`) or Expires header, falling back to `default_ttl`. Methods are
+    blocking and thread-safe; async callers should run them in a worker thread.
+    """
+
+    def __init__(
+        self, path: Path, default_ttl: float = 86400.0, max_entries: int = 5000
+    ) -> None:
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            path: Location of the SQLite database file.
+            default_ttl: Freshness lifetime, in seconds, for responses without
+                explicit caching headers. Defaults to one day.
+            max_entries: Maximum number of stored responses; the oldest are
+                pruned beyond it. Defaults to 5000.
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stores = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Returns the stored response for `key`, fresh or stale.
+
+        Args:
+            key: The request key (see `request_key`).
+
+        Returns:
+            The stored response, or None if there is none.
+        """
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT body, etag, last_modified, expires_at "
+                    "FROM responses WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        body, etag, last_modified, expires_at = row
+        return CachedResponse(
+            body=zlib.decompress(body).decode("utf-8"),
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=expires_at,
+        )
+
+    def store(self, key: str, body: str, headers: Mapping[str, str]) -> None:
+        """
+        Stores a 200 response, unless its headers forbid it.
+
+        Args:
+            key: The request key (see `request_key`).
+            body: The decoded response body.
+            headers: The response headers.
+        """
+        expires_at = self._expires_at(headers)
+        if expires_at is None:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, etag, last_modified, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    zlib.compress(body.encode("utf-8")),
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    time.time(),
+                    expires_at,
+                ),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+            self.stores += 1
+
+    def revalidated(self, key: str, headers: Mapping[str, str]) -> None:
+        """
+        Extends the freshness of a stored response after a 304 Not Modified.
+
+        Args:
+            key: The request key (see `request_key`).
+            headers: The headers of the 304 response.
+        """
+        expires_at = self._expires_at(headers)
+        with self._lock:
+            conn = self._connect()
+            if expires_at is None:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            else:
+                conn.execute(
+                    "UPDATE responses SET expires_at = ?, stored_at = ?, "
+                    "etag = COALESCE(?, etag), "
+                    "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                    (
+                        expires_at,
+                        time.time(),
+                        headers.get("ETag"),
+                        headers.get("Last-Modified"),
+                        key,
+                    ),
+                )
+            conn.commit()
+            self.revalidations += 1
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns cache counters.
+
+        Returns:
+            A dictionary with hit, miss, revalidation and store counts.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "stores": self.stores,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, "
+                "last_modified TEXT, stored_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_stored_at "
+                "ON responses (stored_at)"
+            )
+            logger.debug("HTTP cache opened", extra={"url": str(self.path)})
+        return self._conn
+
+    def _expires_at(self, headers: Mapping[str, str]) -> float | None:
+        """Returns the expiry timestamp, or None if the response is not storable."""
+        now = time.time()
+        directives = parse_cache_control(headers.get("Cache-Control"))
+
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return now  # Stored, but always revalidated before use
+
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                return now + max(0, int(max_age))
+            except ValueError:
+                pass
+
+        expires = headers.get("Expires")
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return now  # Invalid Expires means already expired
+
+        return now + self.default_ttl
@@ -0,0 +1,293 @@
+import bisect
+import math
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+"""
+In-process metrics for the MQL5 MCP Server.
+
+This module keeps counters and latency histograms in memory and renders them in
+the Prometheus text exposition format, or as a summary with percentiles. Values
+owned by other components (cache counters, queue depths) are read at render time
+through collectors, so they are not counted twice.
+"""
+
+# Histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    math.inf,
+)
+
+Labels = tuple[tuple[str, str], ...]
+# A collected sample: metric name, labels, value
+Sample = tuple[str, dict[str, Any], float]
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile by linear interpolation within its bucket.
+
+        Args:
+            q: The quantile, between 0 and 1.
+
+        Returns:
+            The estimate, or 0 if nothing was observed. Values in the last
+            (infinite) bucket are reported as the largest finite bound.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i else 0.0
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-2]
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, histograms and collectors.
+
+    Metric names follow Prometheus conventions (`_total` for counters,
+    `_seconds`/`_bytes` units). Each distinct set of labels is a separate series.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._help: dict[str, str] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Sets the HELP text of a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name: The metric name.
+            value: The increment. Defaults to 1.
+            **labels: The series labels.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Records a value in a histogram.
+
+        Args:
+            name: The metric name.
+            value: The observed value (seconds for durations).
+            **labels: The series labels.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Registers a function returning gauge samples, called at render time.
+
+        Args:
+            collector: Returns (name, labels, value) tuples.
+        """
+        self._collectors.append(collector)
+
+    def reset(self) -> None:
+        """Clears counters and histograms. Collectors are kept."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+
+        Returns:
+            The exposition text, ending with a newline.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for name, counters in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for labels, value in sorted(counters.items()):
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+
+            for name, histograms in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for labels, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket = _format_labels(
+                            labels + (("le", _format_value(bound)),)
+                        )
+                        lines.append(f"{name}_bucket{bucket} {cumulative}")
+                    suffix = _format_labels(labels)
+                    lines.append(f"{name}_sum{suffix} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        gauges: dict[str, list[tuple[Labels, float]]] = {}
+        for name, sample_labels, value in self._collect():
+            gauges.setdefault(name, []).append((_labels(sample_labels), value))
+        for name, samples in sorted(gauges.items()):
+            self._header(lines, name, "gauge")
+            for key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Returns all metrics as plain data, with histogram percentiles.
+
+        Returns:
+            A dictionary with `counters`, `histograms` (count, sum, p50, p90 and
+            p99 per series) and `gauges`, each keyed by name then by label string.
+        """
+        with self._lock:
+            counters = {
+                name: {_format_labels(k): v for k, v in sorted(series.items())}
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: {
+                    _format_labels(k): {
+                        "count": h.count,
+                        "sum": h.sum,
+                        "p50": h.quantile(0.5),
+                        "p90": h.quantile(0.9),
+                        "p99": h.quantile(0.99),
+                    }
+                    for k, h in sorted(series.items())
+                }
+                for name, series in sorted(self._histograms.items())
+            }
+
+        gauges: dict[str, dict[str, float]] = {}
+        for name, sample_labels, value in self._collect():
+            key = _format_labels(_labels(sample_labels))
+            gauges.setdefault(name, {})[key] = value
+        return {"counters": counters, "histograms": histograms, "gauges": gauges}
+
+    def _collect(self) -> list[Sample]:
+        samples: list[Sample] = []
+        for collector in self._collectors:
+            try:
+                samples.extend(collector())
+            except Exception:
+                continue  # A broken collector must not break the endpoint
+        return samples
+
+    def _header(self, lines: list[str], name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+metrics = MetricsRegistry()
+metrics.describe("mql5_stage_duration_seconds", "Duration of each pipeline stage.")
+metrics.describe("mql5_stage_total", "Completed pipeline stages by outcome.")
+metrics.describe("mql5_http_responses_total", "HTTP responses by host and status.")
+metrics.describe("mql5_http_errors_total", "HTTP requests failed without response.")
+metrics.describe("mql5_http_body_bytes_total", "Decoded response body bytes read.")
+metrics.describe("mql5_rate_limit_waits_total", "Requests delayed by the limiter.")
+metrics.describe(
+    "mql5_rate_limit_wait_seconds", "Time spent waiting for the rate limiter."
+)
+
+
+async def start_metrics_server(
+    registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464
+) -> Any:
+    """
+    Serves `registry.render()` at `/metrics` over HTTP.
+
+    Args:
+        registry: The registry to expose.
+        host: Interface to bind. Defaults to localhost only.
+        port: TCP port. Defaults to 9464.
+
+    Returns:
+        The running `aiohttp.web.AppRunner`; call its `cleanup()` to stop.
+    """
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,168 @@
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from .config import logger
+
+"""
+Speculative prefetching of linked documentation pages for the MQL5 MCP Server.
+
+Documentation pages link to the pages agents tend to ask for next (`OrderSend` to
+`MqlTradeRequest` to `ENUM_TRADE_REQUEST_ACTIONS`). After a search, this module
+loads the first links of the returned page into the page cache in the background,
+while live traffic is idle, and counts how many of them are later requested.
+"""
+
+
+class Prefetcher:
+    """
+    Low-priority background loader of pages linked from recent results.
+
+    `schedule()` queues the first `top_k` uncached links of a page. A single
+    background task loads queued pages one at a time, newest first, waiting for
+    `is_idle()` before each one. When the queue is full, the oldest predictions
+    are dropped. `record()` reports client page lookups, so that hits on
+    prefetched pages can be counted.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[Any]],
+        is_cached: Callable[[str], bool],
+        is_idle: Callable[[], bool],
+        top_k: int = 3,
+        max_queue: int = 16,
+        max_tracked: int = 256,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Initialize the prefetcher.
+
+        Args:
+            load: Coroutine function loading one page URL into the cache.
+            is_cached: Returns True if a URL is cached or already loading.
+            is_idle: Returns True when a page may be prefetched now.
+            top_k: Links queued per page. Defaults to 3.
+            max_queue: Maximum number of queued URLs. Defaults to 16.
+            max_tracked: Maximum number of prefetched, not yet requested URLs
+                remembered for hit counting. Defaults to 256.
+            poll_interval: Seconds between idle checks. Defaults to 1.
+        """
+        self.load = load
+        self.is_cached = is_cached
+        self.is_idle = is_idle
+        self.top_k = top_k
+        self.max_tracked = max_tracked
+        self.poll_interval = poll_interval
+
+        self._queue: deque[str] = deque(maxlen=max_queue)
+        self._unused: OrderedDict[str, None] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+        self.scheduled = 0
+        self.dropped = 0
+        self.prefetched = 0
+        self.skipped = 0
+        self.failed = 0
+        self.hits = 0
+        self.forgotten = 0
+
+    def schedule(self, links: Iterable[str]) -> int:
+        """
+        Queues the first `top_k` links that are neither cached nor queued.
+
+        Must be called from the event loop; starts the background task if needed.
+
+        Args:
+            links: Candidate page URLs, most relevant first.
+
+        Returns:
+            The number of URLs queued.
+        """
+        queued = 0
+        for url in links:
+            if queued >= self.top_k:
+                break
+            if url in self._queue or self.is_cached(url):
+                continue
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1  # The oldest prediction falls off the deque
+            self._queue.append(url)
+            queued += 1
+
+        self.scheduled += queued
+        if queued and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+        return queued
+
+    def record(self, url: str, cache_hit: bool) -> None:
+        """
+        Reports a client lookup of a page.
+
+        Args:
+            url: The page URL.
+            cache_hit: Whether the page was served from the cache.
+        """
+        if url not in self._unused:
+            return
+        del self._unused[url]
+        if cache_hit:
+            self.hits += 1
+
+    def close(self) -> None:
+        """Cancels the background task and clears the queue."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._queue.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns prefetch counters.
+
+        `hit_ratio` is the share of prefetched pages that were later served to a
+        client from the cache.
+
+        Returns:
+            A dictionary with queue, outcome and hit counters.
+        """
+        return {
+            "queued": len(self._queue),
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "prefetched": self.prefetched,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "hits": self.hits,
+            "unused": len(self._unused),
+            "forgotten": self.forgotten,
+            "hit_ratio": self.hits / self.prefetched if self.prefetched else 0.0,
+        }
+
+    async def _run(self) -> None:
+        while self._queue:
+            while not self.is_idle():
+                await asyncio.sleep(self.poll_interval)
+            if not self._queue:
+                return
+
+            url = self._queue.pop()
+            if self.is_cached(url):
+                self.skipped += 1
+                continue
+            try:
+                await self.load(url)
+            except Exception as e:
+                self.failed += 1
+                logger.debug(
+                    "Prefetch failed",
+                    extra={"operation": "prefetch", "url": url, "error": str(e)},
+                )
+                continue
+
+            self.prefetched += 1
+            self._unused[url] = None
+            if len(self._unused) > self.max_tracked:
+                self._unused.popitem(last=False)
+                self.forgotten += 1
@@ -0,0 +1,156 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .config import logger
+
+"""
+Failure handling for upstream requests of the MQL5 MCP Server.
+
+This module provides the retry backoff schedule and a per-host circuit breaker.
+After repeated failures the breaker opens and requests to that host are refused
+without touching the network, so a failing upstream is not hammered and callers
+can fall back to stale cached content straight away.
+"""
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the host's breaker is open."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Returns the wait before a retry, with exponential backoff and full jitter.
+
+    Args:
+        attempt: Number of the retry, from 1.
+        base: Backoff of the first retry, in seconds.
+        cap: Maximum backoff, in seconds.
+
+    Returns:
+        A random delay between 0 and `min(cap, base * 2 ** (attempt - 1))`.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+@dataclass
+class _Circuit:
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probing: bool = False
+    probe_at: float = 0.0
+    opened: int = 0
+    rejected: int = 0
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    A host's circuit opens after `failure_threshold` consecutive failures. While
+    open, `allow()` refuses requests. After `reset_timeout` seconds one probe
+    request is let through (half open): its success closes the circuit, its
+    failure opens it again for another `reset_timeout`. A probe that reports
+    neither (e.g. cancelled) is replaced after another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open a circuit.
+                Defaults to 5.
+            reset_timeout: Seconds a circuit stays open before a probe.
+                Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits: dict[str, _Circuit] = {}
+
+    def state(self, host: str) -> str:
+        """Returns the state of the host's circuit: closed, open or half_open."""
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            return CLOSED
+        if circuit.state == OPEN and self._reset_due(circuit):
+            return HALF_OPEN
+        return circuit.state
+
+    def allow(self, host: str) -> bool:
+        """
+        Whether a request to `host` may be sent now.
+
+        Args:
+            host: The host name.
+
+        Returns:
+            False while the circuit is open, or half open with a probe in flight.
+        """
+        circuit = self._circuits.setdefault(host, _Circuit())
+        if circuit.state == CLOSED:
+            return True
+        if circuit.state == OPEN and self._reset_due(circuit):
+            circuit.state = HALF_OPEN
+        if circuit.state == HALF_OPEN and (
+            not circuit.probing
+            or time.monotonic() - circuit.probe_at >= self.reset_timeout
+        ):
+            circuit.probing = True
+            circuit.probe_at = time.monotonic()
+            return True
+
+        circuit.rejected += 1
+        return False
+
+    def record_success(self, host: str) -> None:
+        """Reports a successful request, closing the host's circuit."""
+        circuit = self._circuits.setdefault(host, _Circuit())
+        if circuit.state != CLOSED:
+            logger.info(f"Circuit closed for {host}", extra={"operation": "breaker"})
+        circuit.state = CLOSED
+        circuit.failures = 0
+        circuit.probing = False
+
+    def record_failure(self, host: str) -> None:
+        """Reports a failed request, opening the circuit past the threshold."""
+        circuit = self._circuits.setdefault(host, _Circuit())
+        circuit.failures += 1
+        if circuit.state == HALF_OPEN or (
+            circuit.state == CLOSED and circuit.failures >= self.failure_threshold
+        ):
+            circuit.state = OPEN
+            circuit.opened_at = time.monotonic()
+            circuit.probing = False
+            circuit.opened += 1
+            logger.warning(
+                f"Circuit opened for {host}",
+                extra={"operation": "breaker", "error": f"{circuit.failures} failures"},
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns per-host breaker counters.
+
+        Returns:
+            A dictionary mapping each host to its state, consecutive failures,
+            times opened and rejected requests.
+        """
+        return {
+            host: {
+                "state": self.state(host),
+                "failures": circuit.failures,
+                "opened": circuit.opened,
+                "rejected": circuit.rejected,
+            }
+            for host, circuit in self._circuits.items()
+        }
+
+    def _reset_due(self, circuit: _Circuit) -> bool:
+        return time.monotonic() - circuit.opened_at >= self.reset_timeout
@@ -1,6 +1,24 @@
-from typing import Any
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urldefrag, urljoin
 
-from bs4 import BeautifulSoup
+from .config import DOCS_BASE_URL, EXTRACTION_BACKEND
+from .html_stream import (
+    JUNK_TAGS,
+    TEXT_TAGS,
+    TRUNCATION_MARKER,
+    StreamingExtractor,
+    stream_page,
+)
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from .sections import DocSection
 
 """
 Web scraping logic for MQL5 documentation.
@@ -9,15 +27,227 @@ This module handles parsing HTML content, extracting relevant text, and cleaning
 unwanted elements to provide clean context for the LLM.
 """
 
+# "bs4" builds a full BeautifulSoup tree (reference); "stream" reads the page
+# with a tree-less tokenizer and stops at the character budget.
+EXTRACTION_BACKENDS = ("bs4", "stream")
+
+NO_CONTENT_MESSAGE = "Page found, no extractable content"
+
+
+def truncate_sections(sections: tuple[str, ...], max_chars: int) -> list[str]:
+    """
+    Applies a character budget to a page's full list of sections.
+
+    Gives the same result as extracting the page with that budget.
+
+    Args:
+        sections: All sections of the page, in order.
+        max_chars: Character budget.
+
+    Returns:
+        The leading sections that fit, followed by the truncation marker if
+        any section was dropped.
+    """
+    kept = []
+    char_count = 0
+    for text in sections:
+        if char_count + len(text) > max_chars:
+            kept.append(TRUNCATION_MARKER)
+            break
+        kept.append(text)
+        char_count += len(text)
+    return kept
+
+
+def doc_links(hrefs: Iterable[str], page_url: str = DOCS_BASE_URL) -> tuple[str, ...]:
+    """
+    Resolves link targets to the documentation pages they point to.
+
+    Args:
+        hrefs: Raw `href` values, in document order.
+        page_url: URL of the page the links were found on; links back to it are
+            dropped. Defaults to the docs root.
+
+    Returns:
+        The distinct absolute documentation URLs, without fragments, in order of
+        first appearance.
+    """
+    page_url, _ = urldefrag(page_url)
+    links: dict[str, None] = {}
+    for href in hrefs:
+        link, _ = urldefrag(urljoin(page_url, href))
+        if link.startswith(DOCS_BASE_URL + "/") and "?" not in link:
+            links.setdefault(link, None)
+    links.pop(page_url, None)
+    return tuple(links)
+
+
+@dataclass(frozen=True)
+class ParsedPage:
+    """
+    The cleaned text of a page, independent of any character limit.
+
+    `sections` is None if the page has no content container. `links` holds the
+    other documentation pages linked from the content, in order of appearance.
+    A page read only up to a character budget has that `budget`, and holds the
+    sections (and links) that fit in it; a complete page has no budget.
+    """
+
+    sections: tuple[str, ...] | None
+    links: tuple[str, ...] = ()
+    budget: int | None = None
+
+    @property
+    def title(self) -> str:
+        """The first section of the page, its `h1` heading."""
+        return self.sections[0] if self.sections else ""
+
+    @cached_property
+    def outline(self) -> tuple["DocSection", ...]:
+        """
+        The page split into summary, signature, parameters, return value,
+        notes, example and see-also sections, built on first use and kept with
+        the cached page.
+        """
+        # Imported here: the sections module depends on this one
+        from .sections import split_sections
+
+        return split_sections(self.sections[1:] if self.sections else ())
+
+    def covers(self, max_chars: int) -> bool:
+        """Whether `render(max_chars)` gives the same text as the full page."""
+        return self.budget is None or max_chars <= self.budget
+
+    def render(self, max_chars: int = 4000) -> str:
+        """
+        Formats the page text within a character budget.
+
+        Args:
+            max_chars: Maximum number of characters to return. Defaults to 4000.
+                For a partial page, only budgets it `covers` are exact.
+
+        Returns:
+            The same text as `MQL5Scraper.extract_content` with that budget.
+        """
+        return "\n\n".join(self.blocks(max_chars))
+
+    def blocks(self, max_chars: int = 4000) -> list[str]:
+        """
+        Returns the sections of the page that fit in a character budget.
+
+        Args:
+            max_chars: Character budget. Defaults to 4000.
+
+        Returns:
+            The blocks that `render` joins: the leading sections and the
+            truncation marker, or the no-content message.
+        """
+        if self.sections is None:
+            return [NO_CONTENT_MESSAGE]
+
+        kept = truncate_sections(self.sections, max_chars)
+        if self.budget is not None and kept[-1:] != [TRUNCATION_MARKER]:
+            # Sections past the budget were never read
+            kept.append(TRUNCATION_MARKER)
+        return kept
+
+
+class PageReader:
+    """
+    Incremental extraction of a page received in chunks.
+
+    Feed the decoded chunks in order; `feed` returns True as soon as the rest of
+    the page is not needed, either because the content container was closed or
+    because `max_chars` of text were extracted. Then call `page()`.
+
+    Pages without a `doc-content` container are read completely and kept, so
+    that they can be parsed with `MQL5Scraper.parse_page` instead.
+    """
+
+    def __init__(self, url: str = DOCS_BASE_URL, max_chars: int = 4000) -> None:
+        """
+        Initialize the reader.
+
+        Args:
+            url: The page URL, used to resolve relative links. Defaults to the
+                docs root.
+            max_chars: Character budget of the extracted text. Defaults to 4000.
+        """
+        self.url = url
+        self.max_chars = max_chars
+        self._extractor = StreamingExtractor(max_chars)
+        self._chunks: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether the extraction is complete."""
+        return self._extractor.done and self._extractor.found
+
+    def feed(self, text: str) -> bool:
+        """
+        Extracts text from the next chunk of the page.
+
+        Args:
+            text: The chunk, decoded.
+
+        Returns:
+            True if no further input is needed.
+        """
+        self._extractor.feed(text)
+        if self._extractor.found:
+            self._chunks.clear()  # No fallback needed
+        else:
+            self._chunks.append(text)
+        return self.done
+
+    def page(self) -> ParsedPage | None:
+        """
+        Ends the input and returns the extracted page.
+
+        Returns:
+            The page, partial if it was cut at `max_chars`, or None if it has no
+            `doc-content` container; parse `html` with the scraper then.
+        """
+        self._extractor.close()
+        if not self._extractor.found:
+            return None
+
+        sections = self._extractor.sections
+        links = doc_links(self._extractor.links, self.url)
+        if sections[-1:] == [TRUNCATION_MARKER]:
+            return ParsedPage(tuple(sections[:-1]), links, budget=self.max_chars)
+        return ParsedPage(tuple(sections), links)
+
+    @property
+    def html(self) -> str:
+        """The input read so far, while no content container was found."""
+        return "".join(self._chunks)
+
 
 class MQL5Scraper:
     """
     Logic for extracting content from MQL5 pages.
 
     Uses BeautifulSoup to parse HTML and extract the main content text,
-    applying cleaning strategies to remove clutter.
+    applying cleaning strategies to remove clutter. The "stream" backend produces
+    the same text without building a tree, and falls back to BeautifulSoup for
+    pages without a `doc-content` container.
     """
 
+    def __init__(self, backend: str = EXTRACTION_BACKEND) -> None:
+        """
+        Initialize the scraper.
+
+        Args:
+            backend: Extraction backend, one of `EXTRACTION_BACKENDS`.
+
+        Raises:
+            ValueError: If the backend is unknown.
+        """
+        if backend not in EXTRACTION_BACKENDS:
+            raise ValueError(f"Unknown extraction backend: {backend}")
+        self.backend = backend
+
     def extract_content(self, html_content: str, max_chars: int = 4000) -> str:
         """
         Extracts and cleans the main content of the page.
@@ -30,35 +260,100 @@ class MQL5Scraper:
             A cleaned string containing the page's main text content,
             truncated if necessary. Returns a fallback message if no content is found.
         """
+        sections = self.extract_sections(html_content, max_chars)
+        if sections is None:
+            return NO_CONTENT_MESSAGE
+
+        return "\n\n".join(sections)
+
+    def parse_page(self, html_content: str, url: str = DOCS_BASE_URL) -> ParsedPage:
+        """
+        Extracts all sections and links of the page, for caching and later
+        truncation.
+
+        Args:
+            html_content: The raw HTML string.
+            url: The page URL, used to resolve relative links. Defaults to the
+                docs root.
+
+        Returns:
+            The parsed page; use `ParsedPage.render` to apply a character limit.
+        """
+        with tracer.span("scraper.parse", html_chars=len(html_content)) as span:
+            sections, hrefs = self._extract(html_content, max_chars=sys.maxsize)
+            page = ParsedPage(
+                tuple(sections) if sections is not None else None,
+                doc_links(hrefs, url),
+            )
+            span.set(sections=len(sections or ()), links=len(page.links))
+            return page
+
+    def extract_sections(
+        self, html_content: str, max_chars: int = 4000
+    ) -> list[str] | None:
+        """
+        Extracts the text of each heading, paragraph and code block, in order.
+
+        Args:
+            html_content: The raw HTML string.
+            max_chars: Character budget. Sections are dropped from the first one
+                that would exceed it, and a truncation marker is appended.
+
+        Returns:
+            The list of section texts, or None if no content container is found.
+        """
+        sections, _ = self._extract(html_content, max_chars)
+        return sections
+
+    def _extract(
+        self, html_content: str, max_chars: int
+    ) -> tuple[list[str] | None, list[str]]:
+        """Returns the sections and the raw link targets of the content."""
+        if self.backend == "stream":
+            page = stream_page(html_content, max_chars)
+            if page is not None:
+                return page
+        return self._soup_page(html_content, max_chars)
+
+    def _soup_page(
+        self, html_content: str, max_chars: int
+    ) -> tuple[list[str] | None, list[str]]:
+        """Reference extraction on a full BeautifulSoup tree."""
+        from bs4 import BeautifulSoup  # Slow to import; only needed as fallback
+
         doc_soup = BeautifulSoup(html_content, "html.parser")
         content_div = self._find_content_div(doc_soup)
 
         if not content_div:
-            return "Page found, no extractable content"
+            return None, []
 
         # Cleaning
-        for junk in content_div(
-            ["script", "style", "nav", "footer", "header", "form", "aside", "iframe"]
-        ):
+        for junk in content_div(list(JUNK_TAGS)):
             junk.decompose()
 
+        hrefs = [
+            a["href"]
+            for a in content_div.find_all("a", href=True)
+            if isinstance(a["href"], str) and a["href"]
+        ]
+
         # Extract text
         sections = []
         char_count = 0
 
-        for elem in content_div.find_all(["h1", "h2", "h3", "p", "pre"]):
+        for elem in content_div.find_all(list(TEXT_TAGS)):
             text = elem.get_text(separator=" ", strip=True)
 
             if char_count + len(text) > max_chars:
-                sections.append("\n[truncated]")
+                sections.append(TRUNCATION_MARKER)
                 break
 
             sections.append(text)
             char_count += len(text)
 
-        return "\n\n".join(sections)
+        return sections, hrefs
 
-    def _find_content_div(self, soup: BeautifulSoup) -> Any:
+    def _find_content_div(self, soup: "BeautifulSoup") -> Any:
         """
         Robust strategies to find content.
 
@@ -1,95 +1,382 @@
+import functools
+import heapq
 import json
+import re
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 
-from .config import logger
+from .config import JSON_BACKEND, RANK_MODULE_WEIGHTS, RANK_WEIGHTS, logger
+from .doc_index import DocIndex, load_doc_index, query_terms
+from .symbols import SymbolIndex
+from .tracing import tracer
 
 """
 Search logic for MQL5 documentation.
 
 This module processes search results from the MQL5 API, filtering and prioritizing
-official documentation links to provide the most relevant information.
+official documentation links to provide the most relevant information. It can also
+answer queries from the exact-symbol table and the offline docs index, without any
+network round trip.
 """
 
+RANK_FEATURES = ("exact", "prefix", "overlap", "module", "depth")
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+
+@functools.cache
+def json_decoder(backend: str = JSON_BACKEND) -> Callable[[str | bytes], Any]:
+    """
+    Returns the JSON decoder of a backend.
+
+    "orjson" parses the raw bytes of a response without decoding them to a
+    string first, several times faster than the standard library. "auto" uses
+    it when it is installed (`mcp-server-mql5[fast]`) and falls back to
+    `json.loads`. Both raise `json.JSONDecodeError` on invalid input.
+
+    Args:
+        backend: One of `JSON_BACKENDS`.
+
+    Returns:
+        A function decoding a JSON document from `str` or `bytes`.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If "orjson" is requested but not installed.
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    if backend != "json":
+        try:
+            import orjson
+        except ImportError:
+            if backend == "orjson":
+                raise
+        else:
+            return orjson.loads
+    return json.loads
+
+
+@dataclass(frozen=True)
+class RankedResult:
+    """A search API result with its score and the features it was scored on."""
+
+    url: str
+    title: str
+    module: str
+    score: float
+    features: dict[str, float]
+
+
+class ResultRanker:
+    """
+    Scores search API results for one query.
+
+    The query (normalized term, and a pattern of its words) and the weights are
+    prepared once; `rank` then computes every feature of each result in a
+    single pass:
+
+    - exact: the page name (title before " - ") or URL slug is the term.
+    - prefix: the page name or slug starts with the term, e.g. `OrderSendAsync`
+      for `OrderSend`, if not exact.
+    - overlap: share of the query words found in the title.
+    - module: weight of the result's module, e.g. docs over forum.
+    - depth: number of URL path segments, subtracted.
+    """
+
+    def __init__(
+        self,
+        search_term: str,
+        weights: Mapping[str, float] = RANK_WEIGHTS,
+        module_weights: Mapping[str, float] = RANK_MODULE_WEIGHTS,
+    ) -> None:
+        """
+        Initialize the ranker.
+
+        Args:
+            search_term: The searched term; case, whitespace and a trailing
+                `()` are ignored.
+            weights: Weight of each of `RANK_FEATURES`.
+            module_weights: Weight per module, by the last part of its name
+                (`docs` for `mql5.com.en.docs`); other modules weigh 0.
+
+        Raises:
+            ValueError: If a feature has no weight.
+        """
+        missing = [feature for feature in RANK_FEATURES if feature not in weights]
+        if missing:
+            raise ValueError(f"No ranking weight for {', '.join(missing)}")
+        term = " ".join(search_term.split()).casefold()
+        self.term = term.removesuffix("()")
+        words = query_terms(term)
+        self.word_count = len(words)
+        # Finds the query words in a lowercased title, as whole words
+        self.words_re = re.compile(
+            rf"(?<!\w)(?:{'|'.join(map(re.escape, words))})(?!\w)"
+        )
+        self.weights = tuple(weights[feature] for feature in RANK_FEATURES)
+        self.module_weights = dict(module_weights)
+
+    def rank(self, results: Iterable[Any], top_k: int = 5) -> list[RankedResult]:
+        """
+        Ranks search API results.
+
+        Args:
+            results: The `results` items of an API response. Items without a
+                URL are skipped.
+            top_k: Number of results to return. Defaults to 5.
+
+        Returns:
+            The best results, highest score first; ties keep the API order.
+        """
+        term, word_count = self.term, self.word_count
+        find_words, module_weights = self.words_re.findall, self.module_weights
+        w_exact, w_prefix, w_overlap, w_module, w_depth = self.weights
+
+        scored = []
+        for position, result in enumerate(results):
+            info = result.get("info") if isinstance(result, dict) else None
+            if not isinstance(info, dict):
+                continue
+            url = info.get("url")
+            if not url or not isinstance(url, str):
+                continue
+            title = info.get("title")
+            title = title if isinstance(title, str) else ""
+            module = str(result.get("module") or "")
+
+            name = title.partition(" - ")[0].strip().casefold()
+            slug = url.rstrip("/").rpartition("/")[2].casefold()
+            exact = 1.0 if term and term in (name, slug) else 0.0
+            prefix = (
+                1.0
+                if term
+                and not exact
+                and (name.startswith(term) or slug.startswith(term))
+                else 0.0
+            )
+            overlap = (
+                len(set(find_words(title.casefold()))) / word_count
+                if word_count
+                else 0.0
+            )
+            module_weight = module_weights.get(module.rpartition(".")[2], 0.0)
+            depth = float(max(url.count("/") - 2, 0))
+
+            score = (
+                w_exact * exact
+                + w_prefix * prefix
+                + w_overlap * overlap
+                + w_module * module_weight
+                - w_depth * depth
+            )
+            features = (exact, prefix, overlap, module_weight, depth)
+            scored.append((score, -position, url, title, module, features))
+
+        return [
+            RankedResult(url, title, module, score, dict(zip(RANK_FEATURES, features)))
+            for score, _, url, title, module, features in heapq.nlargest(
+                top_k, scored, key=lambda item: (item[0], item[1])
+            )
+        ]
+
 
 class MQL5Searcher:
     """
-    Logic to search MQL5 documentation using its API.
+    Logic to search MQL5 documentation using its API or the offline index.
 
     Handles response parsing and result selection, favoring documentation modules
     over forum posts or code base entries.
     """
 
-    def find_best_match_api(self, json_response: str, search_term: str) -> str | None:
+    def __init__(
+        self,
+        doc_index: DocIndex | None = None,
+        index_path: Path | None = None,
+        symbol_index: SymbolIndex | None = None,
+    ) -> None:
+        """
+        Initialize the searcher.
+
+        Args:
+            doc_index: An already loaded offline index.
+            index_path: Location of an offline index to load with
+                `load_index` or on first local search, if `doc_index` is not
+                given.
+            symbol_index: Optional exact-symbol table (function, enum, struct
+                and constant names to URLs).
+        """
+        self.doc_index = doc_index
+        self.index_path = index_path
+        self.symbol_index = symbol_index
+        self._index_loaded = doc_index is not None
+        self._index_lock = threading.Lock()
+
+    def find_exact_symbol(self, search_term: str) -> str | None:
+        """
+        Resolves an exact MQL5 identifier (e.g. `OrderSend`, `ENUM_TIMEFRAMES`)
+        to the page defining it.
+
+        Args:
+            search_term: The term to look up; case and a trailing `()` are ignored.
+
+        Returns:
+            The URL of the defining page, or None if the term is not a known
+            symbol or there is no symbol table.
+        """
+        if self.symbol_index is None:
+            return None
+
+        with tracer.span("searcher.symbol") as span:
+            entry = self.symbol_index.lookup(search_term)
+            span.set(found=entry is not None)
+        if entry is None:
+            return None
+
+        logger.info(
+            "Best match found via symbol index",
+            extra={
+                "search_term": search_term,
+                "url": entry.url,
+                "symbol_kind": entry.kind,
+            },
+        )
+        return entry.url
+
+    def find_best_match_local(self, search_term: str) -> str | None:
+        """
+        Answers a query from the offline docs index.
+
+        Only confident matches are returned: the best page must contain every
+        word of the query. Otherwise the caller should fall back to the API.
+        Blocking (the index is loaded on first use and queries take
+        milliseconds): async callers should run it in a worker thread.
+
+        Args:
+            search_term: The term to search for.
+
+        Returns:
+            The URL of the best matching page, or None if there is no index or
+            no confident match.
+        """
+        index = self.load_index()
+        if index is None:
+            return None
+
+        with tracer.span("searcher.local_index") as span:
+            hits = index.search(search_term, limit=1)
+            span.set(hits=len(hits))
+        if not hits or hits[0].coverage < 1.0:
+            return None
+
+        best = hits[0]
+        logger.info(
+            "Best match found via local index",
+            extra={
+                "search_term": search_term,
+                "url": best.url,
+                "title": best.title,
+                "score": best.score,
+            },
+        )
+        return best.url
+
+    @property
+    def may_search_local(self) -> bool:
+        """
+        Whether `find_best_match_local` can return anything, without blocking.
+
+        True while an index at `index_path` has not been loaded yet, False once
+        it is known to be missing.
+        """
+        return self.doc_index is not None or (
+            not self._index_loaded and self.index_path is not None
+        )
+
+    def load_index(self) -> DocIndex | None:
+        """
+        Loads the offline index from `index_path`, once.
+
+        Blocking; safe to call from several threads, which then wait for the
+        same load.
+
+        Returns:
+            The index, or None if there is none.
+        """
+        with self._index_lock:
+            if not self._index_loaded:
+                if self.index_path is not None:
+                    self.doc_index = load_doc_index(self.index_path)
+                self._index_loaded = True
+        return self.doc_index
+
+    @staticmethod
+    def find_best_match_api(json_response: str | bytes, search_term: str) -> str | None:
         """
         Parses the JSON response from the MQL5 API and returns the best URL.
 
-        Prioritizes results from the documentation module. Falls back to other
-        modules if no documentation match is found.
+        All results are scored with `ResultRanker`: an exact page name beats a
+        prefix match (`OrderSend` over `OrderSendAsync`), and documentation
+        results beat other modules. This is a static method so it can be sent
+        to a process pool without the searcher's indexes.
 
         Args:
-            json_response: The raw JSON string returned by the API.
+            json_response: The raw JSON document returned by the API, as bytes
+                or a string.
             search_term: The term that was searched (for logging purposes).
 
         Returns:
             The URL of the best matching result, or None if no valid result is found
             or if parsing fails.
         """
-        try:
-            data = json.loads(json_response)
-            results = data.get("results", [])
-
-            if not results:
-                return None
-
-            # 1. Filter by documentation module if possible, or prioritize it
-            docs_results = [r for r in results if "docs" in r.get("module", "")]
-            other_results = [r for r in results if "docs" not in r.get("module", "")]
-
-            # Combine, prefer documentation
-            candidates = docs_results + other_results
-
-            if not candidates:
-                return None
-
-            # 2. Prefer candidates whose title contains the exact search term
-            best_match = None
-            search_lower = search_term.lower()
-            
-            for c in candidates:
-                title = c.get("info", {}).get("title", "").lower()
-                # Prioritize if the function/term exactly drops in the title
-                if search_lower in title:
-                    best_match = c
-                    break
-            
-            if not best_match:
-                best_match = candidates[0]
-
-            # Extract URL
-            info = best_match.get("info", {})
-            url = info.get("url")
+        with tracer.span("searcher.rank_api", response_size=len(json_response)) as span:
+            url = MQL5Searcher._best_match_api(json_response, search_term)
+            span.set(found=url is not None)
+            return url
 
-            if not url:
-                # Sometimes the URL might be constructed differently,
-                # but the API seems to return it in info.url
-                return None
-
-            if not isinstance(url, str):
-                return None
-
-            logger.info(
-                "Best match found via API",
-                extra={
-                    "search_term": search_term,
-                    "url": url,
-                    "title": info.get("title"),
-                },
-            )
+    @staticmethod
+    def rank_api(
+        json_response: str | bytes, search_term: str, top_k: int = 5
+    ) -> list[RankedResult]:
+        """
+        Ranks all results of a search API response for the term.
 
-            return url
+        Args:
+            json_response: The raw JSON document returned by the API, decoded
+                with the `JSON_BACKEND` decoder.
+            search_term: The term that was searched.
+            top_k: Number of results to return. Defaults to 5.
 
+        Returns:
+            The best results with their scores, highest first; empty if there
+            is no usable result or parsing fails.
+        """
+        try:
+            data = json_decoder()(json_response)
+            return ResultRanker(search_term).rank(data.get("results", []), top_k)
         except json.JSONDecodeError:
             logger.error("Failed to decode JSON response from search API")
-            return None
+            return []
         except Exception as e:
             logger.error(f"Error parsing search results: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    def _best_match_api(json_response: str | bytes, search_term: str) -> str | None:
+        ranked = MQL5Searcher.rank_api(json_response, search_term, top_k=1)
+        if not ranked:
             return None
+
+        best = ranked[0]
+        logger.info(
+            "Best match found via API",
+            extra={
+                "search_term": search_term,
+                "url": best.url,
+                "title": best.title,
+                "score": best.score,
+            },
+        )
+        return best.url
@@ -0,0 +1,268 @@
+import math
+import re
+from collections import defaultdict
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+
+from .doc_index import BM25_B, BM25_K1, index_terms, query_terms
+from .html_stream import TRUNCATION_MARKER
+from .scraper import NO_CONTENT_MESSAGE, ParsedPage, truncate_sections
+
+"""
+Section-aware retrieval for MQL5 documentation pages.
+
+Reference pages follow a fixed layout: a title, a description with the function
+prototype or structure definition, then labelled parts (Parameters, Return
+Value, Note, Example, See also). This module splits the cleaned text of a page
+into those parts, so that a caller can ask for specific parts, or for the parts
+that best match a query, instead of the first `max_chars` characters.
+"""
+
+SECTION_KINDS = (
+    "summary",
+    "signature",
+    "parameters",
+    "return_value",
+    "notes",
+    "example",
+    "see_also",
+)
+
+# Labels of the bold titles that start a part of a reference page
+SECTION_HEADINGS = {
+    "parameters": "parameters",
+    "fields description": "parameters",
+    "return value": "return_value",
+    "returned value": "return_value",
+    "note": "notes",
+    "notes": "notes",
+    "example": "example",
+    "examples": "example",
+    "see also": "see_also",
+}
+
+# Captions such as "Example of the TRADE_ACTION_DEAL trade operation ..."
+_EXAMPLE_CAPTION_RE = re.compile(r"^examples? of\b", re.IGNORECASE)
+_EXAMPLE_CAPTION_MAX_CHARS = 200
+
+# Code blocks are indented with non-breaking spaces: `bool\xa0\xa0PositionOpen(`,
+# `struct\xa0MqlTradeRequest`. Prose uses plain spaces.
+_SIGNATURE_RE = re.compile(
+    r"^(?:(?:const|static|virtual)\xa0+)?[\w&*]+\xa0+[&*]?\w+[\xa0 ]*\("
+    r"|^(?:struct|class|enum|union)\xa0+\w+"
+)
+
+
+@dataclass(frozen=True)
+class DocSection:
+    """One part of a page; `heading` is its label text, if it has one."""
+
+    kind: str
+    texts: tuple[str, ...]
+    heading: str | None = None
+
+    @property
+    def lines(self) -> tuple[str, ...]:
+        """The heading, if any, followed by the texts."""
+        return (self.heading, *self.texts) if self.heading else self.texts
+
+    @cached_property
+    def terms(self) -> dict[str, float]:
+        """Weighted index terms of the section, computed once."""
+        counts: dict[str, float] = defaultdict(float)
+        for line in self.lines:
+            for term, weight in index_terms(line):
+                counts[term] += weight
+        return dict(counts)
+
+
+def heading_kind(text: str) -> str | None:
+    """
+    Returns the kind of section a text starts, if it is a part label.
+
+    Args:
+        text: A heading or paragraph of the page.
+
+    Returns:
+        One of `SECTION_KINDS`, or None for ordinary text.
+    """
+    label = " ".join(text.split()).rstrip(":").casefold()
+    kind = SECTION_HEADINGS.get(label)
+    if kind is None and is_example_caption(text):
+        kind = "example"
+    return kind
+
+
+def is_example_caption(text: str) -> bool:
+    """Whether a text captions the code block that follows it."""
+    return len(text) <= _EXAMPLE_CAPTION_MAX_CHARS and bool(
+        _EXAMPLE_CAPTION_RE.match(text)
+    )
+
+
+def split_sections(texts: Sequence[str]) -> tuple[DocSection, ...]:
+    """
+    Splits the text of a page, title excluded, into sections.
+
+    Text before the first part label is the summary, except code blocks that
+    declare a function or structure, which form the signature. Each label then
+    starts a section that runs to the next label. An example caption only
+    labels the code block after it: the text that follows belongs to the
+    section before the caption.
+
+    Args:
+        texts: The page sections as extracted by the scraper, without the title.
+
+    Returns:
+        The non-empty sections: summary, signature, then the labelled sections
+        in document order.
+    """
+    summary: list[str] = []
+    signature: list[str] = []
+    parts: list[tuple[str, str, list[str]]] = []  # Kind, heading, texts
+    part: tuple[str, str, list[str]] | None = None
+    resume: tuple[str, str, list[str]] | None = None
+    captioned = False
+
+    for text in texts:
+        if text == TRUNCATION_MARKER:
+            continue
+        kind = heading_kind(text)
+        if kind is not None:
+            captioned = is_example_caption(text)
+            resume = part
+            part = (kind, text, [])
+            parts.append(part)
+        elif part is not None:
+            part[2].append(text)
+            if captioned:
+                part, captioned = resume, False
+        elif _SIGNATURE_RE.match(text):
+            signature.append(text)
+        else:
+            summary.append(text)
+
+    sections = [
+        DocSection("summary", tuple(summary)),
+        DocSection("signature", tuple(signature)),
+        *(DocSection(kind, tuple(body), heading) for kind, heading, body in parts),
+    ]
+    return tuple(section for section in sections if section.lines)
+
+
+def rank_sections(
+    sections: Sequence[DocSection], query: str
+) -> list[tuple[DocSection, float]]:
+    """
+    Ranks the sections of one page for a query with BM25.
+
+    Args:
+        sections: The candidate sections.
+        query: The query, e.g. `filling mode` or `return value`.
+
+    Returns:
+        The sections that match any query term with their scores, best first.
+    """
+    terms = {term for term, _ in index_terms(query)}
+    if not terms or not sections:
+        return []
+
+    lengths = [sum(section.terms.values()) for section in sections]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    scores = [0.0] * len(sections)
+    for term in terms:
+        matching = [i for i, section in enumerate(sections) if term in section.terms]
+        if not matching:
+            continue
+        idf = math.log(
+            1 + (len(sections) - len(matching) + 0.5) / (len(matching) + 0.5)
+        )
+        for i in matching:
+            tf = sections[i].terms[term]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / avg_length)
+            scores[i] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    ranked = [(sections[i], score) for i, score in enumerate(scores) if score > 0]
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
+
+
+def focus_section(section: DocSection, query: str) -> tuple[str, ...]:
+    """
+    Keeps the lines of a section that match a query.
+
+    Parameters and fields are listed as a name followed by its description: a
+    matching name is kept with the description after it, and a matching
+    description with the name before it.
+
+    Args:
+        section: The section to shorten.
+        query: The query.
+
+    Returns:
+        The heading, if any, and the matching texts with their context, in
+        order.
+    """
+    words = set(query_terms(query))
+    keep: set[int] = set()
+    for i, text in enumerate(section.texts):
+        if any(term in words for term, _ in index_terms(text)):
+            keep.add(i)
+            keep.add(i + 1 if len(text.split()) == 1 else max(i - 1, 0))
+    texts = tuple(section.texts[i] for i in sorted(keep) if i < len(section.texts))
+    return (section.heading, *texts) if section.heading else texts
+
+
+def select_sections(
+    page: ParsedPage,
+    kinds: Collection[str] | None = None,
+    query: str | None = None,
+    max_chars: int = 4000,
+) -> list[str]:
+    """
+    Selects the parts of a page by kind and/or query.
+
+    Args:
+        page: A complete parsed page.
+        kinds: If given, only sections of these kinds are returned, in
+            document order.
+        query: If given, the sections matching it are returned best first. A
+            section that does not fit in the remaining budget is reduced to its
+            lines that match the query. If no section matches, the sections
+            are returned in document order.
+        max_chars: Maximum number of characters of section text. Defaults to
+            4000.
+
+    Returns:
+        The text blocks: the page title, the selected sections and the list of
+        the page's section kinds, or a message if no section has one of `kinds`.
+    """
+    if page.sections is None:
+        return [NO_CONTENT_MESSAGE]
+
+    available = "Sections: " + ", ".join(dict.fromkeys(s.kind for s in page.outline))
+    candidates = [s for s in page.outline if not kinds or s.kind in kinds]
+    if not candidates:
+        return [page.title, f"No {', '.join(kinds or ())} section", available]
+    if query:
+        ranked = rank_sections(candidates, query)
+        if ranked:
+            candidates = [section for section, _ in ranked]
+
+    lines: list[str] = []
+    budget = remaining = max_chars - len(page.title)
+    for section in candidates:
+        if remaining <= 0:
+            break
+        section_lines = section.lines
+        if query and sum(map(len, section_lines)) > remaining:
+            section_lines = focus_section(section, query) or section_lines
+        lines.extend(section_lines)
+        remaining -= sum(map(len, section_lines))
+
+    kept = truncate_sections((page.title, *lines), max_chars)
+    if kept == [page.title, TRUNCATION_MARKER]:
+        # A long first section, e.g. a structure definition, is cut, not dropped
+        kept.insert(1, lines[0][:budget])
+    return [*kept, available]
@@ -0,0 +1,96 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+"""
+Single-flight loading for the MQL5 MCP Server.
+
+This module runs at most one load per key at a time, and lets concurrent callers
+for the same key await that load instead of starting their own. It is shared by
+the result caches and the HTTP client.
+"""
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Loads in progress, keyed by what they load.
+
+    Each load runs in its own task, so that a cancelled caller does not cancel
+    it for the others. Its result, or exception, goes to every caller. A load
+    started on another event loop is not joined; a new one is started instead.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether `key` is being loaded."""
+        return key in self._tasks
+
+    def join(
+        self, key: Hashable, loader: Callable[[], Awaitable[T]]
+    ) -> tuple[Awaitable[T], bool]:
+        """
+        Joins the load of `key` in progress, or starts it with `loader`.
+
+        Args:
+            key: What is loaded.
+            loader: Zero-argument coroutine factory, called if no load of `key`
+                is in progress.
+
+        Returns:
+            An awaitable of the load's result, and True if a load in progress
+            was joined rather than started.
+        """
+        task = self._tasks.get(key)
+        joined = task is not None and task.get_loop() is asyncio.get_running_loop()
+        if task is None or not joined:
+            task = self.start(key, loader)
+        # Shield so that a cancelled caller does not cancel the shared load
+        return asyncio.shield(task), joined
+
+    def start(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[T]],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> asyncio.Task[T]:
+        """
+        Starts loading `key` in a task, for callers that do not wait for it.
+
+        Args:
+            key: What is loaded.
+            loader: Zero-argument coroutine factory.
+            on_error: Called with the exception if the load fails.
+
+        Returns:
+            The task running the load.
+        """
+
+        async def load() -> T:
+            return await loader()
+
+        task = asyncio.ensure_future(load())
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t, on_error))
+        return task
+
+    def _on_done(
+        self,
+        key: Hashable,
+        task: asyncio.Task[T],
+        on_error: Callable[[BaseException], None] | None,
+    ) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and on_error is not None:
+            on_error(error)
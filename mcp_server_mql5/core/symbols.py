@@ -0,0 +1,309 @@
+import mmap
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .config import DOCS_BASE_URL, logger
+from .scraper import MQL5Scraper
+
+"""
+Exact-symbol index of the MQL5 documentation.
+
+This module maps every documented function, enum, struct and constant to its
+canonical doc URL. The table is stored as a compact sorted binary file that is
+memory-mapped and binary-searched, so lookups cost microseconds and loading it
+costs nothing at startup.
+"""
+
+# File layout: header, uint32 offset table, then records of
+# "key\tsymbol\tkind\tpath" in key order (UTF-8). Paths are relative to the
+# URL prefix stored in the header.
+_MAGIC = b"MQL5SYM1"
+_HEADER = struct.Struct("<8sII")  # magic, record count, prefix length
+_OFFSET = struct.Struct("<I")
+
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_PAREN_IDENTIFIER_RE = re.compile(r"\(([A-Za-z_][A-Za-z0-9_]*)\)\s*$")
+_STRUCT_RE = re.compile(r"^\s*(?:struct|class)\s+([A-Za-z_][A-Za-z0-9_]*)")
+_CONSTANT_RE = re.compile(r"^[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)+$")
+
+# Lower rank wins when a symbol is defined on several pages
+_KIND_RANK = {"function": 0, "struct": 0, "enum": 1, "heading": 2, "constant": 3}
+
+
+def normalize_symbol(term: str) -> str:
+    """
+    Normalizes a query or symbol name into its lookup key.
+
+    Args:
+        term: A symbol as typed, e.g. `OrderSend()` or ` ordersend `.
+
+    Returns:
+        The case-folded name without surrounding whitespace or call parentheses.
+    """
+    term = term.strip()
+    if term.endswith("()"):
+        term = term[:-2]
+    return term.casefold()
+
+
+@dataclass
+class SymbolEntry:
+    """A documented symbol and the page that defines it."""
+
+    symbol: str
+    kind: str
+    url: str
+
+
+def extract_symbols(html: str, scraper: MQL5Scraper) -> list[tuple[str, str]]:
+    """
+    Returns the symbols defined by a documentation page.
+
+    Definitions are recognized from the page title, struct/class signatures,
+    identifier headings (e.g. `ENUM_TIMEFRAMES`, `OnTick`) and the first column
+    of enumeration tables.
+
+    Args:
+        html: The raw HTML of the page.
+        scraper: Scraper used to locate the content container.
+
+    Returns:
+        A list of (symbol, kind) tuples.
+    """
+    # Index building only: bs4 is not imported by the server at startup
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    content = scraper._find_content_div(soup)
+    if not content:
+        return []
+
+    symbols: list[tuple[str, str]] = []
+    h1 = content.find("h1")
+    if h1:
+        title = h1.get_text(" ", strip=True)
+        match = _PAREN_IDENTIFIER_RE.search(title)
+        if _IDENTIFIER_RE.match(title):
+            symbols.append((title, "function"))
+        elif match:
+            symbols.append((match.group(1), "struct"))
+
+    pre = content.find("pre")
+    if pre:
+        match = _STRUCT_RE.match(pre.get_text(" ", strip=True))
+        if match:
+            symbols.append((match.group(1), "struct"))
+
+    for heading in content.find_all(["h2", "h3"]) + content.find_all(
+        "p", class_="p_BoldTitles"
+    ):
+        text = heading.get_text(" ", strip=True)
+        if text.startswith("ENUM_") and _IDENTIFIER_RE.match(text):
+            symbols.append((text, "enum"))
+        elif _IDENTIFIER_RE.match(text) and any(c.isupper() for c in text[1:]):
+            # Mixed-case identifiers only, to skip "Parameters", "Note", ...
+            symbols.append((text, "heading"))
+
+    for row in content.find_all("tr"):
+        cell = row.find("td")
+        if cell:
+            text = cell.get_text(" ", strip=True)
+            if _CONSTANT_RE.match(text):
+                symbols.append((text, "constant"))
+
+    return symbols
+
+
+class SymbolIndexBuilder:
+    """
+    Collects symbol definitions across pages and writes the binary index.
+    """
+
+    def __init__(self, scraper: MQL5Scraper | None = None) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            scraper: Scraper used to locate content. Defaults to a new one.
+        """
+        self.scraper = scraper or MQL5Scraper()
+        self.entries: dict[str, SymbolEntry] = {}
+
+    def add_page(self, url: str, html: str) -> int:
+        """
+        Adds the symbols defined by a page.
+
+        Args:
+            url: The canonical URL of the page.
+            html: The raw HTML of the page.
+
+        Returns:
+            The number of symbols recorded from this page.
+        """
+        added = 0
+        for symbol, kind in extract_symbols(html, self.scraper):
+            key = normalize_symbol(symbol)
+            current = self.entries.get(key)
+            if current is None or _KIND_RANK[kind] < _KIND_RANK[current.kind]:
+                self.entries[key] = SymbolEntry(symbol, kind, url)
+                added += 1
+        return added
+
+    def save(self, path: Path, prefix: str = DOCS_BASE_URL + "/") -> None:
+        """
+        Writes the symbol table in the memory-mappable format.
+
+        Args:
+            path: Destination file; parent directories are created.
+            prefix: URL prefix stripped from every stored URL.
+        """
+        records = []
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            url = entry.url
+            path_part = url[len(prefix) :] if url.startswith(prefix) else "\x00" + url
+            records.append(
+                "\t".join((key, entry.symbol, entry.kind, path_part)).encode("utf-8")
+            )
+
+        encoded_prefix = prefix.encode("utf-8")
+        header_size = _HEADER.size + len(encoded_prefix)
+        offsets_size = _OFFSET.size * (len(records) + 1)
+
+        offsets = []
+        position = header_size + offsets_size
+        for record in records:
+            offsets.append(position)
+            position += len(record)
+        offsets.append(position)  # End sentinel
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(records), len(encoded_prefix)))
+            f.write(encoded_prefix)
+            for offset in offsets:
+                f.write(_OFFSET.pack(offset))
+            for record in records:
+                f.write(record)
+
+
+class SymbolIndex:
+    """
+    Read-only, memory-mapped symbol table with binary-search lookups.
+
+    The file is mapped on first lookup; a missing file simply yields no hits.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            path: The file written by `SymbolIndexBuilder.save`.
+        """
+        self.path = path
+        self._map: mmap.mmap | None = None
+        self._opened = False
+        self._count = 0
+        self._prefix = ""
+        self._offsets_at = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def lookup(self, term: str) -> SymbolEntry | None:
+        """
+        Finds the page defining a symbol.
+
+        Args:
+            term: The symbol as typed by the user (case-insensitive).
+
+        Returns:
+            The matching entry, or None if the term is not a known symbol.
+        """
+        entry = self._find(normalize_symbol(term)) if self._open() else None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns lookup counters.
+
+        Returns:
+            A dictionary with symbol count, hits, misses and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "symbols": self._count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Unmaps the file. The next lookup maps it again."""
+        if self._map is not None:
+            self._map.close()
+        self._map = None
+        self._opened = False
+
+    def _open(self) -> bool:
+        if not self._opened:
+            self._opened = True
+            try:
+                with open(self.path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, count, prefix_length = _HEADER.unpack_from(mapped, 0)
+                if magic != _MAGIC:
+                    mapped.close()
+                    raise ValueError(f"Not a symbol index: {self.path}")
+            except FileNotFoundError:
+                return False
+            except Exception as e:
+                logger.error("Failed to open symbol index", extra={"error": str(e)})
+                return False
+
+            self._map = mapped
+            self._count = count
+            self._prefix = mapped[_HEADER.size : _HEADER.size + prefix_length].decode(
+                "utf-8"
+            )
+            self._offsets_at = _HEADER.size + prefix_length
+            logger.info(
+                f"Symbol index mapped ({count} symbols)", extra={"url": str(self.path)}
+            )
+        return self._map is not None
+
+    def _record(self, i: int) -> bytes:
+        assert self._map is not None
+        start, end = struct.unpack_from(
+            "<II", self._map, self._offsets_at + i * _OFFSET.size
+        )
+        return self._map[start:end]
+
+    def _find(self, key: str) -> SymbolEntry | None:
+        target = key.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            record_key = record[: record.index(b"\t")]
+            if record_key < target:
+                lo = mid + 1
+            elif record_key > target:
+                hi = mid
+            else:
+                _, symbol, kind, path = record.decode("utf-8").split("\t")
+                url = path[1:] if path.startswith("\x00") else self._prefix + path
+                return SymbolEntry(symbol, kind, url)
+        return None
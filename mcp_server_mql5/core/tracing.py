@@ -0,0 +1,277 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .config import TRACE_ENABLED, TRACE_MAX_SPANS
+
+"""
+Tracing spans for the MQL5 MCP Server.
+
+A span times one step of a request (search API call, page download, parse,
+render) and records its parent, so a search can be broken down into nested
+steps. The current span is kept in a context variable: it follows the request
+across `await`s, tasks and thread workers. Finished spans are kept in a bounded
+buffer and can be exported as a Chrome trace (chrome://tracing, Perfetto) or as
+OpenTelemetry (OTLP/JSON) spans.
+"""
+
+EXPORT_FORMATS = ("chrome", "otlp")
+
+
+@dataclass
+class Span:
+    """One timed step; `parent_id` is None for the root of a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        """Adds attributes, e.g. byte sizes known only at the end of the step."""
+        self.attributes.update(attributes)
+
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "mql5_current_span", default=None
+)
+
+
+def current_span() -> Span | None:
+    """Returns the innermost open span of the running request, if any."""
+    return _current.get()
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+def _now_ns() -> int:
+    # Wall-clock start for export, monotonic clock for the duration
+    return time.time_ns()
+
+
+class Tracer:
+    """
+    Collects finished spans in a ring buffer of `max_spans`.
+
+    Spans are opened with `span()`. Steps timed by a third party (e.g. aiohttp
+    connection events) are added after the fact with `record()`.
+    """
+
+    def __init__(self, max_spans: int = 10_000, enabled: bool = True) -> None:
+        """
+        Initialize the tracer.
+
+        Args:
+            max_spans: Finished spans kept; the oldest are dropped first.
+                Defaults to 10,000.
+            enabled: If False, spans are still opened (so attributes can be
+                set unconditionally) but never recorded. Defaults to True.
+        """
+        self.enabled = enabled
+        self._spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Generator[Span, None, None]:
+        """
+        Times a block as a child of the current span.
+
+        Args:
+            name: The step name, e.g. `http.get`.
+            **attributes: Initial span attributes.
+
+        Yields:
+            The open span; use `Span.set` to add attributes before it ends.
+        """
+        parent = _current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else _new_id(16),
+            span_id=_new_id(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=_now_ns(),
+            attributes=attributes,
+        )
+        start = time.perf_counter_ns()
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = span.start_ns + time.perf_counter_ns() - start
+            if self.enabled:
+                self._finish(span)
+
+    def record(
+        self, name: str, start_ns: int, end_ns: int, **attributes: Any
+    ) -> Span | None:
+        """
+        Adds a finished child of the current span.
+
+        Args:
+            name: The step name.
+            start_ns: Wall-clock start, from `time.time_ns()`.
+            end_ns: Wall-clock end, from `time.time_ns()`.
+            **attributes: Span attributes.
+
+        Returns:
+            The recorded span, or None if tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        parent = _current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else _new_id(16),
+            span_id=_new_id(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=start_ns,
+            end_ns=end_ns,
+            attributes=attributes,
+        )
+        self._finish(span)
+        return span
+
+    def spans(self) -> list[Span]:
+        """Returns the buffered finished spans, oldest first."""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        """Drops all buffered spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def export(self, path: Path, fmt: str = "chrome") -> int:
+        """
+        Writes the buffered spans to a JSON file.
+
+        Args:
+            path: The output file; parent directories are created.
+            fmt: `chrome` for the Chrome trace event format, or `otlp` for
+                OpenTelemetry JSON. Defaults to `chrome`.
+
+        Returns:
+            The number of spans written.
+
+        Raises:
+            ValueError: If `fmt` is not a supported format.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown trace format: {fmt}")
+
+        spans = self.spans()
+        data = chrome_trace(spans) if fmt == "chrome" else otlp_trace(spans)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return len(spans)
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+
+def chrome_trace(spans: list[Span]) -> dict[str, Any]:
+    """
+    Converts spans to the Chrome trace event format.
+
+    Each trace gets its own row (`tid`), so the steps of one search are shown
+    nested under its root span.
+    """
+    rows: dict[str, int] = {}
+    events = []
+    for span in sorted(spans, key=lambda s: s.start_ns):
+        args = dict(span.attributes, span_id=span.span_id, parent_id=span.parent_id)
+        if span.error:
+            args["error"] = span.error
+        events.append(
+            {
+                "name": span.name,
+                "cat": "mql5",
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": 1,
+                "tid": rows.setdefault(span.trace_id, len(rows) + 1),
+                "args": args,
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_trace(spans: list[Span]) -> dict[str, Any]:
+    """Converts spans to the OpenTelemetry (OTLP/JSON) trace format."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {
+                            "key": "service.name",
+                            "value": {"stringValue": "mcp-server-mql5"},
+                        }
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "mcp_server_mql5"},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                "parentSpanId": span.parent_id or "",
+                                "name": span.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(span.start_ns),
+                                "endTimeUnixNano": str(span.end_ns),
+                                "attributes": [
+                                    {"key": key, "value": _otlp_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": (
+                                    {"code": 2, "message": span.error}
+                                    if span.error
+                                    else {"code": 1}
+                                ),
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+tracer = Tracer(max_spans=TRACE_MAX_SPANS, enabled=TRACE_ENABLED)
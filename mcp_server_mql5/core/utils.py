@@ -1,108 +1,303 @@
+import asyncio
+import logging
 import time
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from contextlib import contextmanager
-from threading import Lock
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+from urllib.parse import urlsplit
 
-from .config import logger
+from .config import RATE_LIMIT_PER_HOST, RATE_LIMIT_PER_MINUTE, logger
+from .metrics import metrics
+from .tracing import tracer
 
 """
 Utility functions and classes for the MQL5 MCP Server.
 
-This module includes helpers for rate limiting and execution time logging.
+This module includes helpers for rate limiting, execution time logging (which
+also feeds the stage latency metrics and tracing spans) and lazy singletons.
 """
 
+T = TypeVar("T")
+
 # ==================== RATE LIMITER ====================
 
 
+def host_of(url: str) -> str:
+    """
+    Returns the host name of a URL, used as the rate limiting key.
+
+    Args:
+        url: An absolute URL.
+
+    Returns:
+        The lowercase host name, or an empty string if the URL has none.
+    """
+    return (urlsplit(url).hostname or "").lower()
+
+
+@dataclass
+class _Bucket:
+    rate: float  # tokens per second
+    capacity: float
+    tokens: float
+    updated: float
+    waiting: int = 0
+    max_waiting: int = 0
+    waits: int = 0
+    wait_seconds: float = 0.0
+
+
 class RateLimiter:
     """
-    Thread-safe rate limiter using a sliding window.
+    Asyncio token-bucket rate limiter with an independent bucket per host.
 
-    Ensures that an operation is not performed more than a specified number of times
-    within a one-minute window.
+    Callers `await wait_if_needed(host)`; when the bucket is empty the coroutine
+    sleeps on the event loop instead of blocking the thread. Each caller reserves
+    its slot immediately, so waiters are served in arrival order.
     """
 
-    def __init__(self, calls_per_minute: int = 10) -> None:
+    def __init__(
+        self,
+        calls_per_minute: int = 10,
+        host_limits: dict[str, int] | None = None,
+    ) -> None:
         """
         Initialize the rate limiter.
 
         Args:
-            calls_per_minute: Maximum allowed calls per minute. Defaults to 10.
+            calls_per_minute: Default allowed calls per minute for any host.
+                Defaults to 10.
+            host_limits: Optional calls-per-minute overrides keyed by host name.
         """
         self.calls_per_minute = calls_per_minute
-        self.calls: list[float] = []
-        self.lock = Lock()
+        self.host_limits = {k.lower(): v for k, v in (host_limits or {}).items()}
+        self._buckets: dict[str, _Bucket] = {}
+
+    async def wait_if_needed(self, host: str = "") -> float:
+        """
+        Waits until a call to `host` is allowed by its bucket.
+
+        Args:
+            host: The host the call is made to. Defaults to a shared bucket.
+
+        Returns:
+            The number of seconds this call waited.
+        """
+        bucket = self._bucket(host)
+        now = time.monotonic()
+        bucket.tokens = min(
+            bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate
+        )
+        bucket.updated = now
+
+        # Reserve the slot up front; a negative balance is the queue ahead of us
+        bucket.tokens -= 1
+        if bucket.tokens >= 0:
+            return 0.0
+
+        delay = -bucket.tokens / bucket.rate
+        bucket.waiting += 1
+        bucket.max_waiting = max(bucket.max_waiting, bucket.waiting)
+        bucket.waits += 1
+        metrics.inc("mql5_rate_limit_waits_total", host=host or "default")
+        logger.warning(
+            f"Rate limit reached for {host or 'default'}, waiting {delay:.2f}s",
+            extra={"url": host, "queue_depth": bucket.waiting},
+        )
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # Give the unused slot back to the callers queued behind us
+            bucket.tokens += 1
+            raise
+        finally:
+            bucket.waiting -= 1
+            # The time actually waited, shorter than `delay` if cancelled
+            waited = time.monotonic() - now
+            bucket.wait_seconds += waited
+            metrics.observe(
+                "mql5_rate_limit_wait_seconds", waited, host=host or "default"
+            )
+
+        return delay
+
+    def available(self, host: str = "") -> float:
+        """
+        Returns the number of calls `host` could make right now without waiting.
+
+        Args:
+            host: The host name. Defaults to the shared bucket.
+
+        Returns:
+            The current token balance; negative while callers are queued.
+        """
+        bucket = self._bucket(host)
+        elapsed = time.monotonic() - bucket.updated
+        return min(bucket.capacity, bucket.tokens + elapsed * bucket.rate)
 
-    def wait_if_needed(self) -> None:
+    def queue_depth(self, host: str | None = None) -> int:
         """
-        Blocks execution if the rate limit has been reached until a slot is available.
+        Returns the number of callers currently waiting for a slot.
+
+        Args:
+            host: Restrict the count to one host. Defaults to all hosts.
 
-        This method checks the history of calls in the last minute. If the limit
-        is exceeded, it sleeps for the necessary duration.
+        Returns:
+            The number of waiting callers.
         """
-        with self.lock:
-            now = time.time()
-            self.calls = [t for t in self.calls if now - t < 60]
+        if host is not None:
+            bucket = self._buckets.get(host.lower())
+            return bucket.waiting if bucket else 0
+        return sum(b.waiting for b in self._buckets.values())
 
-            if len(self.calls) >= self.calls_per_minute:
-                sleep_time = 60 - (now - self.calls[0])
-                if sleep_time > 0:
-                    logger.warning(
-                        f"Rate limit reached, sleeping {sleep_time:.2f}s",
-                        extra={"calls_in_window": len(self.calls)},
-                    )
-                    time.sleep(sleep_time)
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns per-host limiter counters.
 
-            self.calls.append(now)
+        Returns:
+            A dictionary keyed by host with limit, queue depth and wait totals.
+        """
+        return {
+            host or "default": {
+                "calls_per_minute": bucket.rate * 60,
+                "queue_depth": bucket.waiting,
+                "max_queue_depth": bucket.max_waiting,
+                "waits": bucket.waits,
+                "wait_seconds": bucket.wait_seconds,
+            }
+            for host, bucket in self._buckets.items()
+        }
+
+    def _bucket(self, host: str) -> _Bucket:
+        host = host.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            limit = self.host_limits.get(host, self.calls_per_minute)
+            bucket = _Bucket(
+                rate=limit / 60,
+                capacity=float(limit),
+                tokens=float(limit),
+                updated=time.monotonic(),
+            )
+            self._buckets[host] = bucket
+        return bucket
 
 
-limiter = RateLimiter(calls_per_minute=10)
+limiter = RateLimiter(
+    calls_per_minute=RATE_LIMIT_PER_MINUTE, host_limits=RATE_LIMIT_PER_HOST
+)
 
 # ==================== CONTEXT MANAGERS ====================
 
 
 @contextmanager
 def log_execution_time(
-    operation: str, **extra_fields: Any
+    operation: str, level: int = logging.INFO, **extra_fields: Any
 ) -> Generator[dict[str, Any], None, None]:
     """
     Context manager to measure and log the execution time of a block of code.
 
+    The block is also traced as a span named after the operation, with the
+    extra fields as attributes, and its duration is recorded in the
+    `mql5_stage_duration_seconds` histogram and counted by outcome.
+
     Args:
         operation: A name/description for the operation being measured.
+        level: Log level of the success record. Defaults to INFO; use DEBUG for
+            inner stages that mainly matter as metrics.
         **extra_fields: Additional key-value pairs to include in the log record.
 
     Yields:
         A dictionary containing the extra fields, which can be modified within
         the context to add more information to the final log.
     """
-    start = time.time()
+    start = time.perf_counter()
     log_data = extra_fields.copy()
 
-    try:
-        yield log_data
-        duration_ms = (time.time() - start) * 1000
-        logger.info(
-            f"{operation} completed in {duration_ms:.0f}ms",
-            extra={
-                "operation": operation,
-                "duration_ms": duration_ms,
-                "success": True,
-                **log_data,
-            },
-        )
-    except Exception as e:
-        duration_ms = (time.time() - start) * 1000
-        logger.error(
-            f"{operation} failed after {duration_ms:.0f}ms: {str(e)}",
-            extra={
-                "operation": operation,
-                "duration_ms": duration_ms,
-                "success": False,
-                "error": str(e),
-                **log_data,
-            },
-            exc_info=True,
-        )
-        raise
+    with tracer.span(operation) as span:
+        try:
+            yield log_data
+            duration = time.perf_counter() - start
+            duration_ms = duration * 1000
+            metrics.observe("mql5_stage_duration_seconds", duration, stage=operation)
+            metrics.inc("mql5_stage_total", stage=operation, outcome="success")
+            logger.log(
+                level,
+                f"{operation} completed in {duration_ms:.0f}ms",
+                extra={
+                    "operation": operation,
+                    "duration_ms": duration_ms,
+                    "success": True,
+                    "trace_id": span.trace_id,
+                    **log_data,
+                },
+            )
+        except Exception as e:
+            duration = time.perf_counter() - start
+            duration_ms = duration * 1000
+            metrics.observe("mql5_stage_duration_seconds", duration, stage=operation)
+            metrics.inc("mql5_stage_total", stage=operation, outcome="error")
+            logger.error(
+                f"{operation} failed after {duration_ms:.0f}ms: {str(e)}",
+                extra={
+                    "operation": operation,
+                    "duration_ms": duration_ms,
+                    "success": False,
+                    "error": str(e),
+                    "trace_id": span.trace_id,
+                    **log_data,
+                },
+                exc_info=True,
+            )
+            raise
+        finally:
+            span.set(**log_data)
+
+
+# ==================== LAZY SINGLETONS ====================
+
+
+class Lazy(Generic[T]):
+    """
+    Stands in for an object that is only created on first use.
+
+    Attribute access and assignment are forwarded to the object, which is
+    built by `factory` the first time it is needed. Used for singletons whose
+    construction imports slow dependencies, to keep them off the startup path.
+    Only `created` and underscore names are answered by the stand-in itself, so
+    that none of the object's public methods are shadowed.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        """
+        Initialize the stand-in.
+
+        Args:
+            factory: Builds the object on first use.
+        """
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+
+    @property
+    def created(self) -> bool:
+        """Whether the object has been built."""
+        return self._instance is not None
+
+    def _resolve(self) -> T:
+        """Returns the object, building it first if needed."""
+        instance: T | None = self._instance
+        if instance is None:
+            instance = self._factory()
+            object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def _discard(self) -> None:
+        """Forgets the object, so that the next use builds a new one."""
+        object.__setattr__(self, "_instance", None)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
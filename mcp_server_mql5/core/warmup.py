@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from .config import logger
+
+"""
+Background cache warm-up for the MQL5 MCP Server.
+
+This module preloads the caches with the most used documentation pages, at
+startup and optionally on a schedule. Terms come from a user-maintained file and
+from the searches recorded in past JSON logs. The warmer only proceeds while live
+traffic is idle, one term at a time, so it never competes with client requests.
+"""
+
+
+def load_terms_file(path: Path) -> list[str]:
+    """
+    Reads warm-up terms from a text file.
+
+    The file has one term per line; blank lines and lines starting with `#` are
+    ignored.
+
+    Args:
+        path: The file path.
+
+    Returns:
+        The terms in file order, or an empty list if the file does not exist.
+    """
+    if not path.is_file():
+        return []
+
+    terms = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            terms.append(line)
+    return terms
+
+
+def hot_terms_from_logs(log_dir: Path, limit: int, operation: str) -> list[str]:
+    """
+    Returns the most searched terms recorded in the JSON logs.
+
+    Reads the current and rotated `*.json.log*` files, counting the records of
+    `operation` by normalized term (whitespace collapsed, case folded).
+    Unreadable files and malformed lines are skipped.
+
+    Args:
+        log_dir: The log directory.
+        limit: Maximum number of terms to return.
+        operation: The `operation` field of the records to count.
+
+    Returns:
+        Up to `limit` terms, most searched first, in their most recent spelling.
+    """
+    counts: Counter[str] = Counter()
+    spelling: dict[str, str] = {}
+
+    # Oldest rotation first, so that later spellings win
+    files = sorted(
+        log_dir.glob("*.json.log*"),
+        key=lambda f: (f.name.split(".json.log")[0], -_rotation_number(f)),
+    )
+    for log_file in files:
+        try:
+            lines = log_file.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError as e:
+            logger.warning(
+                "Could not read log file", extra={"url": str(log_file), "error": str(e)}
+            )
+            continue
+
+        for line in lines:
+            if operation not in line:
+                continue  # Cheap pre-filter before JSON parsing
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict) or record.get("operation") != operation:
+                continue
+            term = record.get("search_term")
+            if not isinstance(term, str):
+                continue
+
+            key = " ".join(term.split()).casefold()
+            if key:
+                counts[key] += 1
+                spelling[key] = term.strip()
+
+    return [spelling[key] for key, _ in counts.most_common(limit)]
+
+
+def _rotation_number(path: Path) -> int:
+    suffix = path.name.rsplit(".", 1)[-1]
+    return int(suffix) if suffix.isdigit() else 0
+
+
+class CacheWarmer:
+    """
+    Low-priority background loader of frequently used terms.
+
+    Each round loads the current term list and warms one term at a time. Before
+    each term it waits until `is_idle()` reports no live traffic, so client
+    requests always go first and the warmer only spends spare rate limit budget.
+    """
+
+    def __init__(
+        self,
+        warm: Callable[[str], Awaitable[bool]],
+        terms: Callable[[], list[str]],
+        is_idle: Callable[[], bool],
+        interval: float = 0.0,
+        start_delay: float = 5.0,
+        poll_interval: float = 1.0,
+    ) -> None:
+        """
+        Initialize the warmer. Call `run()` in a background task to start it.
+
+        Args:
+            warm: Coroutine function loading one term into the caches. Returns
+                True if the term was already cached.
+            terms: Returns the terms to warm, most important first.
+            is_idle: Returns True when a term may be warmed now.
+            interval: Seconds between rounds; 0 runs a single round. Defaults to 0.
+            start_delay: Seconds to wait before the first round. Defaults to 5.
+            poll_interval: Seconds between idle checks. Defaults to 1.
+        """
+        self.warm = warm
+        self.terms = terms
+        self.is_idle = is_idle
+        self.interval = interval
+        self.start_delay = start_delay
+        self.poll_interval = poll_interval
+
+        self.rounds = 0
+        self.warmed = 0
+        self.already_cached = 0
+        self.failed = 0
+        self.idle_waits = 0
+        self.last_round_seconds = 0.0
+
+    async def run(self) -> None:
+        """Runs warm-up rounds until cancelled or, without an interval, once."""
+        await asyncio.sleep(self.start_delay)
+        while True:
+            await self.run_once()
+            if self.interval <= 0:
+                return
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> None:
+        """Warms every term of the current list once."""
+        start = time.monotonic()
+        try:
+            terms = await asyncio.to_thread(self.terms)
+        except Exception as e:
+            logger.error(
+                "Could not load warm-up terms",
+                extra={"operation": "warmup", "error": str(e)},
+            )
+            return
+
+        logger.info(
+            f"Cache warm-up started ({len(terms)} terms)",
+            extra={"operation": "warmup"},
+        )
+        for term in terms:
+            await self._wait_until_idle()
+            try:
+                if await self.warm(term):
+                    self.already_cached += 1
+                else:
+                    self.warmed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.debug(
+                    "Warm-up failed",
+                    extra={"operation": "warmup", "search_term": term, "error": str(e)},
+                )
+
+        self.rounds += 1
+        self.last_round_seconds = time.monotonic() - start
+        logger.info(
+            f"Cache warm-up completed in {self.last_round_seconds:.1f}s",
+            extra={"operation": "warmup", "warmup": self.stats()},
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns warm-up counters.
+
+        Returns:
+            A dictionary with completed rounds and per-term outcomes.
+        """
+        return {
+            "rounds": self.rounds,
+            "warmed": self.warmed,
+            "already_cached": self.already_cached,
+            "failed": self.failed,
+            "idle_waits": self.idle_waits,
+            "last_round_seconds": self.last_round_seconds,
+        }
+
+    async def _wait_until_idle(self) -> None:
+        while not self.is_idle():
+            self.idle_waits += 1
+            await asyncio.sleep(self.poll_interval)
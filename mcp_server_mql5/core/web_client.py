@@ -1,28 +1,235 @@
+import asyncio
+import codecs
 import random
-from typing import Any
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Literal, overload
 
 import aiohttp
 
-from .config import DEFAULT_HEADERS, USER_AGENTS, logger
+from .config import (
+    DEFAULT_HEADERS,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    HTTP_RETRY_MAX_BACKOFF,
+    HTTP_RETRY_STATUSES,
+    HTTP_STREAM_CHUNK_SIZE,
+    HTTP_TIMEOUT_CONNECT,
+    HTTP_TIMEOUT_READ,
+    HTTP_TIMEOUT_TOTAL,
+    USER_AGENTS,
+    logger,
+)
+from .http_cache import CachedResponse, HTTPCache, request_key
+from .metrics import metrics
+from .resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from .singleflight import SingleFlight
+from .tracing import Span, tracer
+from .utils import RateLimiter, host_of
 
 """
 HTTP Client for the MQL5 MCP Server.
 
 This module provides a robust HTTP client wrapper using aiohttp, featuring
-automatic User-Agent rotation, default headers, and error handling.
+a persistent pooled session, automatic User-Agent rotation, default headers,
+per-host rate limiting, coalescing of identical in-flight GETs, streaming reads
+with early termination, and error handling with retries, hedged requests and a
+circuit breaker.
 """
 
+# Errors worth retrying: connection failures and timeouts
+RETRY_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+@dataclass
+class _Response:
+    status: int
+    body: str | bytes
+    headers: Mapping[str, str]
+    bytes_read: int = 0
+
+
+class _FeedStarted(Exception):
+    """Wraps an error raised after part of a body was passed on."""
+
+
+def _retry_after(headers: Mapping[str, str]) -> float:
+    """Returns the Retry-After delay in seconds (0 if absent or a date)."""
+    try:
+        return min(float(headers.get("Retry-After", 0)), HTTP_RETRY_MAX_BACKOFF)
+    except ValueError:
+        return 0.0
+
 
 class WebClient:
     """
     Abstraction for HTTP client with User-Agent rotation and error handling.
 
     Provides simplified async methods for GET and POST requests, managing
-    sessions and headers automatically.
+    sessions and headers automatically. A single keep-alive session is shared by
+    all requests and must be released with `close()` on shutdown. Concurrent
+    GETs of the same URL and parameters share one request and its body.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | None = None,
+        http_cache: HTTPCache | None = None,
+        breaker: CircuitBreaker | None = None,
+        retries: int = HTTP_RETRIES,
+        hedge_delay: float = 0.0,
+    ) -> None:
+        """
+        Initialize the client.
+
+        Args:
+            rate_limiter: Optional limiter awaited before every network request,
+                keyed by the request's host.
+            http_cache: Optional persistent response cache used by `get`.
+            breaker: Optional circuit breaker consulted before every GET attempt.
+            retries: Retries of a failed GET. Defaults to `HTTP_RETRIES`.
+            hedge_delay: Seconds after which a slow GET is duplicated; 0
+                disables hedging. Defaults to 0.
+        """
         self.headers = DEFAULT_HEADERS.copy()
+        self.rate_limiter = rate_limiter
+        self.http_cache = http_cache
+        self.breaker = breaker
+        self.retries = retries
+        self.hedge_delay = hedge_delay
+        self.timeout = aiohttp.ClientTimeout(
+            total=HTTP_TIMEOUT_TOTAL,
+            connect=HTTP_TIMEOUT_CONNECT,
+            sock_read=HTTP_TIMEOUT_READ,
+        )
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+        # GETs in progress by (request key, raw), awaited by every caller
+        self._flights: SingleFlight[str | bytes | None] = SingleFlight()
+
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.bytes_read = 0
+        self.partial_reads = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.stale_served = 0
+        self.fetches = 0
+        self.coalesced = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared session, creating it on first use.
+
+        The session is bound to the running event loop; a new one is created if
+        the previous session was closed or belongs to another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._session_loop is not loop
+        ):
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            )
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+            trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+            trace_config.on_connection_create_start.append(self._on_connect_start)
+            trace_config.on_connection_create_end.append(self._on_connection_create)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, trace_configs=[trace_config]
+            )
+            self._session_loop = loop
+            logger.debug("HTTP session created")
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the shared session, its pooled connections and the disk cache."""
+        if self.http_cache is not None:
+            self.http_cache.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(
+                "HTTP session closed",
+                extra={
+                    "new_connections": self.new_connections,
+                    "reused_connections": self.reused_connections,
+                },
+            )
+        self._session = None
+        self._session_loop = None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns connection pool and failure handling counters.
+
+        Returns:
+            A dictionary with the number of new and reused connections, the body
+            bytes read by `get_partial` and its reads stopped before the end,
+            retries, hedged requests (and those that won), stale responses
+            served in place of failed requests, and GETs sent (`fetches`) or
+            joined to an identical one in progress (`coalesced`).
+        """
+        return {
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "bytes_read": self.bytes_read,
+            "partial_reads": self.partial_reads,
+            "retried": self.retried,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "stale_served": self.stale_served,
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+        }
+
+    async def _on_dns_start(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        ctx.dns_start = time.time_ns()
+
+    async def _on_dns_end(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        tracer.record("http.dns", ctx.dns_start, time.time_ns(), host=params.host)
+
+    async def _on_connect_start(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        ctx.connect_start = time.time_ns()
+
+    async def _on_connection_create(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        self.new_connections += 1
+        # TCP connect and TLS handshake, including DNS when not cached
+        tracer.record("http.connect", ctx.connect_start, time.time_ns())
+        logger.debug("HTTP connection created", extra={"connection": "new"})
+
+    async def _on_connection_reuse(
+        self, session: aiohttp.ClientSession, ctx: SimpleNamespace, params: Any
+    ) -> None:
+        self.reused_connections += 1
+        logger.debug("HTTP connection reused", extra={"connection": "reused"})
+
+    async def _throttle(self, url: str) -> None:
+        if self.rate_limiter is not None:
+            with tracer.span("rate_limit") as span:
+                span.set(wait_s=await self.rate_limiter.wait_if_needed(host_of(url)))
 
     def _get_headers(
         self, custom_headers: dict[str, str] | None = None
@@ -56,21 +263,22 @@ class WebClient:
         Raises:
             Exception: If a network error occurs (logged before raising).
         """
+        await self._throttle(url)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, data=data, json=json_data, headers=self._get_headers(headers)
-                ) as response:
-                    status = response.status
-                    # DDG sometimes returns 202 Accepted but with content
-                    if status not in (200, 202):
-                        logger.error(
-                            f"HTTP POST error: {status}",
-                            extra={"url": url, "status_code": status},
-                        )
-                        return None  # Or raise custom exception
-
-                    return await response.text()
+            session = self._get_session()
+            async with session.post(
+                url, data=data, json=json_data, headers=self._get_headers(headers)
+            ) as response:
+                status = response.status
+                # DDG sometimes returns 202 Accepted but with content
+                if status not in (200, 202):
+                    logger.error(
+                        f"HTTP POST error: {status}",
+                        extra={"url": url, "status_code": status},
+                    )
+                    return None  # Or raise custom exception
+
+                return await response.text()
         except Exception as e:
             logger.error(
                 f"Network error in POST {url}", extra={"error": str(e)}, exc_info=True
@@ -81,6 +289,15 @@ class WebClient:
         """
         Performs a GET request and returns the response text.
 
+        When a disk cache is configured, fresh cached responses are returned
+        without any network I/O, and stale ones are revalidated with a
+        conditional request. Timeouts, connection errors and retryable statuses
+        are retried with backoff, and a duplicate request is sent if the first
+        is slower than `hedge_delay`. If the upstream keeps failing or its
+        circuit is open, a stale cached response is returned instead. A call
+        made while the same GET is in progress waits for its result, or error,
+        instead of sending another request.
+
         Args:
             url: The target URL.
             params: Query parameters to append to the URL.
@@ -90,24 +307,409 @@ class WebClient:
             or returned a non-200 status code.
 
         Raises:
+            CircuitOpenError: If the host's circuit is open and nothing is cached.
             Exception: If a network error occurs (logged before raising).
         """
+        with tracer.span("http.get", url=url) as span:
+            return await self._get(url, params, span, raw=False)
+
+    async def get_bytes(
+        self, url: str, params: dict[str, Any] | None = None
+    ) -> bytes | None:
+        """
+        Performs a GET request and returns the raw response body.
+
+        Same as `get`, without decoding the body: meant for JSON responses that
+        are parsed from bytes. Bodies read from the disk cache are re-encoded
+        as UTF-8. Concurrent calls are coalesced separately from `get`.
+
+        Args:
+            url: The target URL.
+            params: Query parameters to append to the URL.
+
+        Returns:
+            The response body if successful, or None if the request failed
+            or returned a non-200 status code.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open and nothing is cached.
+            Exception: If a network error occurs (logged before raising).
+        """
+        with tracer.span("http.get", url=url) as span:
+            return await self._get(url, params, span, raw=True)
+
+    @overload
+    async def _get(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        span: Span,
+        raw: Literal[False],
+    ) -> str | None: ...
+
+    @overload
+    async def _get(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        span: Span,
+        raw: Literal[True],
+    ) -> bytes | None: ...
+
+    async def _get(
+        self, url: str, params: dict[str, Any] | None, span: Span, raw: bool
+    ) -> str | bytes | None:
+        result, joined = self._flights.join(
+            (request_key(url, params), raw),
+            lambda: self._fetch(url, params, span, raw),
+        )
+        if joined:
+            self.coalesced += 1
+            span.set(coalesced=True)
+            logger.debug("HTTP request coalesced", extra={"url": url})
+        else:
+            self.fetches += 1
+        return await result
+
+    async def _fetch(
+        self, url: str, params: dict[str, Any] | None, span: Span, raw: bool
+    ) -> str | bytes | None:
+        def cached_body(body: str) -> str | bytes:
+            return body.encode("utf-8") if raw else body
+
+        key = request_key(url, params)
+        cached = await self._cache_get(key)
+        if cached is not None and cached.is_fresh():
+            logger.debug("HTTP cache hit", extra={"url": url, "cache_hit": True})
+            span.set(cache="fresh", body_bytes=len(cached.body))
+            return cached_body(cached.body)
+
+        headers = cached.validators() if cached else None
+
+        async def attempt() -> _Response:
+            await self._throttle(url)
+            session = self._get_session()
+            with tracer.span("http.request") as request_span:
+                async with session.get(
+                    url, params=params, headers=self._get_headers(headers)
+                ) as response:
+                    self._count_response(url, response.status)
+                    body: str | bytes
+                    if response.status != 200:
+                        body, size = "", 0
+                    elif raw:
+                        body = await response.read()
+                        size = len(body)
+                    else:
+                        body = await response.text()
+                        size = len(body.encode("utf-8"))
+                    metrics.inc("mql5_http_body_bytes_total", size, host=host_of(url))
+                    request_span.set(status=response.status, body_bytes=size)
+                    return _Response(response.status, body, response.headers)
+
         try:
-            async with aiohttp.ClientSession() as session:
+            response = await self._send(url, attempt, hedge=True)
+        except Exception as e:
+            if cached is not None:
+                return cached_body(self._stale(url, cached, e))
+            logger.error(
+                f"Network error in GET {url}", extra={"error": str(e)}, exc_info=True
+            )
+            raise
+
+        status = response.status
+        span.set(status=status)
+        if status == 304 and cached is not None:
+            logger.debug(
+                "HTTP cache revalidated",
+                extra={"url": url, "status_code": status, "cache_hit": True},
+            )
+            span.set(cache="revalidated", body_bytes=len(cached.body))
+            await self._cache_call("revalidated", key, response.headers)
+            return cached_body(cached.body)
+
+        if status != 200:
+            if status in HTTP_RETRY_STATUSES and cached is not None:
+                return cached_body(self._stale(url, cached, f"HTTP {status}"))
+            logger.error(
+                f"HTTP GET error: {status}",
+                extra={"url": url, "status_code": status},
+            )
+            return None
+
+        body = response.body
+        span.set(cache="miss", body_bytes=len(body))
+        if self.http_cache is not None:
+            text = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+            await self._cache_call("store", key, text, response.headers)
+        return body
+
+    async def get_partial(
+        self,
+        url: str,
+        feed: Callable[[str], Awaitable[bool]],
+        params: dict[str, Any] | None = None,
+    ) -> int | None:
+        """
+        Performs a GET request, passing the response text to `feed` as it arrives.
+
+        Reading stops as soon as `feed` returns True, and the connection is then
+        closed instead of being returned to the pool. A fresh cached response is
+        passed in a single call without network I/O. Only responses read to the
+        end are stored in the disk cache. Failures are retried like in `get`
+        until the first chunk is passed on; stale cached content is used when
+        the upstream is unavailable.
+
+        Args:
+            url: The target URL.
+            feed: Coroutine function receiving each decoded chunk, in order.
+                Returns True when no further input is needed.
+            params: Query parameters to append to the URL.
+
+        Returns:
+            The number of body bytes read from the network, or None if the
+            request returned a non-200 status code.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open and nothing is cached.
+            Exception: If a network error occurs (logged before raising).
+        """
+        with tracer.span("http.get_partial", url=url) as span:
+            read = await self._get_partial(url, feed, params)
+            span.set(bytes_read=read)
+            return read
+
+    async def _get_partial(
+        self,
+        url: str,
+        feed: Callable[[str], Awaitable[bool]],
+        params: dict[str, Any] | None,
+    ) -> int | None:
+        key = request_key(url, params)
+        cached = await self._cache_get(key)
+        if cached is not None and cached.is_fresh():
+            logger.debug("HTTP cache hit", extra={"url": url, "cache_hit": True})
+            await feed(cached.body)
+            return 0
+
+        async def attempt() -> _Response:
+            # No conditional request: a 304 would leave nothing to stream
+            await self._throttle(url)
+            session = self._get_session()
+            with tracer.span("http.request") as request_span:
                 async with session.get(
                     url, params=params, headers=self._get_headers()
                 ) as response:
-                    status = response.status
-                    if status != 200:
-                        logger.error(
-                            f"HTTP GET error: {status}",
-                            extra={"url": url, "status_code": status},
-                        )
-                        return None
-
-                    return await response.text()
+                    self._count_response(url, response.status)
+                    request_span.set(status=response.status)
+                    if response.status != 200:
+                        return _Response(response.status, "", response.headers)
+                    try:
+                        read = await self._stream(url, key, response, feed)
+                    except Exception as e:
+                        # Not retried: input was consumed
+                        raise _FeedStarted() from e
+                    request_span.set(body_bytes=read)
+                    return _Response(response.status, "", response.headers, read)
+
+        try:
+            response = await self._send(url, attempt)
+        except _FeedStarted as e:
+            error = e.__cause__ or e
+            logger.error(
+                f"Network error in GET {url}",
+                extra={"error": str(error)},
+                exc_info=True,
+            )
+            raise error from None
         except Exception as e:
+            if cached is not None:
+                await feed(self._stale(url, cached, e))
+                return 0
             logger.error(
                 f"Network error in GET {url}", extra={"error": str(e)}, exc_info=True
             )
             raise
+
+        if response.status != 200:
+            if response.status in HTTP_RETRY_STATUSES and cached is not None:
+                await feed(self._stale(url, cached, f"HTTP {response.status}"))
+                return 0
+            logger.error(
+                f"HTTP GET error: {response.status}",
+                extra={"url": url, "status_code": response.status},
+            )
+            return None
+        return response.bytes_read
+
+    async def _stream(
+        self,
+        url: str,
+        key: str,
+        response: aiohttp.ClientResponse,
+        feed: Callable[[str], Awaitable[bool]],
+    ) -> int:
+        """Passes the body to `feed` chunk by chunk; returns the bytes read."""
+        decoder = codecs.getincrementaldecoder(
+            response.get_encoding() if response.charset else "utf-8"
+        )(errors="replace")
+        read = 0
+        parts: list[str] = []
+        async for chunk in response.content.iter_chunked(HTTP_STREAM_CHUNK_SIZE):
+            read += len(chunk)
+            metrics.inc("mql5_http_body_bytes_total", len(chunk), host=host_of(url))
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if await feed(text):
+                self.bytes_read += read
+                self.partial_reads += 1
+                response.close()
+                logger.debug(
+                    "HTTP read stopped early",
+                    extra={"url": url, "bytes_read": read},
+                )
+                return read
+
+        text = decoder.decode(b"", final=True)
+        parts.append(text)
+        await feed(text)
+        self.bytes_read += read
+        await self._cache_call("store", key, "".join(parts), response.headers)
+        return read
+
+    async def _send(
+        self,
+        url: str,
+        attempt: Callable[[], Awaitable[_Response]],
+        hedge: bool = False,
+    ) -> _Response:
+        """
+        Runs `attempt` with retries, optional hedging and the circuit breaker.
+
+        Args:
+            url: The request URL, whose host keys the breaker.
+            attempt: Coroutine function sending the request once.
+            hedge: Whether a slow attempt may be duplicated.
+
+        Returns:
+            The first response that is not a retryable status, or the last one.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open.
+            Exception: The error of the last attempt, if every attempt failed.
+        """
+        host = host_of(url)
+        error: Exception | None = None
+        response: _Response | None = None
+
+        for retry in range(self.retries + 1):
+            if retry:
+                delay = backoff_delay(retry, HTTP_RETRY_BACKOFF, HTTP_RETRY_MAX_BACKOFF)
+                if response is not None:
+                    delay = max(delay, _retry_after(response.headers))
+                self.retried += 1
+                logger.debug(
+                    f"Retrying GET in {delay:.2f}s",
+                    extra={"url": url, "error": str(error or response)},
+                )
+                await asyncio.sleep(delay)
+
+            if self.breaker is not None and not self.breaker.allow(host):
+                raise CircuitOpenError(f"{host} is temporarily unavailable")
+
+            try:
+                if hedge and self.hedge_delay > 0:
+                    response = await self._hedged(url, attempt)
+                else:
+                    response = await attempt()
+            except RETRY_ERRORS as e:
+                error, response = e, None
+                metrics.inc("mql5_http_errors_total", host=host, error=type(e).__name__)
+                self._record(host, ok=False)
+                continue
+
+            if response.status in HTTP_RETRY_STATUSES:
+                self._record(host, ok=False)
+                continue
+
+            self._record(host, ok=True)
+            return response
+
+        if response is not None:
+            return response
+        assert error is not None
+        raise error
+
+    async def _hedged(
+        self, url: str, attempt: Callable[[], Awaitable[_Response]]
+    ) -> _Response:
+        """
+        Sends a duplicate request if the first one is slower than `hedge_delay`.
+
+        The duplicate is only sent if the rate limiter has a token to spare.
+        The first attempt to succeed wins and the other one is cancelled.
+        """
+        primary = asyncio.ensure_future(attempt())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            if done or (
+                self.rate_limiter is not None
+                and self.rate_limiter.available(host_of(url)) < 1
+            ):
+                return await primary
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(attempt())
+            tasks.add(hedge)
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+            return primary.result()  # Both failed: raise the first error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _count_response(self, url: str, status: int) -> None:
+        metrics.inc("mql5_http_responses_total", host=host_of(url), status=status)
+
+    def _record(self, host: str, ok: bool) -> None:
+        if self.breaker is None:
+            return
+        if ok:
+            self.breaker.record_success(host)
+        else:
+            self.breaker.record_failure(host)
+
+    def _stale(self, url: str, cached: CachedResponse, reason: object) -> str:
+        """Returns a stale cached body in place of a failed request."""
+        self.stale_served += 1
+        logger.warning(
+            "Serving stale cached response",
+            extra={"url": url, "error": str(reason), "cache_hit": True},
+        )
+        return cached.body
+
+    async def _cache_get(self, key: str) -> CachedResponse | None:
+        if self.http_cache is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.http_cache.get, key)
+        except Exception as e:
+            # A broken cache must never break a request
+            logger.error("HTTP cache read failed", extra={"error": str(e)})
+            return None
+
+    async def _cache_call(self, method: str, *args: Any) -> None:
+        if self.http_cache is None:
+            return
+        try:
+            await asyncio.to_thread(getattr(self.http_cache, method), *args)
+        except Exception as e:
+            logger.error("HTTP cache write failed", extra={"error": str(e)})
@@ -0,0 +1,115 @@
+"""
+Build command for the offline MQL5 documentation index.
+
+Usage:
+    mcp-server-mql5-index --from-dump ./mql5-docs-html
+    mcp-server-mql5-index --crawl --max-pages 500
+
+The full-text index and the exact-symbol table are written to
+`~/.mcp_server_mql5/index` by default, where the server picks them up on its next
+local search.
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from .core.config import DOC_INDEX_PATH, DOCS_BASE_URL, SYMBOL_INDEX_PATH
+from .core.doc_index import DocIndex, DocIndexBuilder, crawl_docs, iter_html_dump
+from .core.symbols import SymbolIndexBuilder
+from .core.utils import limiter
+from .core.web_client import WebClient
+
+
+def build_from_dump(root: Path, symbols: SymbolIndexBuilder | None = None) -> DocIndex:
+    """
+    Builds the index from a saved HTML dump of the documentation.
+
+    Args:
+        root: Directory containing the saved pages.
+        symbols: Optional symbol table builder fed with the same pages.
+
+    Returns:
+        The built index.
+    """
+    builder = DocIndexBuilder()
+    for url, html in iter_html_dump(root):
+        builder.add_page(url, html)
+        if symbols is not None:
+            symbols.add_page(url, html)
+    return builder.build()
+
+
+async def build_from_crawl(
+    start_url: str, max_pages: int, symbols: SymbolIndexBuilder | None = None
+) -> DocIndex:
+    """
+    Builds the index by crawling the live documentation (rate limited).
+
+    Args:
+        start_url: Root of the crawl.
+        max_pages: Maximum number of pages to fetch.
+        symbols: Optional symbol table builder fed with the same pages.
+
+    Returns:
+        The built index.
+    """
+    builder = DocIndexBuilder()
+    client = WebClient(rate_limiter=limiter)
+    try:
+        async for url, html in crawl_docs(client, start_url, max_pages):
+            if symbols is not None:
+                symbols.add_page(url, html)
+            if builder.add_page(url, html):
+                print(f"  [{len(builder.docs)}] {url}")
+    finally:
+        await client.close()
+    return builder.build()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="mcp-server-mql5-index",
+        description="Build the offline MQL5 documentation index.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--from-dump", type=Path, metavar="DIR", help="import a saved HTML dump"
+    )
+    source.add_argument(
+        "--crawl", action="store_true", help="crawl the live documentation"
+    )
+    parser.add_argument("--start-url", default=DOCS_BASE_URL, help="crawl root")
+    parser.add_argument(
+        "--max-pages", type=int, default=10_000, help="crawl page limit"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=DOC_INDEX_PATH, help="index file to write"
+    )
+    parser.add_argument(
+        "--symbols-output",
+        type=Path,
+        default=SYMBOL_INDEX_PATH,
+        help="symbol table file to write",
+    )
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    symbols = SymbolIndexBuilder()
+    if args.from_dump:
+        index = build_from_dump(args.from_dump, symbols)
+    else:
+        index = asyncio.run(build_from_crawl(args.start_url, args.max_pages, symbols))
+
+    index.save(args.output)
+    symbols.save(args.symbols_output)
+    print(
+        f"Indexed {len(index)} pages ({len(index.postings)} terms) "
+        f"in {time.time() - start:.1f}s -> {args.output}"
+    )
+    print(f"Mapped {len(symbols.entries)} symbols -> {args.symbols_output}")
+
+
+if __name__ == "__main__":
+    main()
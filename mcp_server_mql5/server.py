@@ -1,50 +1,242 @@
 """
 Main MCP Server implementation for MQL5 Developer Suite.
 
-This module initializes the FastMCP server, defines the tools (search_mql5_docs),
-and handles dependency injection and caching.
+This module initializes the FastMCP server, defines the tools (search_mql5_docs,
+search_mql5_docs_batch, get_mql5_server_metrics, export_mql5_trace), and
+handles dependency injection, result caching, metrics and tracing.
 """
 
-import hashlib
-from functools import lru_cache
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, TypeVar, cast
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 
-from .core.config import MQL5_SEARCH_API, logger
-from .core.scraper import MQL5Scraper
+from .core.cache import AsyncTTLCache
+from .core.compact import MAX_CHARS_PER_TOKEN, estimate_tokens, render_blocks
+from .core.config import (
+    BATCH_MAX_TERMS,
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    DOC_INDEX_PATH,
+    DOCS_BASE_URL,
+    HTTP_CACHE_DEFAULT_TTL,
+    HTTP_CACHE_MAX_ENTRIES,
+    HTTP_CACHE_PATH,
+    HTTP_HEDGE_DELAY,
+    LOG_DIR,
+    METRICS_HOST,
+    METRICS_PORT,
+    MQL5_SEARCH_API,
+    OUTPUT_COMPACT,
+    OUTPUT_MARKDOWN,
+    PAGE_CACHE_HARD_TTL,
+    PAGE_CACHE_SIZE,
+    PAGE_CACHE_TTL,
+    PREFETCH_ENABLED,
+    PREFETCH_MAX_QUEUE,
+    PREFETCH_TOP_K,
+    SEARCH_MODE,
+    STREAM_FETCH_MAX_CHARS,
+    SYMBOL_INDEX_PATH,
+    TERM_CACHE_HARD_TTL,
+    TERM_CACHE_SIZE,
+    TERM_CACHE_TTL,
+    TRACE_DIR,
+    WARMUP_ENABLED,
+    WARMUP_INTERVAL,
+    WARMUP_MAX_TERMS,
+    WARMUP_MIN_TOKENS,
+    WARMUP_START_DELAY,
+    WARMUP_TERMS_PATH,
+    WORKER_POOL_KIND,
+    WORKER_POOL_MAX_QUEUE,
+    WORKER_POOL_SIZE,
+    logger,
+    logging_stats,
+)
+from .core.executor import WorkerPool
+from .core.http_cache import HTTPCache
+from .core.metrics import Sample, metrics, start_metrics_server
+from .core.prefetch import Prefetcher
+from .core.resilience import CLOSED, CircuitBreaker, CircuitOpenError
+from .core.scraper import MQL5Scraper, PageReader, ParsedPage
 from .core.search import MQL5Searcher
-from .core.utils import limiter, log_execution_time
-from .core.web_client import WebClient
+from .core.sections import SECTION_KINDS, select_sections
+from .core.symbols import SymbolIndex
+from .core.tracing import EXPORT_FORMATS, tracer
+from .core.utils import Lazy, host_of, limiter, log_execution_time
+from .core.warmup import CacheWarmer, hot_terms_from_logs, load_terms_file
+
+if TYPE_CHECKING:
+    from .core.web_client import WebClient
+
+T = TypeVar("T")
 
 # ==================== MCP SERVER ====================
 
-mcp = FastMCP("MQL5 Developer Suite")
 
-# Dependencies (Simple Singleton)
-client = WebClient()
-searcher = MQL5Searcher()
-scraper = MQL5Scraper()
+def _make_client() -> "WebClient":
+    # aiohttp is the slowest import of the server: deferred to the first request
+    from .core.web_client import WebClient
+
+    return WebClient(
+        rate_limiter=limiter,
+        http_cache=HTTPCache(
+            HTTP_CACHE_PATH,
+            default_ttl=HTTP_CACHE_DEFAULT_TTL,
+            max_entries=HTTP_CACHE_MAX_ENTRIES,
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=BREAKER_RESET_TIMEOUT,
+        ),
+        hedge_delay=HTTP_HEDGE_DELAY,
+    )
+
+
+# Dependencies (Simple Singleton). The HTTP client and the scraper are created
+# on first use, so that the server answers `initialize` as soon as possible.
+_lazy_client: Lazy["WebClient"] = Lazy(_make_client)
+client = cast("WebClient", _lazy_client)
+searcher = MQL5Searcher(
+    index_path=DOC_INDEX_PATH, symbol_index=SymbolIndex(SYMBOL_INDEX_PATH)
+)
+scraper = cast(MQL5Scraper, Lazy(MQL5Scraper))
+workers = WorkerPool(
+    kind=WORKER_POOL_KIND,
+    max_workers=WORKER_POOL_SIZE,
+    max_queue=WORKER_POOL_MAX_QUEUE,
+    name="extraction",
+)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """
+    Runs a blocking call on a stateful object (searcher, page reader) off the loop.
+
+    Uses the `workers` pool when it runs threads, so the call counts against its
+    size and metrics. A process pool would get a copy of the object, so these
+    calls then go to the default thread executor instead.
+    """
+    if workers.kind == "thread":
+        return await workers.run(func, *args)
+    return await asyncio.to_thread(func, *args)
+
+
+term_cache: AsyncTTLCache[str] = AsyncTTLCache(
+    maxsize=TERM_CACHE_SIZE,
+    ttl=TERM_CACHE_TTL,
+    hard_ttl=TERM_CACHE_HARD_TTL,
+    name="term_cache",
+)
+page_cache: AsyncTTLCache[ParsedPage] = AsyncTTLCache(
+    maxsize=PAGE_CACHE_SIZE,
+    ttl=PAGE_CACHE_TTL,
+    hard_ttl=PAGE_CACHE_HARD_TTL,
+    name="page_cache",
+)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Server lifespan: releases shared resources when the server shuts down.
+
+    Runs inside the server's event loop, so the pooled HTTP session is closed
+    on the loop that created it, even when shutdown was caused by cancellation.
+    The cache warmer, and the metrics endpoint if enabled, run in the
+    background for the lifetime of the server. The offline index is loaded in a
+    thread at startup, off the event loop.
+    """
+    index_task = (
+        asyncio.create_task(asyncio.to_thread(searcher.load_index))
+        if SEARCH_MODE != "api"
+        else None
+    )
+    warmup_task = asyncio.create_task(warmer.run()) if WARMUP_ENABLED else None
+    metrics_server = None
+    if METRICS_PORT:
+        try:
+            metrics_server = await start_metrics_server(
+                metrics, METRICS_HOST, METRICS_PORT
+            )
+        except OSError as e:
+            logger.warning(
+                "Metrics endpoint unavailable",
+                extra={"operation": "metrics", "error": str(e)},
+            )
+    try:
+        yield
+    finally:
+        if metrics_server is not None:
+            with anyio.CancelScope(shield=True):
+                await metrics_server.cleanup()
+        logger.info("Metrics summary", extra={"metrics": metrics.summary()})
+        if index_task is not None:
+            index_task.cancel()
+        if warmup_task is not None:
+            warmup_task.cancel()
+            logger.info("Cache warm-up usage", extra={"warmup": warmer.stats()})
+        prefetcher.close()
+        logger.info("Prefetch usage", extra={"prefetch": prefetcher.stats()})
+        if _lazy_client.created:
+            with anyio.CancelScope(shield=True):
+                await client.close()
+        logger.info(
+            "Result cache usage",
+            extra={"caches": [term_cache.stats(), page_cache.stats()]},
+        )
+        logger.info("Worker pool usage", extra={"workers": workers.stats()})
+        workers.close()
+        if searcher.symbol_index is not None:
+            logger.info(
+                "Symbol index usage", extra={"symbols": searcher.symbol_index.stats()}
+            )
+            searcher.symbol_index.close()
+
+
+mcp = FastMCP("MQL5 Developer Suite", lifespan=lifespan)
 
 
-@lru_cache(maxsize=50)
-def cached_search(search_hash: str) -> str | None:
+class SearchFailure(Exception):
     """
-    Retrieves a cached search result.
+    A search that completed without a usable result.
 
-    This function utilizes Python's lru_cache to store and retrieve results.
-    The argument is a hash to ensure the cache key is concise.
+    The message is returned to the caller as-is, and the outcome is not cached.
+    """
+
+
+def term_key(search_term: str) -> str:
+    """
+    Builds the term cache key for a search.
+
+    The search term is normalized (whitespace collapsed, case folded) so that
+    trivially different spellings of the same query share a cache entry.
 
     Args:
-        search_hash: MD5 hash of the search term and parameters.
+        search_term: The term as received from the client.
 
     Returns:
-        The cached result string if available, otherwise None.
+        A hashable key for `term_cache`.
     """
-    return None
+    return " ".join(search_term.split()).casefold()
 
 
 @mcp.tool()
-async def search_mql5_docs(search_term: str, max_chars: int = 4000) -> str:
+async def search_mql5_docs(
+    search_term: str,
+    max_chars: int = 4000,
+    sections: list[str] | None = None,
+    query: str | None = None,
+    max_tokens: int | None = None,
+) -> str:
     """
     Search the official MQL5 documentation.
 
@@ -55,71 +247,125 @@ async def search_mql5_docs(search_term: str, max_chars: int = 4000) -> str:
         search_term: The term or concept to search for in the MQL5 documentation.
         max_chars: Maximum number of characters to return from the page content.
                    Defaults to 4000 to fit within typical LLM context windows.
+        sections: Only return these parts of the page: "summary", "signature",
+                  "parameters", "return_value", "notes", "example", "see_also".
+                  E.g. ["signature", "return_value"] for a quick reference.
+        query: Return the parts of the page most relevant to this question
+               first (e.g. "filling mode" on the MqlTradeRequest page), instead
+               of the beginning of the page.
+        max_tokens: Budget of the page content in LLM tokens (estimated). If
+                    given, it replaces `max_chars`.
 
     Returns:
-        A string containing the source URL and the extracted text content.
+        A string containing the source URL and the extracted text content. With
+        `sections` or `query`, the text ends with the list of the page's parts.
     """
 
     logger.info(
         "Search request", extra={"search_term": search_term, "max_chars": max_chars}
     )
+    unknown = [kind for kind in sections or () if kind not in SECTION_KINDS]
+    if unknown:
+        return f"Unknown sections {unknown}; use any of {list(SECTION_KINDS)}"
+    if max_tokens is not None:
+        max_chars = max_tokens * MAX_CHARS_PER_TOKEN
+    return await _search_one(search_term, max_chars, sections, query, max_tokens)
 
-    # Check cache
-    cache_key = hashlib.md5(f"{search_term}_{max_chars}".encode()).hexdigest()
-    cached = cached_search(cache_key)
 
-    if cached:
-        logger.info("Cache hit", extra={"search_term": search_term})
-        return f"[CACHED]\n{cached}"
+@mcp.tool()
+async def search_mql5_docs_batch(
+    search_terms: list[str],
+    max_chars: int = 2000,
+    sections: list[str] | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Search the official MQL5 documentation for several terms at once.
 
-    limiter.wait_if_needed()
+    Use this instead of repeated `search_mql5_docs` calls when looking up many
+    identifiers (e.g. all functions used by an Expert Advisor): the lookups and
+    page fetches run concurrently.
 
-    try:
-        with log_execution_time("full_search", search_term=search_term) as ctx:
-            # 1. Search in MQL5 API
-            payload = {
-                "keyword": search_term,
-                "lng": "en",
-                "count": 10,
-                "dt_from": 0,
-                "target_site": "mql5.com",
-                "module": "mql5.com.en.docs",  # Prioritize docs
-            }
-
-            # Specific headers for the API
-            # (although WebClient uses random UA, sometimes referer helps)
-            # WebClient.get does not support custom headers yet, but params yes.
-            # Let's try GET which we know works.
-
-            search_response = await client.get(MQL5_SEARCH_API, params=payload)
-
-            if not search_response:
-                return "Search error in MQL5 API"
-
-            # 2. Find best link
-            target_link = searcher.find_best_match_api(search_response, search_term)
-
-            if not target_link:
-                # Fallback: Try general search if no specific docs?
-                # For now report not found.
-                logger.warning("No results found", extra={"search_term": search_term})
-                return f"No documentation found for '{search_term}'"
-
-            ctx["target_url"] = target_link
-
-            # 3. Get content of the target page
-            doc_html = await client.get(target_link)
-            if not doc_html:
-                return f"Error obtaining the page: {target_link}"
-
-            # 4. Extract content
-            content = scraper.extract_content(doc_html, max_chars=max_chars)
-
-            result = f"SOURCE: {target_link}\n\n{content}"
-            ctx["result_length"] = len(result)
+    Args:
+        search_terms: The terms to search for. Duplicates are looked up once.
+        max_chars: Maximum number of characters of page content per term.
+                   Defaults to 2000.
+        sections: Only return these parts of each page, e.g. ["signature"];
+                  see `search_mql5_docs`.
+        max_tokens: Budget of page content per term in LLM tokens (estimated).
+                    If given, it replaces `max_chars`.
 
-            return result
+    Returns:
+        One section per term, in the given order, each with the source URL and
+        extracted text, or the error for that term.
+    """
+    logger.info(
+        "Batch search request",
+        extra={"search_term": ", ".join(search_terms), "max_chars": max_chars},
+    )
+
+    if not search_terms:
+        return "No search terms given"
+    if len(search_terms) > BATCH_MAX_TERMS:
+        return (
+            f"Too many search terms ({len(search_terms)}); "
+            f"the maximum is {BATCH_MAX_TERMS} per call"
+        )
+    unknown = [kind for kind in sections or () if kind not in SECTION_KINDS]
+    if unknown:
+        return f"Unknown sections {unknown}; use any of {list(SECTION_KINDS)}"
+    if max_tokens is not None:
+        max_chars = max_tokens * MAX_CHARS_PER_TOKEN
+
+    # Terms that normalize to the same cache key are searched once
+    unique: dict[str, str] = {}
+    for term in search_terms:
+        unique.setdefault(term_key(term), term)
+
+    with log_execution_time(
+        "batch_search", search_term=f"{len(search_terms)} terms"
+    ) as ctx:
+        ctx["unique_terms"] = len(unique)
+        results = await asyncio.gather(
+            *(
+                _search_one(term, max_chars, sections, max_tokens=max_tokens)
+                for term in unique.values()
+            )
+        )
+    by_key = dict(zip(unique, results))
+
+    return "\n\n".join(
+        f"=== [{i}/{len(search_terms)}] {term} ===\n{by_key[term_key(term)]}"
+        for i, term in enumerate(search_terms, start=1)
+    )
+
+
+async def _search_one(
+    search_term: str,
+    max_chars: int,
+    sections: list[str] | None = None,
+    query: str | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Runs one search and formats its outcome for the client.
+
+    Args:
+        search_term: The term to search for.
+        max_chars: Maximum number of characters of page content to return.
+        sections: If given, only these kinds of sections are returned.
+        query: If given, the sections most relevant to it are returned first.
+        max_tokens: If given, token budget of the page content.
 
+    Returns:
+        The search result, or a message describing why it failed.
+    """
+    try:
+        result, cache_hit = await _run_search(
+            search_term, max_chars, sections, query, max_tokens
+        )
+    except SearchFailure as e:
+        return str(e)
     except Exception as e:
         logger.error(
             "Unexpected error",
@@ -128,6 +374,433 @@ async def search_mql5_docs(search_term: str, max_chars: int = 4000) -> str:
         )
         return f"Error: {str(e)}"
 
+    if cache_hit:
+        logger.info("Cache hit", extra={"search_term": search_term, "cache_hit": True})
+        return f"[CACHED]\n{result}"
+
+    return result
+
+
+async def _run_search(
+    search_term: str,
+    max_chars: int,
+    sections: list[str] | None = None,
+    query: str | None = None,
+    max_tokens: int | None = None,
+) -> tuple[str, bool]:
+    """
+    Resolves the term to a page and renders the page within `max_chars`.
+
+    Both steps are cached independently and shared across `max_chars` values:
+    the term to URL mapping in `term_cache`, and the cleaned page in
+    `page_cache`. Concurrent identical requests share a single upstream fetch,
+    and only cache misses consume rate limit budget. Pages linked from the
+    result are then prefetched in the background.
+
+    Requests for sections or a query need the complete page; its section index
+    is built once and kept with the cached page. The selected text is then
+    compacted (see `core/compact.py`) and cut to `max_tokens`.
+
+    Args:
+        search_term: The term to search for.
+        max_chars: Maximum number of characters of page content to return.
+        sections: If given, only these kinds of sections are returned.
+        query: If given, the sections most relevant to it are returned first.
+        max_tokens: If given, token budget of the page content.
+
+    Returns:
+        The source URL followed by the extracted page content, and whether
+        both steps were served from the caches.
+
+    Raises:
+        SearchFailure: If no page could be found or fetched.
+    """
+    failure: SearchFailure | None = None
+    with log_execution_time("full_search", search_term=search_term) as ctx:
+        try:
+            url, url_hit = await term_cache.fetch(
+                term_key(search_term), lambda: _resolve_url(search_term, ctx)
+            )
+            ctx["target_url"] = url
+            selective = sections or query
+            page, page_hit = await _fetch_page(
+                url, sys.maxsize if selective else max_chars
+            )
+            prefetcher.record(url, page_hit)
+            if PREFETCH_ENABLED:
+                prefetcher.schedule(page.links)
+
+            with tracer.span("render", max_chars=max_chars) as span:
+                blocks = (
+                    select_sections(page, sections, query, max_chars)
+                    if selective
+                    else page.blocks(max_chars)
+                )
+                text = render_blocks(
+                    blocks, max_tokens, compact=OUTPUT_COMPACT, markdown=OUTPUT_MARKDOWN
+                )
+                result = f"SOURCE: {url}\n\n{text}"
+                span.set(result_chars=len(result), result_tokens=estimate_tokens(text))
+            ctx["result_length"] = len(result)
+            ctx["cache_hit"] = url_hit and page_hit
+        except SearchFailure as e:
+            # An expected outcome, not an error of the pipeline itself
+            failure = e
+            ctx["failure"] = str(e)
+        except CircuitOpenError as e:
+            # Upstream known to be down and nothing cached to serve instead
+            failure = SearchFailure(f"Error: {e}, please retry later")
+            ctx["failure"] = str(e)
+
+    if failure:
+        raise failure
+    return result, url_hit and page_hit
+
+
+async def _resolve_url(search_term: str, ctx: dict[str, Any]) -> str:
+    """
+    Resolves the search term to a documentation page URL.
+
+    Args:
+        search_term: The term to search for.
+        ctx: Log context of the enclosing `log_execution_time` block.
+
+    Returns:
+        The URL of the best matching page.
+
+    Raises:
+        SearchFailure: If no page could be found.
+    """
+    # Exact symbol, then offline index, then search API
+    target_link = searcher.find_exact_symbol(search_term)
+    if target_link:
+        ctx["resolved_by"] = "symbol_index"
+
+    if not target_link and SEARCH_MODE != "api" and searcher.may_search_local:
+        target_link = await run_blocking(searcher.find_best_match_local, search_term)
+        if target_link:
+            ctx["resolved_by"] = "local_index"
+
+    if not target_link and SEARCH_MODE != "local":
+        target_link = await _search_api(search_term)
+        if target_link:
+            ctx["resolved_by"] = "search_api"
+
+    if not target_link:
+        # Fallback: Try general search if no specific docs?
+        # For now report not found.
+        logger.warning("No results found", extra={"search_term": search_term})
+        raise SearchFailure(f"No documentation found for '{search_term}'")
+
+    return target_link
+
+
+async def _fetch_page(url: str, max_chars: int) -> tuple[ParsedPage, bool]:
+    """
+    Returns the cleaned page at `url`, complete enough to render `max_chars`.
+
+    Small budgets (up to `STREAM_FETCH_MAX_CHARS`) only read the page up to
+    that budget. A cached partial page too short for `max_chars` is replaced by
+    the complete page. Stale pages are always refreshed with the complete page,
+    so that a small request never replaces a complete page with a partial one.
+
+    Args:
+        url: The page URL.
+        max_chars: Character budget the page will be rendered with.
+
+    Returns:
+        The page, and whether it was served from `page_cache`.
+
+    Raises:
+        SearchFailure: If the page could not be fetched.
+    """
+    budget = max_chars if max_chars <= STREAM_FETCH_MAX_CHARS else None
+    page, page_hit = await page_cache.fetch(
+        url, lambda: _load_page(url, budget), refresh=lambda: _load_page(url)
+    )
+    if page.covers(max_chars):
+        return page, page_hit
+
+    # Loaded directly: a pending load of the same URL may be partial too
+    page = await _load_page(url)
+    page_cache.set(url, page)
+    return page, False
+
+
+async def _load_page(url: str, max_chars: int | None = None) -> ParsedPage:
+    """
+    Fetches a documentation page and extracts all of its sections.
+
+    Args:
+        url: The page URL.
+        max_chars: If given, the page is extracted while downloading and the
+            download stops once this many characters of text are read.
+
+    Returns:
+        The cleaned page, not yet truncated.
+
+    Raises:
+        SearchFailure: If the page could not be fetched.
+    """
+    if max_chars is not None:
+        return await _stream_page(url, max_chars)
+
+    with log_execution_time("page_fetch", level=logging.DEBUG, url=url):
+        doc_html = await client.get(url)
+    if not doc_html:
+        raise SearchFailure(f"Error obtaining the page: {url}")
+
+    # CPU-bound, off the event loop
+    with log_execution_time("page_parse", level=logging.DEBUG, url=url):
+        return await workers.run(scraper.parse_page, doc_html, url)
+
+
+async def _stream_page(url: str, max_chars: int) -> ParsedPage:
+    """
+    Reads a documentation page only up to a character budget.
+
+    Each chunk is parsed in a worker thread as it arrives. Pages without a
+    `doc-content` container are read completely and parsed as usual.
+
+    Args:
+        url: The page URL.
+        max_chars: Character budget of the extracted text.
+
+    Returns:
+        The cleaned page, partial if it was cut at `max_chars`.
+
+    Raises:
+        SearchFailure: If the page could not be fetched.
+    """
+    reader = PageReader(url, max_chars)
+
+    async def feed(text: str) -> bool:
+        return await run_blocking(reader.feed, text)
+
+    # Download and extraction overlap here, so they are timed as one stage
+    with log_execution_time("page_stream", level=logging.DEBUG, url=url):
+        read = await client.get_partial(url, feed)
+    if read is None:
+        raise SearchFailure(f"Error obtaining the page: {url}")
+
+    page = reader.page()
+    if page is None:
+        with log_execution_time("page_parse", level=logging.DEBUG, url=url):
+            return await workers.run(scraper.parse_page, reader.html, url)
+    return page
+
+
+async def _search_api(search_term: str) -> str | None:
+    """
+    Resolves a search term to a page URL with the MQL5 search API.
+
+    Args:
+        search_term: The term to search for.
+
+    Returns:
+        The URL of the best result, or None if nothing was found.
+
+    Raises:
+        SearchFailure: If the API request failed.
+    """
+    payload = {
+        "keyword": search_term,
+        "lng": "en",
+        "count": 10,
+        "dt_from": 0,
+        "target_site": "mql5.com",
+        "module": "mql5.com.en.docs",  # Prioritize docs
+    }
+
+    # Specific headers for the API
+    # (although WebClient uses random UA, sometimes referer helps)
+    # WebClient.get does not support custom headers yet, but params yes.
+    # Let's try GET which we know works. The body is kept as bytes for the
+    # JSON decoder.
+
+    with log_execution_time("search_api", level=logging.DEBUG, search_term=search_term):
+        search_response = await client.get_bytes(MQL5_SEARCH_API, params=payload)
+
+    if not search_response:
+        raise SearchFailure("Search error in MQL5 API")
+
+    with log_execution_time("rank", level=logging.DEBUG, search_term=search_term):
+        return await workers.run(
+            searcher.find_best_match_api, search_response, search_term
+        )
+
+
+# ==================== METRICS ====================
+
+
+@mcp.tool()
+async def get_mql5_server_metrics() -> str:
+    """
+    Report the server's own performance metrics (diagnostics).
+
+    Returns latency percentiles per pipeline stage (search API, page fetch,
+    parse, full search), HTTP status and byte counters, rate limiter waits and
+    cache hit/miss counters, as JSON.
+
+    Returns:
+        A JSON object with `counters`, `histograms` and `gauges`.
+    """
+    return json.dumps(metrics.summary(), indent=2)
+
+
+@mcp.tool()
+async def export_mql5_trace(trace_format: str = "chrome") -> str:
+    """
+    Export recent tracing spans of the server to a JSON file (diagnostics).
+
+    Each search is recorded as nested spans (search API, rate limit wait, DNS,
+    connect, download, parse, render) with timings and byte sizes.
+
+    Args:
+        trace_format: "chrome" for the Chrome trace event format (open it in
+            chrome://tracing or ui.perfetto.dev), or "otlp" for OpenTelemetry
+            JSON. Defaults to "chrome".
+
+    Returns:
+        The path of the written file and the number of spans, or an error.
+    """
+    if trace_format not in EXPORT_FORMATS:
+        return f"Unknown trace format '{trace_format}'; use one of {EXPORT_FORMATS}"
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = TRACE_DIR / f"trace-{stamp}.{trace_format}.json"
+    count = await asyncio.to_thread(tracer.export, path, trace_format)
+    logger.info(f"Exported {count} spans", extra={"url": str(path)})
+    return f"Wrote {count} spans to {path}"
+
+
+def collect_metrics() -> list[Sample]:
+    """Reads the counters kept by the caches, limiter and worker pool."""
+    samples: list[Sample] = []
+    for cache in (term_cache, page_cache):
+        stats = cache.stats()
+        for result in ("hits", "misses", "stale_hits"):
+            samples.append(
+                (
+                    "mql5_cache_lookups",
+                    {"cache": cache.name, "result": result},
+                    stats[result],
+                )
+            )
+        samples.append(("mql5_cache_entries", {"cache": cache.name}, stats["size"]))
+    if _lazy_client.created and client.http_cache is not None:
+        stats = client.http_cache.stats()
+        for result in ("hits", "misses", "revalidations"):
+            samples.append(
+                (
+                    "mql5_cache_lookups",
+                    {"cache": "http_cache", "result": result},
+                    stats[result],
+                )
+            )
+    if _lazy_client.created:
+        stats = client.stats()
+        for result in ("fetches", "coalesced"):
+            samples.append(("mql5_http_gets", {"result": result}, stats[result]))
+    for host, stats in limiter.stats().items():
+        samples.append(
+            ("mql5_rate_limit_queue_depth", {"host": host}, stats["queue_depth"])
+        )
+    samples.append(
+        ("mql5_worker_queue_depth", {"pool": workers.name}, workers.queue_depth())
+    )
+    return samples
+
+
+metrics.add_collector(collect_metrics)
+
+
+# ==================== CACHE WARM-UP ====================
+
+
+def warmup_terms() -> list[str]:
+    """
+    Returns the terms to warm: the terms file first, then the most searched
+    terms in past logs, without duplicates and up to `WARMUP_MAX_TERMS`.
+    """
+    terms: dict[str, str] = {}
+    for term in load_terms_file(WARMUP_TERMS_PATH) + hot_terms_from_logs(
+        LOG_DIR, WARMUP_MAX_TERMS, "full_search"
+    ):
+        terms.setdefault(term_key(term), term)
+    return list(terms.values())[:WARMUP_MAX_TERMS]
+
+
+def is_idle() -> bool:
+    """
+    Whether background work may use the network and workers now.
+
+    False while any search is loading, any task waits for a worker or the rate
+    limiter, or a docs host has fewer than `WARMUP_MIN_TOKENS` calls left or is
+    not known to be healthy by the circuit breaker. The HTTP client is not
+    created here: before its first use, no host has failed yet.
+    """
+    if term_cache.loading() or page_cache.loading():
+        return False
+    if workers.queue_depth() or limiter.queue_depth():
+        return False
+    hosts = [host_of(url) for url in (MQL5_SEARCH_API, DOCS_BASE_URL)]
+    if (
+        _lazy_client.created
+        and client.breaker is not None
+        and any(client.breaker.state(host) != CLOSED for host in hosts)
+    ):
+        return False
+    return all(limiter.available(host) >= WARMUP_MIN_TOKENS for host in hosts)
+
+
+async def warm_term(search_term: str) -> bool:
+    """
+    Loads a term and its page into the caches, like a search without output.
+
+    Warm-ups are not logged as `full_search`, so they do not count as hot terms.
+
+    Args:
+        search_term: The term to warm.
+
+    Returns:
+        True if both the term and its page were already cached.
+
+    Raises:
+        SearchFailure: If no page could be found or fetched.
+    """
+    url, url_hit = await term_cache.fetch(
+        term_key(search_term), lambda: _resolve_url(search_term, {})
+    )
+    _, page_hit = await _fetch_page(url, sys.maxsize)
+    return url_hit and page_hit
+
+
+warmer = CacheWarmer(
+    warm=warm_term,
+    terms=warmup_terms,
+    is_idle=is_idle,
+    interval=WARMUP_INTERVAL,
+    start_delay=WARMUP_START_DELAY,
+)
+
+
+# ==================== PREFETCH ====================
+
+
+async def prefetch_page(url: str) -> None:
+    """Loads a linked page into the page cache."""
+    await page_cache.get_or_set(url, lambda: _load_page(url))
+
+
+prefetcher = Prefetcher(
+    load=prefetch_page,
+    is_cached=lambda url: url in page_cache,
+    is_idle=is_idle,
+    top_k=PREFETCH_TOP_K,
+    max_queue=PREFETCH_MAX_QUEUE,
+)
+
 
 def main() -> None:
     logger.info("Server starting")
@@ -139,7 +812,19 @@ def main() -> None:
         logger.critical("Server crashed", extra={"error": str(e)}, exc_info=True)
         raise
     finally:
-        logger.info("Server stopped")
+        logger.info(
+            "Server stopped",
+            extra={
+                "connections": client.stats() if _lazy_client.created else {},
+                "breaker": (
+                    client.breaker.stats()
+                    if _lazy_client.created and client.breaker
+                    else {}
+                ),
+                "workers": workers.stats(),
+                "logging": logging_stats(),
+            },
+        )
 
 
 if __name__ == "__main__":
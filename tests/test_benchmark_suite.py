@@ -0,0 +1,33 @@
+import pytest
+
+from examples.benchmark_suite import compare, load_recordings, run_suite
+
+
+def test_recordings_resolve_to_fixture_pages() -> None:
+    recordings = load_recordings()
+    assert len(recordings) >= 9
+    for recording in recordings:
+        assert recording.path.startswith("/en/docs/")
+        assert '<div class="doc-content">' in recording.html
+
+
+@pytest.mark.asyncio
+async def test_suite_runs_offline() -> None:
+    results = await run_suite(rounds=2, startup_rounds=1)
+
+    assert set(results) == {
+        "startup.import_server",
+        "scraper.parse_page",
+        "searcher.find_best_match_api",
+        "compact.render_blocks",
+        "search.cache_hit",
+        "search.cache_miss",
+        "search.concurrent",
+    }
+    assert all(r["ops"] > 0 and r["p50_ms"] > 0 for r in results.values())
+
+
+def test_compare_flags_slower_medians() -> None:
+    baseline = {"a": {"p50_ms": 1.0}, "b": {"p50_ms": 1.0}}
+    results = {"a": {"p50_ms": 1.2}, "b": {"p50_ms": 1.5}, "new": {"p50_ms": 9.0}}
+    assert compare(results, baseline, threshold=0.25) == ["b"]
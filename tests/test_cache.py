@@ -0,0 +1,126 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from mcp_server_mql5.core.cache import AsyncTTLCache
+
+
+class TestAsyncTTLCache:
+    def test_get_set(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(maxsize=2)
+        assert cache.get("a") is None
+        cache.set("a", "A")
+        assert cache.get("a") == "A"
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_lru_eviction(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(maxsize=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(ttl=10)
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=100.0):
+            cache.set("a", "A")
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert cache.expirations == 1
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_fetch_single_flight(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache()
+        calls = 0
+
+        async def loader() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache.fetch("k", loader) for _ in range(3)))
+
+        assert calls == 1
+        assert [r[0] for r in results] == ["value"] * 3
+        assert cache.coalesced == 2
+        assert await cache.fetch("k", loader) == ("value", True)
+
+    @pytest.mark.asyncio
+    async def test_fetch_error_not_cached(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache()
+
+        async def failing() -> str:
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_set("k", failing)
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(ttl=10, hard_ttl=100)
+        values = iter(["new", "newer"])
+
+        async def loader() -> str:
+            return next(values)
+
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "old")
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=150.0):
+            # Expired but within the hard TTL: served at once, refreshed behind
+            assert await cache.fetch("k", loader) == ("old", True)
+            assert cache.get("k") is None  # get() does not serve stale entries
+        await asyncio.sleep(0.01)
+
+        assert cache.get("k") == "new"
+        stats = cache.stats()
+        assert stats["stale_hits"] == 1
+        assert stats["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_reloaded_with_refresh(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(ttl=10, hard_ttl=100)
+
+        async def partial() -> str:
+            return "partial"
+
+        async def full() -> str:
+            return "full"
+
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "old")
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=150.0):
+            assert await cache.fetch("k", partial, refresh=full) == ("old", True)
+        await asyncio.sleep(0.01)
+        assert cache.get("k") == "full"
+
+        # A miss still uses the loader
+        assert await cache.fetch("other", partial, refresh=full) == ("partial", False)
+
+    @pytest.mark.asyncio
+    async def test_stale_kept_when_refresh_fails(self) -> None:
+        cache: AsyncTTLCache[str] = AsyncTTLCache(ttl=10, hard_ttl=100)
+
+        async def failing() -> str:
+            raise ValueError("boom")
+
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "old")
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=150.0):
+            assert await cache.fetch("k", failing) == ("old", True)
+        await asyncio.sleep(0.01)
+        assert cache.refresh_failures == 1
+
+        # Past the hard TTL the entry is gone and the loader's error surfaces
+        with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=201.0):
+            with pytest.raises(ValueError):
+                await cache.fetch("k", failing)
+        assert cache.expirations == 1
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+from mcp_server_mql5.core.compact import (
+    compact_blocks,
+    estimate_tokens,
+    normalize_block,
+    render_blocks,
+    truncate_tokens,
+)
+from mcp_server_mql5.core.html_stream import TRUNCATION_MARKER
+from mcp_server_mql5.core.scraper import MQL5Scraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+
+
+class TestEstimateTokens:
+    def test_estimates(self) -> None:
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("Returns the value") == 3
+        assert estimate_tokens("PositionOpen") == 2
+        assert estimate_tokens("123456") == 2
+        # Each non-breaking space is about one token
+        assert estimate_tokens("\xa0" * 6) == 6
+        assert estimate_tokens(" " * 6) == 1
+
+
+class TestCompactBlocks:
+    def test_normalize_prose_and_code(self) -> None:
+        assert normalize_block("  Period ,\xa0Object\n properties  ") == (
+            "Period, Object properties"
+        )
+        code = "bool\xa0\xa0OrderSend(\n\xa0\xa0\xa0int\xa0\xa0\xa0\xa0a,\xa0\xa0\n\n);"
+        assert normalize_block(code) == "bool OrderSend(\n   int a,\n);"
+        assert normalize_block(TRUNCATION_MARKER) == TRUNCATION_MARKER
+
+    def test_repeated_blocks_are_dropped(self) -> None:
+        long = "A paragraph that is repeated further down the page."
+        blocks = ["Title", "Title", long, "Field", "x", "Field", long, " "]
+        assert compact_blocks(blocks) == ["Title", long, "Field", "x", "Field"]
+
+    def test_markdown_lists_tables_and_code(self) -> None:
+        blocks = [
+            "Parameters",
+            "symbol",
+            "[in] Symbol name.",
+            "period",
+            "[in] Period.",
+            "ID",
+            "Description",
+            "PERIOD_M1",
+            "1 minute",
+            "PERIOD_H1",
+            "1 | hour",
+            "void OnStart()\n  {\n  }",
+            TRUNCATION_MARKER,
+        ]
+        assert compact_blocks(blocks, markdown=True) == [
+            "Parameters",
+            "- symbol: [in] Symbol name.\n- period: [in] Period.",
+            "ID | Description\n--|--\nPERIOD_M1 | 1 minute\nPERIOD_H1 | 1 / hour",
+            "```mql5\nvoid OnStart()\n  {\n  }\n```",
+            TRUNCATION_MARKER,
+        ]
+
+
+class TestTokenBudget:
+    def test_truncate_tokens(self) -> None:
+        blocks = ["one two", "three four", "five"]
+        assert truncate_tokens(blocks, 8) == ["one two", "three four", "five"]
+        assert truncate_tokens(blocks, 5) == ["one two", TRUNCATION_MARKER]
+        # A marker already in the blocks is not repeated
+        assert truncate_tokens(["a", TRUNCATION_MARKER, "b"], 3) == [
+            "a",
+            TRUNCATION_MARKER,
+        ]
+
+    def test_fixture_pages_shrink(self) -> None:
+        for path in sorted(FIXTURES.glob("*.html")):
+            page = MQL5Scraper().parse_page(path.read_text(encoding="utf-8"))
+            blocks = page.blocks(sys.maxsize)
+            raw = render_blocks(blocks, compact=False)
+            compact = render_blocks(blocks)
+            assert raw == page.render(sys.maxsize)
+            assert estimate_tokens(compact) < estimate_tokens(raw), path.name
+
+            budgeted = render_blocks(blocks, max_tokens=100)
+            assert estimate_tokens(budgeted) <= 100 + 5
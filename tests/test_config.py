@@ -0,0 +1,117 @@
+import json
+import logging
+import time
+
+from mcp_server_mql5.core.config import (
+    BackgroundLogHandler,
+    StructuredFormatter,
+    logger,
+    logging_stats,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level: int = logging.NOTSET) -> None:
+        super().__init__(level)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    test_logger = logging.getLogger(name)
+    test_logger.handlers.clear()
+    test_logger.propagate = False
+    test_logger.setLevel(logging.DEBUG)
+    test_logger.addHandler(handler)
+    return test_logger
+
+
+class TestBackgroundLogHandler:
+    def test_routes_records_by_sink_level(self) -> None:
+        everything = ListHandler(logging.DEBUG)
+        warnings = ListHandler(logging.WARNING)
+        handler = BackgroundLogHandler(everything, warnings, maxsize=100)
+        test_logger = make_logger("test.background.levels", handler)
+
+        handler.start()
+        test_logger.info("search %s", "OrderSend")
+        test_logger.warning("slow")
+        handler.stop()
+
+        assert [r.getMessage() for r in everything.records] == [
+            "search OrderSend",
+            "slow",
+        ]
+        assert [r.getMessage() for r in warnings.records] == ["slow"]
+
+    def test_emit_does_not_format_on_caller_thread(self) -> None:
+        class SlowFormatter(logging.Formatter):
+            def format(self, record: logging.LogRecord) -> str:
+                time.sleep(0.05)
+                return super().format(record)
+
+        sink = ListHandler()
+        sink.setFormatter(SlowFormatter())
+        handler = BackgroundLogHandler(sink, maxsize=100)
+        test_logger = make_logger("test.background.async", handler)
+
+        handler.start()
+        start = time.perf_counter()
+        for _ in range(10):
+            test_logger.info("hot path")
+        elapsed = time.perf_counter() - start
+        handler.stop()
+
+        assert elapsed < 0.05
+        assert len(sink.records) == 10
+
+    def test_drops_when_full(self) -> None:
+        sink = ListHandler()
+        handler = BackgroundLogHandler(sink, maxsize=2)
+        test_logger = make_logger("test.background.full", handler)
+
+        # Not started: nothing drains the buffer
+        for i in range(4):
+            test_logger.info("info %d", i)
+        test_logger.error("failure")
+
+        stats = handler.stats()
+        assert stats["queued"] == 2
+        # Two INFO records dropped, and the oldest one evicted for the ERROR
+        assert stats["dropped"] == 3
+        assert stats["dropped_errors"] == 0
+
+        handler.start()
+        handler.stop()
+        assert [r.getMessage() for r in sink.records] == ["info 1", "failure"]
+
+    def test_message_is_frozen_when_queued(self) -> None:
+        sink = ListHandler()
+        handler = BackgroundLogHandler(sink, maxsize=10)
+        test_logger = make_logger("test.background.frozen", handler)
+
+        state = {"step": 1}
+        test_logger.info("state %s", state)
+        state["step"] = 2
+        handler.start()
+        handler.stop()
+
+        assert sink.records[0].getMessage() == "state {'step': 1}"
+
+    def test_application_logger_is_queued(self) -> None:
+        assert any(isinstance(h, BackgroundLogHandler) for h in logger.handlers)
+        assert logging_stats()["capacity"] > 0
+        assert logging_stats("unconfigured.logger") == {}
+
+
+class TestStructuredFormatter:
+    def test_uses_event_time(self) -> None:
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+        record.created = 0.0
+        record.url = "https://example.com"
+
+        data = json.loads(StructuredFormatter().format(record))
+        assert data["timestamp"] == "1970-01-01T00:00:00"
+        assert data["url"] == "https://example.com"
@@ -0,0 +1,105 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.doc_index import (
+    DocIndex,
+    DocIndexBuilder,
+    canonical_url,
+    index_terms,
+    iter_html_dump,
+)
+from mcp_server_mql5.indexer import build_from_dump, main
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+DOCS = "https://www.mql5.com/en/docs"
+
+
+@pytest.fixture(scope="module")
+def index() -> DocIndex:
+    return build_from_dump(FIXTURES)
+
+
+class TestDocIndex:
+    def test_index_terms_splits_identifiers(self) -> None:
+        terms = dict(index_terms("OrderSend ENUM_TIMEFRAMES"))
+        assert terms["ordersend"] == 1.0
+        assert "order" in terms and "send" in terms
+        assert "enum_timeframes" in terms and "timeframes" in terms
+
+    def test_builds_from_dump(self, index: DocIndex) -> None:
+        assert len(index) == len(list(FIXTURES.glob("*.html")))
+        urls = {doc.url for doc in index.docs}
+        assert f"{DOCS}/trading/ordersend" in urls
+
+    @pytest.mark.parametrize(
+        ("query", "url"),
+        [
+            ("OrderSend", "trading/ordersend"),
+            ("ordersend", "trading/ordersend"),
+            ("OrderSendAsync", "trading/ordersendasync"),
+            ("order send async", "trading/ordersendasync"),
+            ("iMA", "indicators/ima"),
+            ("MqlTradeRequest", "constants/structures/mqltraderequest"),
+            ("ENUM_TIMEFRAMES", "constants/chartconstants/enum_timeframes"),
+            ("OnTick", "basis/function/events"),
+            ("PositionOpen", "standardlibrary/tradeclasses/ctrade/ctradepositionopen"),
+        ],
+    )
+    def test_ranking(self, index: DocIndex, query: str, url: str) -> None:
+        hits = index.search(query)
+        assert hits[0].url == f"{DOCS}/{url}"
+        assert hits[0].coverage == 1.0
+
+    def test_unknown_term_is_not_confident(self, index: DocIndex) -> None:
+        hits = index.search("TerminoQueNoExiste123")
+        assert all(hit.coverage < 1.0 for hit in hits)
+        assert index.search("") == []
+
+    def test_search_is_fast(self, index: DocIndex) -> None:
+        start = time.perf_counter()
+        for _ in range(100):
+            index.search("OrderSend")
+        assert (time.perf_counter() - start) / 100 < 0.001
+
+    def test_save_and_load(self, index: DocIndex, tmp_path: Path) -> None:
+        path = tmp_path / "index.json.gz"
+        index.save(path)
+        loaded = DocIndex.load(path)
+
+        assert len(loaded) == len(index)
+        assert loaded.search("iMA")[0].url == index.search("iMA")[0].url
+
+    def test_builder_skips_duplicates(self) -> None:
+        html = (FIXTURES / "ima.html").read_text(encoding="utf-8")
+        builder = DocIndexBuilder()
+        assert builder.add_page("https://x/ima", html)
+        assert not builder.add_page("https://x/ima", html)
+        assert not builder.add_page("https://x/empty", "")
+
+    def test_dump_url_falls_back_to_path(self, tmp_path: Path) -> None:
+        (tmp_path / "trading").mkdir()
+        (tmp_path / "trading" / "ordercheck.html").write_text(
+            "<div class='doc-content'><h1>OrderCheck</h1></div>"
+        )
+        assert list(iter_html_dump(tmp_path))[0][0] == f"{DOCS}/trading/ordercheck"
+        assert canonical_url("<html></html>") is None
+
+    def test_cli(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        output = tmp_path / "index.json.gz"
+        symbols = tmp_path / "symbols.bin"
+        main(
+            [
+                "--from-dump",
+                str(FIXTURES),
+                "--output",
+                str(output),
+                "--symbols-output",
+                str(symbols),
+            ]
+        )
+
+        assert output.exists() and symbols.exists()
+        out = capsys.readouterr().out
+        assert "Indexed" in out and "Mapped" in out
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.executor import WorkerPool
+from mcp_server_mql5.core.scraper import MQL5Scraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+
+
+def fail() -> None:
+    raise ValueError("boom")
+
+
+class TestWorkerPool:
+    async def test_runs_function(self) -> None:
+        pool = WorkerPool(max_workers=2)
+        assert await pool.run(sum, [1, 2, 3]) == 6
+        assert pool.stats()["completed"] == 1
+        pool.close()
+
+    async def test_propagates_exceptions(self) -> None:
+        pool = WorkerPool(max_workers=1)
+        with pytest.raises(ValueError, match="boom"):
+            await pool.run(fail)
+        assert pool.failed == 1
+        assert pool.in_flight == 0
+        pool.close()
+
+    def test_rejects_invalid_config(self) -> None:
+        with pytest.raises(ValueError):
+            WorkerPool(kind="fiber")
+        with pytest.raises(ValueError):
+            WorkerPool(max_workers=0)
+
+    async def test_event_loop_stays_responsive(self) -> None:
+        pool = WorkerPool(max_workers=1)
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pool.run(time.sleep, 0.2)
+        task.cancel()
+
+        # A blocking call inline would have starved the ticker
+        assert ticks >= 5
+        pool.close()
+
+    async def test_backpressure_and_queue_metrics(self) -> None:
+        pool = WorkerPool(max_workers=1, max_queue=1)
+        tasks = [asyncio.create_task(pool.run(time.sleep, 0.1)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+
+        # One running, one queued in the executor, one waiting for a slot
+        assert pool.in_flight == 2
+        assert pool.waiting == 1
+        assert pool.queue_depth() == 2
+
+        await asyncio.gather(*tasks)
+        stats = pool.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["exec_avg_ms"] >= 90
+        # The last task queued behind two others
+        assert stats["queued_max_ms"] >= 150
+        pool.close()
+
+    async def test_cancelled_caller_keeps_slot_until_done(self) -> None:
+        pool = WorkerPool(max_workers=1, max_queue=0)
+        task = asyncio.create_task(pool.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.sleep(0)
+
+        assert pool.in_flight == 1
+        await pool.run(int, "1")  # Waits for the running task to finish
+        assert pool.in_flight == 0
+        pool.close()
+
+    async def test_process_pool(self) -> None:
+        pool = WorkerPool(kind="process", max_workers=2)
+        html = (FIXTURES / "ordersend.html").read_text(encoding="utf-8")
+        scraper = MQL5Scraper()
+
+        results = await asyncio.gather(
+            *(pool.run(scraper.extract_content, html, 500) for _ in range(4))
+        )
+        assert results == [scraper.extract_content(html, 500)] * 4
+        pool.close()
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.html_stream import StreamingExtractor, stream_sections
+from mcp_server_mql5.core.scraper import MQL5Scraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+BUDGETS = [0, 5, 100, 1000, 4000, 1_000_000]
+
+# Markup where tree-building details matter: entities, nesting, implicit
+# closing, void elements, comments, CDATA and non-text string containers.
+EDGE_CASES = [
+    "<div class='doc-content'><p>a &amp; b&#8212;c &foo; &#x41;&#147;</p></div>",
+    "<div class='x doc-content'><p>a<p>b</p>c</p><h2>t<script>x</script>u</h2></div>",
+    "<div class='doc-content'><p>a<nav><p>n</p>b</nav>c<br>d</br>e<br/>f<p/>g</div>",
+    "<div class='doc-content'><p>x<rt>r</rt><template><p>t</p></template>y</p></div>",
+    "<div class=doc-content><pre>  x\n  y </pre><!-- c -->z<p>a<!--c-->b"
+    "<![CDATA[cd]]>e<?pi?>f</p></body> tail <p>after</p>",
+    "<p>outer<div class='doc-content'><p>in</p></p><p>x</p>",
+    "<div class='doc-content'><p>unclosed <b>bold",
+    "<div class='doc-content'/><p>x</p>",
+    "<div class='doc-content'><span></p>x</span><p>y</div>z<p>w",
+    "<div class='doc-content'><h3>&#x;&#12ab;&#xzz;</h3></div>",
+    "<div class='doc-content'><p>&#128;&#x81;&#1114112;&#xFDD0;&#127;"
+    "&nbsp;&NotNestedLessLess;&amp</p><p>a<img>b<wbr>c<source></p></div>",
+]
+
+
+def reference(html: str, max_chars: int) -> list[str] | None:
+    return MQL5Scraper(backend="bs4").extract_sections(html, max_chars)
+
+
+class TestStreamingExtractor:
+    @pytest.mark.parametrize("page", sorted(FIXTURES.glob("*.html")), ids=str)
+    @pytest.mark.parametrize("max_chars", BUDGETS)
+    def test_matches_reference_on_fixtures(self, page: Path, max_chars: int) -> None:
+        html = page.read_text(encoding="utf-8")
+        assert stream_sections(html, max_chars) == reference(html, max_chars)
+
+    @pytest.mark.parametrize("html", EDGE_CASES)
+    @pytest.mark.parametrize("max_chars", [0, 1, 3, 10, 1000])
+    def test_matches_reference_on_edge_cases(self, html: str, max_chars: int) -> None:
+        assert stream_sections(html, max_chars) == reference(html, max_chars)
+
+    def test_invalid_references_are_replaced(self) -> None:
+        # Per the HTML spec (bs4 before 4.13 keeps NUL and lone surrogates)
+        html = "<div class='doc-content'><p>a&#xD800;b&#0;</p></div>"
+        assert stream_sections(html) == ["a\ufffdb\ufffd"]
+
+    def test_no_content_container(self) -> None:
+        assert stream_sections("<main><p>text</p></main>") is None
+        assert stream_sections("<div class='nodoc-content'><p>x</p></div>") is None
+
+    def test_incremental_feed(self) -> None:
+        html = (FIXTURES / "ordersend.html").read_text(encoding="utf-8")
+        extractor = StreamingExtractor(max_chars=4000)
+        for i in range(0, len(html), 97):
+            extractor.feed(html[i : i + 97])
+        extractor.close()
+
+        assert extractor.found
+        assert extractor.sections == reference(html, 4000)
+
+    def test_stops_at_budget(self) -> None:
+        html = "<div class='doc-content'><p>first</p><p>second</p>"
+        extractor = StreamingExtractor(max_chars=5)
+        extractor.feed(html)
+
+        # Done before the end of input: the rest of the page is never parsed
+        assert extractor.done
+        assert extractor.sections == ["first", "\n[truncated]"]
+        extractor.feed("<p>ignored</p>")
+        assert extractor.sections == ["first", "\n[truncated]"]
+
+    def test_stops_at_end_of_content(self) -> None:
+        extractor = StreamingExtractor()
+        extractor.feed("<div class='doc-content'><p>text</p></div><p>footer")
+        assert extractor.done
+        assert extractor.sections == ["text"]
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.http_cache import (
+    HTTPCache,
+    parse_cache_control,
+    request_key,
+)
+
+
+class TestHTTPCache:
+    @pytest.fixture
+    def cache(self, tmp_path: Path) -> HTTPCache:
+        return HTTPCache(tmp_path / "cache.sqlite3", default_ttl=60)
+
+    def test_store_and_get(self, cache: HTTPCache) -> None:
+        cache.store("k", "<html>body</html>", {"ETag": '"v1"'})
+
+        cached = cache.get("k")
+        assert cached is not None
+        assert cached.body == "<html>body</html>"
+        assert cached.is_fresh()
+        assert cached.validators() == {"If-None-Match": '"v1"'}
+        assert cache.get("missing") is None
+
+    def test_counters_are_exact_across_threads(self, cache: HTTPCache) -> None:
+        cache.store("k", "body", {})
+
+        def lookup(i: int) -> None:
+            cache.get("k" if i % 2 else "missing")
+
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lookup, range(400)))
+
+        assert (cache.hits, cache.misses) == (200, 200)
+
+    def test_persists_across_instances(self, tmp_path: Path) -> None:
+        first = HTTPCache(tmp_path / "cache.sqlite3")
+        first.store("k", "body", {})
+        first.close()
+
+        second = HTTPCache(tmp_path / "cache.sqlite3")
+        cached = second.get("k")
+        assert cached is not None
+        assert cached.body == "body"
+
+    def test_no_store_is_not_cached(self, cache: HTTPCache) -> None:
+        cache.store("k", "body", {"Cache-Control": "private, no-store"})
+        assert cache.get("k") is None
+
+    def test_no_cache_requires_revalidation(self, cache: HTTPCache) -> None:
+        cache.store("k", "body", {"Cache-Control": "no-cache"})
+        cached = cache.get("k")
+        assert cached is not None
+        assert not cached.is_fresh()
+
+    def test_max_age_and_revalidation(self, cache: HTTPCache) -> None:
+        cache.store(
+            "k",
+            "body",
+            {"Cache-Control": "max-age=0", "Last-Modified": "Mon, 01 Jan 2024"},
+        )
+        stale = cache.get("k")
+        assert stale is not None and not stale.is_fresh()
+        assert stale.validators() == {"If-Modified-Since": "Mon, 01 Jan 2024"}
+
+        cache.revalidated("k", {"Cache-Control": "max-age=3600"})
+        fresh = cache.get("k")
+        assert fresh is not None and fresh.is_fresh()
+        assert fresh.last_modified == "Mon, 01 Jan 2024"
+
+    def test_prunes_oldest_entries(self, tmp_path: Path) -> None:
+        cache = HTTPCache(tmp_path / "cache.sqlite3", max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.store(key, key, {})
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+
+
+def test_parse_cache_control() -> None:
+    assert parse_cache_control('max-age=60, no-cache, foo="bar"') == {
+        "max-age": "60",
+        "no-cache": None,
+        "foo": "bar",
+    }
+    assert parse_cache_control(None) == {}
+
+
+def test_request_key_sorts_params() -> None:
+    assert request_key("http://a/q", {"b": 1, "a": "x"}) == "http://a/q?a=x&b=1"
+    assert request_key("http://a/q") == "http://a/q"
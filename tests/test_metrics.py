@@ -0,0 +1,100 @@
+import aiohttp
+import pytest
+
+from mcp_server_mql5.core.metrics import (
+    Histogram,
+    MetricsRegistry,
+    metrics,
+    start_metrics_server,
+)
+from mcp_server_mql5.core.utils import log_execution_time
+
+
+class TestHistogram:
+    def test_quantile_interpolates_within_bucket(self) -> None:
+        histogram = Histogram(buckets=(1.0, 2.0, float("inf")))
+        for value in (0.5, 1.5, 1.5, 1.5):
+            histogram.observe(value)
+
+        assert histogram.count == 4
+        assert histogram.sum == 5.0
+        assert histogram.quantile(0.25) == 1.0
+        assert histogram.quantile(0.5) == pytest.approx(1 + 1 / 3)
+        assert histogram.quantile(1.0) == 2.0
+
+    def test_quantile_of_overflow_is_last_bound(self) -> None:
+        histogram = Histogram(buckets=(1.0, float("inf")))
+        histogram.observe(50.0)
+        assert histogram.quantile(0.99) == 1.0
+        assert Histogram().quantile(0.5) == 0.0
+
+
+class TestMetricsRegistry:
+    def test_render_prometheus_text(self) -> None:
+        registry = MetricsRegistry()
+        registry.describe("requests_total", "Requests.")
+        registry.inc("requests_total", status=200)
+        registry.inc("requests_total", 2, status=200)
+        registry.observe("latency_seconds", 0.003, stage="fetch")
+        registry.add_collector(lambda: [("queue_depth", {"host": "a"}, 4)])
+
+        text = registry.render()
+
+        assert "# HELP requests_total Requests.\n" in text
+        assert "# TYPE requests_total counter\n" in text
+        assert 'requests_total{status="200"} 3\n' in text
+        assert "# TYPE latency_seconds histogram\n" in text
+        assert 'latency_seconds_bucket{stage="fetch",le="0.0025"} 0\n' in text
+        assert 'latency_seconds_bucket{stage="fetch",le="0.005"} 1\n' in text
+        assert 'latency_seconds_bucket{stage="fetch",le="+Inf"} 1\n' in text
+        assert 'latency_seconds_count{stage="fetch"} 1\n' in text
+        assert '# TYPE queue_depth gauge\nqueue_depth{host="a"} 4\n' in text
+
+    def test_summary_and_reset(self) -> None:
+        registry = MetricsRegistry()
+        registry.inc("hits_total")
+        registry.observe("latency_seconds", 0.2)
+
+        def broken() -> list:
+            raise RuntimeError("collector failed")
+
+        registry.add_collector(broken)
+        summary = registry.summary()
+
+        assert summary["counters"] == {"hits_total": {"": 1.0}}
+        assert summary["histograms"]["latency_seconds"][""]["count"] == 1
+        assert 0.1 <= summary["histograms"]["latency_seconds"][""]["p50"] <= 0.25
+        assert summary["gauges"] == {}
+
+        registry.reset()
+        assert registry.summary()["counters"] == {}
+
+    def test_log_execution_time_records_stage(self) -> None:
+        metrics.reset()
+        with log_execution_time("unit_stage"):
+            pass
+        with pytest.raises(ValueError), log_execution_time("unit_stage"):
+            raise ValueError("boom")
+
+        summary = metrics.summary()
+        stage = summary["histograms"]["mql5_stage_duration_seconds"]
+        assert stage['{stage="unit_stage"}']["count"] == 2
+        assert summary["counters"]["mql5_stage_total"] == {
+            '{outcome="error",stage="unit_stage"}': 1.0,
+            '{outcome="success",stage="unit_stage"}': 1.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_metrics_endpoint(self) -> None:
+        registry = MetricsRegistry()
+        registry.inc("hits_total")
+        runner = await start_metrics_server(registry, port=0)
+        port = runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = f"http://127.0.0.1:{port}/metrics"
+                async with session.get(url) as response:
+                    assert response.status == 200
+                    assert "hits_total 1\n" in await response.text()
+        finally:
+            await runner.cleanup()
@@ -0,0 +1,80 @@
+import asyncio
+
+from mcp_server_mql5.core.prefetch import Prefetcher
+
+
+class TestPrefetcher:
+    async def test_prefetches_top_k_uncached(self) -> None:
+        cached = {"b"}
+        loaded: list[str] = []
+
+        async def load(url: str) -> None:
+            loaded.append(url)
+            cached.add(url)
+
+        prefetcher = Prefetcher(
+            load=load, is_cached=cached.__contains__, is_idle=lambda: True, top_k=2
+        )
+        assert prefetcher.schedule(["a", "b", "c", "d"]) == 2
+        await asyncio.sleep(0.01)
+
+        # Newest first
+        assert loaded == ["c", "a"]
+        assert prefetcher.stats()["prefetched"] == 2
+
+    async def test_hit_ratio(self) -> None:
+        async def load(url: str) -> None:
+            pass
+
+        prefetcher = Prefetcher(
+            load=load, is_cached=lambda url: False, is_idle=lambda: True
+        )
+        prefetcher.schedule(["a", "b"])
+        await asyncio.sleep(0.01)
+
+        prefetcher.record("a", cache_hit=True)
+        prefetcher.record("a", cache_hit=True)  # Only the first use counts
+        prefetcher.record("other", cache_hit=True)
+
+        stats = prefetcher.stats()
+        assert stats["hits"] == 1
+        assert stats["unused"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    async def test_waits_for_idle_and_drops_oldest(self) -> None:
+        idle = False
+        loaded: list[str] = []
+
+        async def load(url: str) -> None:
+            loaded.append(url)
+
+        prefetcher = Prefetcher(
+            load=load,
+            is_cached=lambda url: False,
+            is_idle=lambda: idle,
+            top_k=3,
+            max_queue=2,
+            poll_interval=0.01,
+        )
+        prefetcher.schedule(["a", "b", "c"])
+        await asyncio.sleep(0.03)
+        assert loaded == []
+        assert prefetcher.stats()["dropped"] == 1
+
+        idle = True
+        await asyncio.sleep(0.03)
+        assert loaded == ["c", "b"]
+        prefetcher.close()
+
+    async def test_failures_are_counted(self) -> None:
+        async def load(url: str) -> None:
+            raise ValueError("boom")
+
+        prefetcher = Prefetcher(
+            load=load, is_cached=lambda url: False, is_idle=lambda: True
+        )
+        prefetcher.schedule(["a"])
+        await asyncio.sleep(0.01)
+
+        assert prefetcher.failed == 1
+        assert prefetcher.prefetched == 0
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from mcp_server_mql5.core.resilience import CircuitBreaker, backoff_delay
+
+
+class TestBackoff:
+    def test_delay_is_capped_and_jittered(self) -> None:
+        delays = [backoff_delay(attempt, 0.5, 4) for attempt in range(1, 10)]
+        assert all(0 <= d <= 4 for d in delays)
+        assert all(0 <= backoff_delay(1, 0.5, 4) <= 0.5 for _ in range(20))
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure("a.com")
+        assert breaker.allow("a.com")
+        breaker.record_failure("a.com")
+
+        assert breaker.state("a.com") == "open"
+        assert not breaker.allow("a.com")
+        # Other hosts are unaffected
+        assert breaker.allow("b.com")
+        assert breaker.stats()["a.com"]["rejected"] == 1
+
+    def test_success_resets_failures(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("a.com")
+        breaker.record_success("a.com")
+        breaker.record_failure("a.com")
+        assert breaker.state("a.com") == "closed"
+
+    def test_half_open_probe(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with patch("mcp_server_mql5.core.resilience.time.monotonic") as now:
+            now.return_value = 100.0
+            breaker.record_failure("a.com")
+            assert not breaker.allow("a.com")
+
+            now.return_value = 131.0
+            assert breaker.state("a.com") == "half_open"
+            assert breaker.allow("a.com")  # The probe
+            assert not breaker.allow("a.com")  # Only one at a time
+
+            # A failed probe opens the circuit again
+            breaker.record_failure("a.com")
+            assert not breaker.allow("a.com")
+
+            now.return_value = 162.0
+            assert breaker.allow("a.com")
+            breaker.record_success("a.com")
+            assert breaker.state("a.com") == "closed"
+            assert breaker.stats()["a.com"]["opened"] == 2
@@ -1,14 +1,22 @@
+from pathlib import Path
 from typing import Any
 
 import pytest
 
-from mcp_server_mql5.core.scraper import MQL5Scraper
+from mcp_server_mql5.core.scraper import (
+    EXTRACTION_BACKENDS,
+    MQL5Scraper,
+    PageReader,
+    ParsedPage,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
 
 
 class TestMQL5Scraper:
-    @pytest.fixture
-    def scraper(self) -> MQL5Scraper:
-        return MQL5Scraper()
+    @pytest.fixture(params=EXTRACTION_BACKENDS)
+    def scraper(self, request: pytest.FixtureRequest) -> MQL5Scraper:
+        return MQL5Scraper(backend=request.param)
 
     def test_extract_content_success(self, scraper: Any) -> None:
         html = """
@@ -48,3 +56,93 @@ class TestMQL5Scraper:
         assert "Hello" in content
         assert "World" not in content
         assert "[truncated]" in content
+
+    def test_extract_sections(self, scraper: Any) -> None:
+        html = """
+        <div class="doc-content">
+            <h1>OrderSend</h1>
+            <nav><p>Menu</p></nav>
+            <p>Sends a <b>trade</b> request.</p>
+        </div>
+        """
+        assert scraper.extract_sections(html) == ["OrderSend", "Sends a trade request."]
+        assert scraper.extract_sections("") is None
+
+    def test_parse_page_links(self, scraper: Any) -> None:
+        html = """
+        <nav><a href="/en/docs/outside">Menu</a></nav>
+        <div class="doc-content">
+            <p>See <a href="/en/docs/constants/structures/mqltraderequest#x">
+            MqlTradeRequest</a> and <a href="ordercheck">OrderCheck</a>.</p>
+            <aside><a href="/en/docs/junk">Junk</a></aside>
+            <a href="/en/docs/trading/ordersend">Self</a>
+            <a href="/en/docs/constants/structures/mqltraderequest">Again</a>
+            <a href="https://www.mql5.com/en/forum">Forum</a>
+        </div>
+        """
+        parsed = scraper.parse_page(
+            html, "https://www.mql5.com/en/docs/trading/ordersend"
+        )
+        assert parsed.links == (
+            "https://www.mql5.com/en/docs/constants/structures/mqltraderequest",
+            "https://www.mql5.com/en/docs/trading/ordercheck",
+        )
+
+    def test_unknown_backend(self) -> None:
+        with pytest.raises(ValueError):
+            MQL5Scraper(backend="lxml")
+
+
+class TestParsedPage:
+    @pytest.mark.parametrize("page", sorted(FIXTURES.glob("*.html")), ids=str)
+    def test_render_matches_extract_content(self, page: Path) -> None:
+        scraper = MQL5Scraper()
+        html = page.read_text(encoding="utf-8")
+        parsed = scraper.parse_page(html)
+
+        for max_chars in [0, 5, 100, 1000, 4000, 1_000_000]:
+            assert parsed.render(max_chars) == scraper.extract_content(html, max_chars)
+
+    def test_no_content(self) -> None:
+        parsed = MQL5Scraper().parse_page("")
+        assert parsed.sections is None
+        assert parsed.render() == "Page found, no extractable content"
+
+
+class TestPageReader:
+    @pytest.mark.parametrize("page", sorted(FIXTURES.glob("*.html")), ids=str)
+    def test_partial_page_renders_like_full_page(self, page: Path) -> None:
+        scraper = MQL5Scraper()
+        html = page.read_text(encoding="utf-8")
+        full = scraper.parse_page(html)
+
+        for budget in [0, 100, 500, 1000]:
+            reader = PageReader(max_chars=budget)
+            for start in range(0, len(html), 256):
+                if reader.feed(html[start : start + 256]):
+                    break
+            partial = reader.page()
+            assert partial is not None
+
+            for max_chars in range(0, budget + 1, 50):
+                assert partial.covers(max_chars)
+                assert partial.render(max_chars) == full.render(max_chars)
+
+    def test_stops_once_budget_is_filled(self) -> None:
+        reader = PageReader(max_chars=5)
+        assert not reader.feed("<div class='doc-content'><p>Hello</p>")
+        assert reader.feed("<p>World</p>")
+        page = reader.page()
+        assert page == ParsedPage(("Hello",), budget=5)
+        assert not page.covers(6)
+
+    def test_short_page_is_complete(self) -> None:
+        reader = PageReader(max_chars=1000)
+        assert reader.feed("<div class='doc-content'><p>Hello</p></div>")
+        assert reader.page() == ParsedPage(("Hello",))
+
+    def test_no_content_container(self) -> None:
+        reader = PageReader()
+        assert not reader.feed("<main><p>Hello</p></main>")
+        assert reader.page() is None
+        assert reader.html == "<main><p>Hello</p></main>"
@@ -1,8 +1,98 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any
+from unittest.mock import patch
 
 import pytest
 
-from mcp_server_mql5.core.search import MQL5Searcher
+from mcp_server_mql5.core.doc_index import load_doc_index
+from mcp_server_mql5.core.search import MQL5Searcher, ResultRanker, json_decoder
+from mcp_server_mql5.indexer import build_from_dump
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+
+
+def api_result(name: str, url: str, module: str = "docs") -> dict[str, Any]:
+    return {
+        "module": f"mql5.com.en.{module}",
+        "info": {"url": url, "title": f"{name} - Trade Functions - MQL5 Reference"},
+    }
+
+
+class TestResultRanker:
+    RESULTS = [
+        api_result(
+            "OrderSendAsync", "https://www.mql5.com/en/docs/trading/ordersendasync"
+        ),
+        api_result("OrderSend", "https://www.mql5.com/en/forum/1", module="forum"),
+        api_result("OrderSend", "https://www.mql5.com/en/docs/trading/ordersend"),
+        api_result("OrderCheck", "https://www.mql5.com/en/docs/trading/ordercheck"),
+    ]
+
+    def test_exact_match_beats_prefix_and_order(self) -> None:
+        ranked = ResultRanker("ordersend()").rank(self.RESULTS)
+
+        # An exact name in the forum still beats a prefix match in the docs
+        assert [r.url.rpartition("/")[2] for r in ranked] == [
+            "ordersend",
+            "1",
+            "ordersendasync",
+            "ordercheck",
+        ]
+        assert ranked[0].features["exact"] == 1.0
+        assert ranked[2].features["prefix"] == 1.0
+        assert ranked[0].score > ranked[1].score
+
+    def test_top_k_and_ties_keep_api_order(self) -> None:
+        results = [
+            api_result("A", "https://www.mql5.com/en/docs/a"),
+            api_result("B", "https://www.mql5.com/en/docs/b"),
+            api_result("C", "https://www.mql5.com/en/docs/c"),
+        ]
+        ranked = ResultRanker("zzz").rank(results, top_k=2)
+        assert [r.title[0] for r in ranked] == ["A", "B"]
+
+    def test_slug_match_and_custom_weights(self) -> None:
+        results = [
+            api_result(
+                "Chart Timeframes", "https://www.mql5.com/en/forum/x/y", "forum"
+            ),
+            api_result(
+                "Chart Periods",
+                "https://www.mql5.com/en/docs/constants/chartconstants/enum_timeframes",
+            ),
+        ]
+        assert ResultRanker("ENUM_TIMEFRAMES").rank(results)[0].features["exact"] == 1
+
+        weights = {"exact": 0.0, "prefix": 0.0, "overlap": 0.0, "module": 0.0}
+        ranker = ResultRanker("timeframes", weights={**weights, "depth": 1.0})
+        assert ranker.rank(results)[0].url.endswith("/x/y")
+
+        with pytest.raises(ValueError, match="depth"):
+            ResultRanker("timeframes", weights=weights)
+
+    def test_rank_api(self) -> None:
+        response = json.dumps({"results": [{"module": "x", "info": {}}, *self.RESULTS]})
+        ranked = MQL5Searcher.rank_api(response, "OrderSend", top_k=1)
+        assert [r.url for r in ranked] == [self.RESULTS[2]["info"]["url"]]
+        # Raw response bytes, as returned by WebClient.get_bytes
+        ranked = MQL5Searcher.rank_api(response.encode(), "OrderSend", top_k=1)
+        assert [r.url for r in ranked] == [self.RESULTS[2]["info"]["url"]]
+        assert MQL5Searcher.rank_api(b"{", "OrderSend") == []
+
+
+class TestJsonDecoder:
+    def test_backends(self) -> None:
+        assert json_decoder("json") is json.loads
+        assert json_decoder("auto")(b'{"results": []}') == {"results": []}
+        with pytest.raises(ValueError, match="Unknown JSON backend"):
+            json_decoder("simdjson")
+
+    def test_orjson_errors_are_json_errors(self) -> None:
+        pytest.importorskip("orjson")
+        with pytest.raises(json.JSONDecodeError):
+            json_decoder("orjson")(b"{")
 
 
 class TestMQL5Searcher:
@@ -53,10 +143,8 @@ class TestMQL5Searcher:
         }
         """
         result = searcher.find_best_match_api(json_response, "term")
-        # Should pick docs even if it's second in the list (logic filters and
-        # concatenates)
-        # Actually my logic was: docs_results + other_results.
-        # So docs should come first.
+        # Should pick docs even if it's second in the list: the docs module
+        # weighs more than the forum
         assert result == "https://docs"
 
     def test_find_best_match_api_missing_url(self, searcher: Any) -> None:
@@ -72,3 +160,39 @@ class TestMQL5Searcher:
         """
         result = searcher.find_best_match_api(json_response, "term")
         assert result is None
+
+    def test_find_best_match_local_without_index(self, searcher: Any) -> None:
+        assert searcher.find_best_match_local("OrderSend") is None
+
+    def test_find_best_match_local(self, tmp_path: Path) -> None:
+        path = tmp_path / "index.json.gz"
+        build_from_dump(FIXTURES).save(path)
+        searcher = MQL5Searcher(index_path=path)
+
+        result = searcher.find_best_match_local("OrderSend")
+        assert result == "https://www.mql5.com/en/docs/trading/ordersend"
+        # Not confident: fall back to the API
+        assert searcher.find_best_match_local("TerminoQueNoExiste123") is None
+
+    def test_load_index_once_across_threads(self, tmp_path: Path) -> None:
+        path = tmp_path / "index.json.gz"
+        build_from_dump(FIXTURES).save(path)
+        searcher = MQL5Searcher(index_path=path)
+
+        with patch(
+            "mcp_server_mql5.core.search.load_doc_index", wraps=load_doc_index
+        ) as load:
+            with ThreadPoolExecutor(4) as pool:
+                indexes = list(pool.map(lambda _: searcher.load_index(), range(8)))
+            assert searcher.find_best_match_local("OrderSend") is not None
+
+        assert load.call_count == 1
+        assert all(index is indexes[0] is not None for index in indexes)
+
+    def test_find_best_match_local_missing_index(self, tmp_path: Path) -> None:
+        searcher = MQL5Searcher(index_path=tmp_path / "missing.json.gz")
+        assert searcher.may_search_local
+        assert searcher.find_best_match_local("OrderSend") is None
+        # Known to be missing once loading was tried
+        assert not searcher.may_search_local
+        assert not MQL5Searcher().may_search_local
@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from mcp_server_mql5.core.scraper import MQL5Scraper, ParsedPage
+from mcp_server_mql5.core.sections import (
+    focus_section,
+    heading_kind,
+    rank_sections,
+    select_sections,
+    split_sections,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+
+
+def render_sections(page: ParsedPage, *args: Any, **kwargs: Any) -> str:
+    return "\n\n".join(select_sections(page, *args, **kwargs))
+
+
+def parse(name: str) -> ParsedPage:
+    html = (FIXTURES / f"{name}.html").read_text(encoding="utf-8")
+    return MQL5Scraper().parse_page(html)
+
+
+class TestSplitSections:
+    def test_heading_kind(self) -> None:
+        assert heading_kind("Return Value") == "return_value"
+        assert heading_kind("Example:") == "example"
+        assert heading_kind("Fields description") == "parameters"
+        assert heading_kind("Example of a buy order:") == "example"
+        assert heading_kind("Returns the value of the property.") is None
+
+    def test_reference_page(self) -> None:
+        outline = parse("ordersend").outline
+
+        assert [s.kind for s in outline] == [
+            "summary",
+            "signature",
+            "parameters",
+            "return_value",
+            "notes",
+            "example",
+            "see_also",
+        ]
+        signature = outline[1].texts[0]
+        assert signature.startswith("bool\xa0\xa0OrderSend(")
+        assert outline[2].heading == "Parameters"
+        assert outline[2].texts[0] == "request"
+
+    def test_caption_labels_one_code_block(self) -> None:
+        outline = split_sections(
+            (
+                "Fields description",
+                "action",
+                "Trade operation type.",
+                "Example of a buy order:",
+                "void\xa0OnStart()",
+                "Market Execution",
+                "See also",
+                "OrderSend",
+            )
+        )
+
+        fields, example, see_also = outline
+        assert fields.texts == ("action", "Trade operation type.", "Market Execution")
+        assert example.texts == ("void\xa0OnStart()",)
+        assert see_also.kind == "see_also"
+
+    def test_outline_is_cached_with_the_page(self) -> None:
+        page = parse("ima")
+        assert page.outline is page.outline
+        assert ParsedPage(None).outline == ()
+
+
+class TestRankSections:
+    def test_query_matches_the_relevant_section(self) -> None:
+        outline = parse("ordersend").outline
+        ranked = rank_sections(outline, "return value")
+        assert ranked[0][0].kind == "return_value"
+        assert rank_sections(outline, "zzz") == []
+
+    def test_focus_keeps_names_and_descriptions(self) -> None:
+        fields = parse("mqltraderequest").outline[2]
+        lines = focus_section(fields, "type_filling")
+
+        assert lines[0] == "Fields description"
+        i = lines.index("type_filling")
+        assert "ENUM_ORDER_TYPE_FILLING" in lines[i + 1]
+        assert len(lines) < len(fields.lines)
+
+
+class TestSelectSections:
+    def test_kinds_in_document_order(self) -> None:
+        text = render_sections(parse("ordersend"), ["return_value", "signature"])
+        title, signature, heading, *_ = text.split("\n\n")
+
+        assert title == "OrderSend"
+        assert signature.startswith("bool\xa0\xa0OrderSend(")
+        assert heading == "Return Value"
+        assert "Parameters" not in text
+        assert text.endswith(
+            "Sections: summary, signature, parameters, return_value, notes, "
+            "example, see_also"
+        )
+
+    def test_query_beyond_the_first_max_chars(self) -> None:
+        page = parse("mqltraderequest")
+        assert "type_filling" not in page.render(1000).split("Fields description")[0]
+
+        text = render_sections(page, query="type_filling", max_chars=1000)
+        assert "ENUM_ORDER_TYPE_FILLING" in text
+        assert len(text) < 1100
+
+    def test_long_section_is_cut(self) -> None:
+        text = render_sections(parse("mqltraderequest"), ["signature"], max_chars=200)
+        assert "struct\xa0MqlTradeRequest" in text
+        assert "[truncated]" in text
+
+    @pytest.mark.parametrize(
+        ("page", "expected"),
+        [
+            (ParsedPage(("Title", "Text")), "Title\n\nNo notes section"),
+            (ParsedPage(None), "Page found, no extractable content"),
+        ],
+    )
+    def test_missing_section(self, page: ParsedPage, expected: str) -> None:
+        assert render_sections(page, ["notes"]).startswith(expected)
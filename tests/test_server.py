@@ -1,8 +1,119 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from aiohttp import web
 
-from mcp_server_mql5.server import search_mql5_docs
+from mcp_server_mql5 import server
+from mcp_server_mql5.core.config import BATCH_MAX_TERMS
+from mcp_server_mql5.core.metrics import metrics
+from mcp_server_mql5.core.scraper import ParsedPage
+from mcp_server_mql5.core.tracing import tracer
+from mcp_server_mql5.core.utils import RateLimiter
+from mcp_server_mql5.server import (
+    export_mql5_trace,
+    get_mql5_server_metrics,
+    is_idle,
+    page_cache,
+    prefetcher,
+    search_mql5_docs,
+    search_mql5_docs_batch,
+    term_cache,
+    term_key,
+    warm_term,
+    workers,
+)
+
+CLEANED = ParsedPage(("Cleaned Content",))
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> Generator[None, None, None]:
+    term_cache.clear()
+    page_cache.clear()
+    yield
+    term_cache.clear()
+    page_cache.clear()
+
+
+DOC_PAGES = {
+    "/en/docs/trading/ordersend": (
+        "<div class='doc-content'><h1>OrderSend</h1><p>Sends trade requests, see "
+        "<a href='../constants/structures/mqltraderequest'>MqlTradeRequest</a>."
+        "</p></div>"
+    ),
+    "/en/docs/constants/structures/mqltraderequest": (
+        "<div class='doc-content'><h1>MqlTradeRequest</h1>"
+        "<p>Trade request structure.</p></div>"
+    ),
+}
+
+
+async def discard_client() -> None:
+    if server._lazy_client.created:
+        await server.client.close()
+        server._lazy_client._discard()
+
+
+@pytest.fixture
+async def docs_site(tmp_path: Path) -> AsyncGenerator[dict[str, int], None]:
+    # The search API and DOC_PAGES, served locally; the server is pointed at
+    # them through its configuration and uses its own client, not a mock.
+    # Yields the number of requests received per path.
+    requests: dict[str, int] = {}
+    origin = ""
+
+    async def search(request: web.Request) -> web.Response:
+        requests[request.path] = requests.get(request.path, 0) + 1
+        name = request.query["keyword"].lower()
+        path = next(p for p in DOC_PAGES if p.endswith(f"/{name}"))
+        url = origin + path
+        title = f"{request.query['keyword']} - Trade Functions - MQL5 Reference"
+        return web.json_response(
+            {
+                "results": [
+                    {"module": "mql5.com.en.docs", "info": {"url": url, "title": title}}
+                ]
+            }
+        )
+
+    async def page(request: web.Request) -> web.Response:
+        requests[request.path] = requests.get(request.path, 0) + 1
+        if request.path not in DOC_PAGES:
+            raise web.HTTPNotFound()
+        return web.Response(text=DOC_PAGES[request.path], content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/api/query", search)
+    app.router.add_get("/en/docs/{path:.*}", page)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    origin = f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+    # The client is built on first use, with the configuration patched below
+    await discard_client()
+    try:
+        with (
+            patch.object(server, "limiter", RateLimiter(calls_per_minute=600)),
+            patch.object(server, "MQL5_SEARCH_API", f"{origin}/api/query"),
+            patch.object(server, "HTTP_CACHE_PATH", tmp_path / "http_cache.sqlite3"),
+            patch.object(server, "SEARCH_MODE", "api"),
+            patch.object(server.searcher, "symbol_index", None),
+            patch("mcp_server_mql5.core.scraper.DOCS_BASE_URL", f"{origin}/en/docs"),
+        ):
+            yield requests
+    finally:
+        await discard_client()
+        await runner.cleanup()
 
 
 @pytest.mark.asyncio
@@ -12,25 +123,19 @@ async def test_search_mql5_docs_success() -> None:
         patch("mcp_server_mql5.server.client") as mock_client,
         patch("mcp_server_mql5.server.searcher") as mock_searcher,
         patch("mcp_server_mql5.server.scraper") as mock_scraper,
-        patch("mcp_server_mql5.server.cached_search", return_value=None),
     ):
         # Setup mocks
-        mock_client.get = AsyncMock(
-            return_value='{"results": []}'
-        )  # Initial search response (mocked below actually)
-        # Wait, the server code calls client.get(API) now.
-
-        # 1. API Search response
-        mock_client.get.side_effect = [
-            '{"results": ["stuff"]}',  # First call: API search
-            "<html>doc content</html>",  # Second call: Fetch doc
-        ]
+        # 1. API Search response (raw bytes), then the doc page
+        mock_client.get_bytes = AsyncMock(return_value=b'{"results": ["stuff"]}')
+        mock_client.get = AsyncMock(return_value="<html>doc content</html>")
 
-        # 2. Searcher logic
+        # 2. Searcher logic (no offline index)
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
         mock_searcher.find_best_match_api.return_value = "https://found-url"
 
         # 3. Scraper logic
-        mock_scraper.extract_content.return_value = "Cleaned Content"
+        mock_scraper.parse_page.return_value = CLEANED
 
         # Execute
         result = await search_mql5_docs("term")
@@ -42,11 +147,259 @@ async def test_search_mql5_docs_success() -> None:
 
 @pytest.mark.asyncio
 async def test_search_mql5_docs_cached() -> None:
-    # If cached_search returns value, we should get it immediately
-    with patch("mcp_server_mql5.server.cached_search", return_value="Cached Result"):
+    # If both caches have a value, we should get it immediately
+    term_cache.set(term_key("term"), "https://cached-url")
+    page_cache.set("https://cached-url", ParsedPage(("Cached Result",)))
+    with patch("mcp_server_mql5.server.client") as mock_client:
         result = await search_mql5_docs("term")
         assert "[CACHED]" in result
         assert "Cached Result" in result
+        mock_client.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_repeat_is_cached() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        first = await search_mql5_docs("OrderSend")
+        # Normalized term hits the same entry
+        second = await search_mql5_docs("  ordersend ")
+
+        assert second == f"[CACHED]\n{first}"
+        assert mock_client.get_bytes.await_count == 1
+        assert mock_client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_other_max_chars_reuses_page() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = ParsedPage(("First", "Second"))
+
+        full = await search_mql5_docs("OrderSend", max_chars=4000)
+        short = await search_mql5_docs("OrderSend", max_chars=5)
+
+        assert "First\n\nSecond" in full
+        assert short == "[CACHED]\nSOURCE: https://found-url\n\nFirst\n\n\n[truncated]"
+        # Fetched and parsed once for both limits
+        assert mock_client.get_bytes.await_count == 1
+        assert mock_client.get.await_count == 1
+        mock_scraper.parse_page.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_shares_url_across_pages() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = "https://symbol-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        await search_mql5_docs("OrderSend")
+        # A different term resolving to the same page reuses the parsed page
+        page_cache_hits = page_cache.hits
+        await search_mql5_docs("ordersend()")
+
+        assert page_cache.hits == page_cache_hits + 1
+        mock_client.get.assert_awaited_once_with("https://symbol-url")
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_sections_reuse_full_page() -> None:
+    page = ParsedPage(
+        ("OrderSend", "Sends a request.", "Return Value", "true on success.")
+    )
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = "https://symbol-url"
+        mock_scraper.parse_page.return_value = page
+
+        # Small budgets are streamed, unless only some sections are wanted
+        result = await search_mql5_docs("OrderSend", 100, sections=["return_value"])
+        ranked = await search_mql5_docs("OrderSend", 100, query="success")
+        unknown = await search_mql5_docs("OrderSend", sections=["body"])
+
+        assert result == (
+            "SOURCE: https://symbol-url\n\nOrderSend\n\nReturn Value\n\n"
+            "true on success.\n\nSections: summary, return_value"
+        )
+        assert ranked.startswith("[CACHED]\nSOURCE: https://symbol-url\n\nOrderSend")
+        assert unknown.startswith("Unknown sections ['body']")
+        mock_client.get.assert_awaited_once_with("https://symbol-url")
+        mock_client.get_partial.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_compacts_to_token_budget() -> None:
+    page = ParsedPage(
+        ("OrderSend", "See\xa0\xa0also:  OrderCheck ,  OrderSendAsync", "Note " * 300)
+    )
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = "https://symbol-url"
+        mock_scraper.parse_page.return_value = page
+
+        result = await search_mql5_docs("OrderSend", max_tokens=200)
+
+        assert result == (
+            "SOURCE: https://symbol-url\n\nOrderSend\n\n"
+            "See also: OrderCheck, OrderSendAsync\n\n\n[truncated]"
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_concurrent_single_flight() -> None:
+    async def slow_get(url: str, params: object = None) -> str:
+        await asyncio.sleep(0.01)
+        return "<html></html>"
+
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(side_effect=slow_get)
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        results = await asyncio.gather(*(search_mql5_docs("iMA") for _ in range(5)))
+
+        assert len(set(results)) == 1
+        # One API lookup and one page fetch shared by all five callers
+        assert mock_client.get_bytes.await_count == 1
+        assert mock_client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_local_index_skips_api() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = None
+        threads = []
+
+        def find_local(term: str) -> str:
+            threads.append(threading.current_thread())
+            return "https://local-url"
+
+        mock_searcher.find_best_match_local.side_effect = find_local
+        mock_scraper.parse_page.return_value = CLEANED
+
+        result = await search_mql5_docs("OrderSend")
+        # The index query runs in the worker pool, off the event loop
+        assert threads and threads[0] is not threading.main_thread()
+
+        assert "SOURCE: https://local-url" in result
+        # Only the page fetch, no search API call
+        mock_client.get.assert_awaited_once_with("https://local-url")
+        mock_searcher.find_best_match_api.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_records_the_step_that_resolved_the_term() -> None:
+    tracer.clear()
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.side_effect = lambda t: (
+            "https://symbol-url" if t == "OrderSend" else None
+        )
+        mock_searcher.find_best_match_local.side_effect = lambda t: (
+            "https://local-url" if t == "trade request" else None
+        )
+        mock_searcher.find_best_match_api.side_effect = lambda response, t: (
+            "https://found-url" if t == "filling mode" else None
+        )
+        mock_scraper.parse_page.return_value = CLEANED
+
+        for term in ("OrderSend", "trade request", "filling mode", "nothing"):
+            await search_mql5_docs(term)
+
+    resolved = [
+        span.attributes.get("resolved_by")
+        for span in tracer.spans()
+        if span.name == "full_search"
+    ]
+    # Not found: no step resolved it
+    assert resolved == ["symbol_index", "local_index", "search_api", None]
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_without_local_index_skips_workers() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.may_search_local = False
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        result = await search_mql5_docs("OrderSend")
+
+        assert "SOURCE: https://found-url" in result
+        mock_searcher.find_best_match_local.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_exact_symbol_skips_search() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = "https://symbol-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        result = await search_mql5_docs("ENUM_TIMEFRAMES")
+
+        assert "SOURCE: https://symbol-url" in result
+        mock_client.get.assert_awaited_once_with("https://symbol-url")
+        mock_searcher.find_best_match_local.assert_not_called()
+        mock_searcher.find_best_match_api.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -54,10 +407,309 @@ async def test_search_mql5_docs_no_results() -> None:
     with (
         patch("mcp_server_mql5.server.client") as mock_client,
         patch("mcp_server_mql5.server.searcher") as mock_searcher,
-        patch("mcp_server_mql5.server.cached_search", return_value=None),
     ):
-        mock_client.get = AsyncMock(return_value="{}")
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
         mock_searcher.find_best_match_api.return_value = None
 
         result = await search_mql5_docs("term")
         assert "No documentation found" in result
+        # Failures are not cached
+        assert len(term_cache) == 0
+        assert len(page_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_batch_concurrent_in_order() -> None:
+    urls = {"ordersend": "https://docs/ordersend", "ima": "https://docs/ima"}
+
+    async def slow_get(url: str, params: object = None) -> str:
+        await asyncio.sleep(0.1)
+        return f"<html>{url}</html>"
+
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(side_effect=slow_get)
+        mock_searcher.find_exact_symbol.side_effect = lambda t: urls.get(t.lower())
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = None
+        mock_scraper.parse_page.side_effect = lambda html, url: ParsedPage((html,))
+
+        start = time.perf_counter()
+        result = await search_mql5_docs_batch(["OrderSend", "iMA", "ordersend", "Nope"])
+        elapsed = time.perf_counter() - start
+
+    sections = result.split("\n\n=== ")
+    assert sections[0].startswith(
+        "=== [1/4] OrderSend ===\nSOURCE: https://docs/ordersend"
+    )
+    assert sections[1].startswith("[2/4] iMA ===\nSOURCE: https://docs/ima")
+    # The duplicate reuses the first result
+    assert sections[2].startswith("[3/4] ordersend ===\nSOURCE: https://docs/ordersend")
+    # Errors are reported per item
+    assert sections[3] == "[4/4] Nope ===\nNo documentation found for 'Nope'"
+
+    # Two page fetches (plus one API lookup) ran concurrently, not in sequence
+    assert mock_client.get.await_count == 2
+    assert mock_client.get_bytes.await_count == 1
+    assert elapsed < 0.25
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_batch_limits() -> None:
+    assert await search_mql5_docs_batch([]) == "No search terms given"
+    result = await search_mql5_docs_batch(["x"] * (BATCH_MAX_TERMS + 1))
+    assert result.startswith("Too many search terms")
+
+
+@pytest.mark.asyncio
+async def test_warm_term_fills_caches() -> None:
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b"{}")
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        assert await warm_term("OrderSend") is False
+        assert await warm_term("OrderSend") is True
+
+        result = await search_mql5_docs("ordersend")
+        assert result.startswith("[CACHED]")
+        assert mock_client.get_bytes.await_count == 1
+        assert mock_client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_prefetches_links() -> None:
+    linked = "https://www.mql5.com/en/docs/constants/structures/mqltraderequest"
+    pages = {
+        "https://found-url": ParsedPage(("OrderSend",), links=(linked,)),
+        linked: ParsedPage(("MqlTradeRequest",)),
+    }
+
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+        patch("mcp_server_mql5.server.PREFETCH_ENABLED", True),
+    ):
+        mock_client.get = AsyncMock(side_effect=lambda url, params=None: url)
+        mock_client.breaker = None
+        mock_searcher.find_exact_symbol.side_effect = lambda t: (
+            "https://found-url" if t == "OrderSend" else linked
+        )
+        mock_scraper.parse_page.side_effect = lambda html, url: pages[url]
+
+        hits = prefetcher.hits
+        await search_mql5_docs("OrderSend")
+        await asyncio.sleep(0.01)
+        assert linked in page_cache
+
+        result = await search_mql5_docs("MqlTradeRequest")
+
+    assert result == f"SOURCE: {linked}\n\nMqlTradeRequest"
+    # The linked page was fetched once, by the prefetcher
+    assert mock_client.get.await_count == 2
+    assert prefetcher.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_small_budget_streams_page() -> None:
+    html = "<div class='doc-content'>" + "<p>Paragraph text.</p>" * 500 + "</div>"
+
+    async def get_partial(url: str, feed: Any, params: object = None) -> int:
+        for start in range(0, len(html), 1024):
+            if await feed(html[start : start + 1024]):
+                return start + 1024
+        return len(html)
+
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+    ):
+        mock_client.get_partial = AsyncMock(side_effect=get_partial)
+        mock_client.get = AsyncMock(return_value=html)
+        mock_searcher.find_exact_symbol.return_value = "https://found-url"
+
+        completed = workers.completed
+        small = await search_mql5_docs("OrderSend", max_chars=100)
+        assert small.endswith("[truncated]")
+        assert mock_client.get_partial.await_count == 1
+        # Chunks are parsed in the bounded worker pool
+        assert workers.completed > completed
+        mock_client.get.assert_not_called()
+
+        # A larger budget than the partial page covers loads the full page
+        large = await search_mql5_docs("OrderSend", max_chars=5000)
+        assert not large.startswith("[CACHED]")
+        assert mock_client.get.await_count == 1
+
+        # The full page now serves small budgets too
+        again = await search_mql5_docs("OrderSend", max_chars=100)
+        assert again == f"[CACHED]\n{small}"
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_serves_stale_and_refreshes() -> None:
+    with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=0.0):
+        term_cache.set(term_key("term"), "https://cached-url")
+        page_cache.set("https://cached-url", ParsedPage(("Old Result",)))
+
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+    ):
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_searcher.find_exact_symbol.return_value = "https://cached-url"
+        mock_scraper.parse_page.return_value = ParsedPage(("New Result",))
+
+        # Past the soft TTL: the old page is returned without waiting
+        with patch(
+            "mcp_server_mql5.core.cache.time.monotonic",
+            return_value=page_cache.ttl + 1,
+        ):
+            result = await search_mql5_docs("term")
+        assert "[CACHED]" in result
+        assert "Old Result" in result
+
+        await asyncio.sleep(0.05)
+        result = await search_mql5_docs("term")
+
+    assert "New Result" in result
+    assert page_cache.stale_hits >= 1
+
+
+@pytest.mark.asyncio
+async def test_stale_page_refresh_loads_complete_page() -> None:
+    html = "<div class='doc-content'>" + "<p>Paragraph text.</p>" * 500 + "</div>"
+    with patch("mcp_server_mql5.core.cache.time.monotonic", return_value=0.0):
+        term_cache.set(term_key("OrderSend"), "https://found-url")
+        page_cache.set("https://found-url", ParsedPage(("Old Result",)))
+
+    with patch("mcp_server_mql5.server.client") as mock_client:
+        mock_client.get = AsyncMock(return_value=html)
+        mock_client.get_partial = AsyncMock(return_value=len(html))
+
+        # A small request past the soft TTL refreshes with the complete page
+        with patch(
+            "mcp_server_mql5.core.cache.time.monotonic",
+            return_value=page_cache.ttl + 1,
+        ):
+            result = await search_mql5_docs("OrderSend", max_chars=100)
+        assert "Old Result" in result
+        await asyncio.sleep(0.05)
+
+    mock_client.get_partial.assert_not_called()
+    assert mock_client.get.await_count == 1
+    page = page_cache.get("https://found-url")
+    assert page is not None and page.covers(sys.maxsize)
+
+
+@pytest.mark.asyncio
+async def test_get_mql5_server_metrics_reports_stages() -> None:
+    metrics.reset()
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+        patch("mcp_server_mql5.server._lazy_client", SimpleNamespace(created=True)),
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b'{"results": ["stuff"]}')
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_client.breaker = None
+        mock_client.http_cache = None
+        mock_client.stats.return_value = {"fetches": 2, "coalesced": 1}
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        await search_mql5_docs("term", max_chars=100_000)
+        report = json.loads(await get_mql5_server_metrics())
+
+    stages = report["histograms"]["mql5_stage_duration_seconds"]
+    for stage in ("search_api", "page_fetch", "page_parse", "full_search"):
+        assert stages[f'{{stage="{stage}"}}']["count"] == 1
+    lookups = report["gauges"]["mql5_cache_lookups"]
+    assert lookups['{cache="term_cache",result="misses"}'] >= 1
+    gets = report["gauges"]["mql5_http_gets"]
+    assert gets == {'{result="fetches"}': 2, '{result="coalesced"}': 1}
+
+
+@pytest.mark.asyncio
+async def test_search_spans_are_exported(tmp_path: Path) -> None:
+    tracer.clear()
+    with (
+        patch("mcp_server_mql5.server.client") as mock_client,
+        patch("mcp_server_mql5.server.searcher") as mock_searcher,
+        patch("mcp_server_mql5.server.scraper") as mock_scraper,
+        patch("mcp_server_mql5.server.TRACE_DIR", tmp_path),
+    ):
+        mock_client.get_bytes = AsyncMock(return_value=b'{"results": ["stuff"]}')
+        mock_client.get = AsyncMock(return_value="<html></html>")
+        mock_client.breaker = None
+        mock_searcher.find_exact_symbol.return_value = None
+        mock_searcher.find_best_match_local.return_value = None
+        mock_searcher.find_best_match_api.return_value = "https://found-url"
+        mock_scraper.parse_page.return_value = CLEANED
+
+        await search_mql5_docs("term", max_chars=100_000)
+        result = await export_mql5_trace("otlp")
+        assert "Unknown trace format" in await export_mql5_trace("xml")
+
+    (path,) = tmp_path.glob("trace-*.otlp.json")
+    assert f"to {path}" in result
+    spans = json.loads(path.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["full_search"]
+    for name in ("search_api", "page_fetch", "page_parse", "render"):
+        assert by_name[name]["traceId"] == root["traceId"]
+    assert by_name["render"]["parentSpanId"] == root["spanId"]
+
+
+@pytest.mark.asyncio
+async def test_search_mql5_docs_with_real_client(docs_site: dict[str, int]) -> None:
+    result = await search_mql5_docs("OrderSend")
+
+    assert "Sends trade requests" in result
+    assert result.startswith("SOURCE: http://127.0.0.1:")
+    assert docs_site == {"/api/query": 1, "/en/docs/trading/ordersend": 1}
+
+
+@pytest.mark.asyncio
+async def test_prefetch_with_real_client(docs_site: dict[str, int]) -> None:
+    prefetcher.close()
+    hits, prefetched = prefetcher.hits, prefetcher.prefetched
+    with patch.object(server, "PREFETCH_ENABLED", True):
+        await search_mql5_docs("OrderSend")
+        for _ in range(100):
+            if prefetcher.prefetched > prefetched:
+                break
+            await asyncio.sleep(0.01)
+
+        result = await search_mql5_docs("MqlTradeRequest")
+
+    assert "Trade request structure" in result
+    # The linked page was fetched once, by the prefetcher
+    assert docs_site["/en/docs/constants/structures/mqltraderequest"] == 1
+    assert prefetcher.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_is_idle_does_not_create_the_client() -> None:
+    await discard_client()
+
+    assert is_idle()
+    assert not server._lazy_client.created
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from mcp_server_mql5.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_load(self) -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        calls = 0
+
+        async def loader() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        first, first_joined = flights.join("k", loader)
+        second, second_joined = flights.join("k", loader)
+        assert "k" in flights
+
+        assert await asyncio.gather(first, second) == ["value", "value"]
+        assert (first_joined, second_joined) == (False, True)
+        assert calls == 1
+        assert "k" not in flights
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_load(self) -> None:
+        flights: SingleFlight[str] = SingleFlight()
+
+        async def loader() -> str:
+            await asyncio.sleep(0.05)
+            return "value"
+
+        result, _ = flights.join("k", loader)
+        cancelled = asyncio.ensure_future(result)
+        other, joined = flights.join("k", loader)
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+
+        assert joined
+        assert await other == "value"
+
+    @pytest.mark.asyncio
+    async def test_errors_go_to_every_caller(self) -> None:
+        flights: SingleFlight[str] = SingleFlight()
+        errors: list[BaseException] = []
+
+        async def failing() -> str:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        first, _ = flights.join("k", failing)
+        second, _ = flights.join("k", failing)
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+        # A background load reports its failure instead
+        await asyncio.gather(
+            flights.start("k", failing, on_error=errors.append),
+            return_exceptions=True,
+        )
+        await asyncio.sleep(0)
+        assert [str(e) for e in errors] == ["boom"]
+        assert len(flights) == 0
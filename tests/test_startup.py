@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_server_import_is_lazy(tmp_path: Path) -> None:
+    # A fresh interpreter with an empty home directory
+    code = (
+        "import sys, mcp_server_mql5.server; "
+        "print(' '.join(m for m in ('aiohttp', 'bs4') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+        env=dict(os.environ, HOME=str(tmp_path), PYTHONPATH=str(ROOT)),
+    )
+
+    # Slow dependencies are imported on first use, and no log file is opened
+    assert result.stdout.split() == []
+    assert not (tmp_path / ".mcp_server_mql5" / "logs").exists()
+
+
+def test_lazy_singleton() -> None:
+    from mcp_server_mql5.core.utils import Lazy
+
+    created = []
+
+    class Thing:
+        value = 1
+
+        def get(self, key: str) -> str:
+            return f"got {key}"
+
+    def factory() -> Thing:
+        created.append(True)
+        return Thing()
+
+    thing = Lazy(factory)
+    assert not thing.created
+    assert thing.value == 1
+    thing.value = 2
+    assert thing.value == 2
+    # Methods of the object are not shadowed by the stand-in
+    assert thing.get("url") == "got url"
+    assert thing.created and created == [True]
@@ -0,0 +1,104 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.search import MQL5Searcher
+from mcp_server_mql5.core.symbols import (
+    SymbolIndex,
+    SymbolIndexBuilder,
+    normalize_symbol,
+)
+from mcp_server_mql5.indexer import build_from_dump
+
+FIXTURES = Path(__file__).parent / "fixtures" / "docs"
+DOCS = "https://www.mql5.com/en/docs"
+
+
+@pytest.fixture(scope="module")
+def symbol_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    builder = SymbolIndexBuilder()
+    build_from_dump(FIXTURES, builder)
+    path = tmp_path_factory.mktemp("symbols") / "symbols.bin"
+    builder.save(path)
+    return path
+
+
+class TestSymbolIndex:
+    def test_normalize_symbol(self) -> None:
+        assert normalize_symbol(" OrderSend() ") == "ordersend"
+        assert normalize_symbol("ENUM_TIMEFRAMES") == "enum_timeframes"
+
+    @pytest.mark.parametrize(
+        ("term", "kind", "url"),
+        [
+            ("OrderSend", "function", "trading/ordersend"),
+            ("ordersend()", "function", "trading/ordersend"),
+            ("iMA", "function", "indicators/ima"),
+            ("MqlTradeRequest", "struct", "constants/structures/mqltraderequest"),
+            ("ENUM_TIMEFRAMES", "enum", "constants/chartconstants/enum_timeframes"),
+            ("PERIOD_H1", "constant", "constants/chartconstants/enum_timeframes"),
+            (
+                "TRADE_ACTION_DEAL",
+                "constant",
+                "constants/tradingconstants/enum_trade_request_actions",
+            ),
+            ("OnTick", "heading", "basis/function/events"),
+        ],
+    )
+    def test_lookup(self, symbol_path: Path, term: str, kind: str, url: str) -> None:
+        entry = SymbolIndex(symbol_path).lookup(term)
+        assert entry is not None
+        assert entry.kind == kind
+        assert entry.url == f"{DOCS}/{url}"
+
+    def test_unknown_symbols_miss(self, symbol_path: Path) -> None:
+        index = SymbolIndex(symbol_path)
+        assert index.lookup("Parameters") is None
+        assert index.lookup("how to open a position") is None
+
+        assert index.lookup("OrderSend") is not None
+        stats = index.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2
+        assert stats["symbols"] == len(index)
+
+    def test_missing_file_yields_no_hits(self, tmp_path: Path) -> None:
+        index = SymbolIndex(tmp_path / "missing.bin")
+        assert index.lookup("OrderSend") is None
+        assert len(index) == 0
+
+    def test_invalid_file_yields_no_hits(self, tmp_path: Path) -> None:
+        path = tmp_path / "bad.bin"
+        path.write_bytes(b"not a symbol index")
+        assert SymbolIndex(path).lookup("OrderSend") is None
+
+    def test_absolute_urls_and_reopen(self, tmp_path: Path) -> None:
+        builder = SymbolIndexBuilder()
+        builder.add_page(
+            "https://example.com/ordercheck",
+            "<div class='doc-content'><h1>OrderCheck</h1></div>",
+        )
+        path = tmp_path / "symbols.bin"
+        builder.save(path)
+
+        index = SymbolIndex(path)
+        entry = index.lookup("OrderCheck")
+        assert entry is not None and entry.url == "https://example.com/ordercheck"
+
+        index.close()
+        assert index.lookup("ordercheck") is not None
+
+    def test_lookup_is_fast(self, symbol_path: Path) -> None:
+        index = SymbolIndex(symbol_path)
+        index.lookup("OrderSend")  # Map the file
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            index.lookup("TRADE_ACTION_DEAL")
+        assert (time.perf_counter() - start) / 1000 < 0.0001
+
+    def test_searcher_exact_symbol(self, symbol_path: Path) -> None:
+        searcher = MQL5Searcher(symbol_index=SymbolIndex(symbol_path))
+        assert searcher.find_exact_symbol("OrderSend") == f"{DOCS}/trading/ordersend"
+        assert searcher.find_exact_symbol("send an order") is None
+        assert MQL5Searcher().find_exact_symbol("OrderSend") is None
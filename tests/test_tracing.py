@@ -0,0 +1,115 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from mcp_server_mql5.core.executor import WorkerPool
+from mcp_server_mql5.core.tracing import Tracer, current_span
+
+
+def by_name(tracer: Tracer) -> dict:
+    return {span.name: span for span in tracer.spans()}
+
+
+class TestTracer:
+    def test_spans_are_nested(self) -> None:
+        tracer = Tracer()
+        with tracer.span("root", term="a") as root:
+            with tracer.span("child") as child:
+                assert current_span() is child
+                child.set(bytes=10)
+            assert current_span() is root
+        assert current_span() is None
+
+        spans = by_name(tracer)
+        assert [s.name for s in tracer.spans()] == ["child", "root"]
+        assert spans["root"].parent_id is None
+        assert spans["child"].parent_id == spans["root"].span_id
+        assert spans["child"].trace_id == spans["root"].trace_id
+        assert spans["child"].attributes == {"bytes": 10}
+        assert spans["root"].end_ns >= spans["child"].end_ns
+
+    def test_error_is_recorded(self) -> None:
+        tracer = Tracer()
+        with pytest.raises(ValueError), tracer.span("failing"):
+            raise ValueError("boom")
+        assert tracer.spans()[0].error == "ValueError"
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        tracer = Tracer(enabled=False)
+        with tracer.span("root") as root:
+            root.set(size=1)
+            assert tracer.record("event", 0, 1) is None
+        assert tracer.spans() == []
+
+    def test_buffer_is_bounded(self) -> None:
+        tracer = Tracer(max_spans=2)
+        for name in ("a", "b", "c"):
+            with tracer.span(name):
+                pass
+        assert [s.name for s in tracer.spans()] == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_context_follows_tasks_and_threads(self) -> None:
+        tracer = Tracer()
+        pool = WorkerPool(kind="thread", max_workers=2)
+
+        def work() -> None:
+            with tracer.span("in_thread"):
+                time.sleep(0.001)
+
+        async def task() -> None:
+            with tracer.span("in_task"):
+                await asyncio.sleep(0)
+
+        try:
+            with tracer.span("root"):
+                await asyncio.gather(task(), pool.run(work))
+        finally:
+            pool.close()
+
+        spans = by_name(tracer)
+        root_id = spans["root"].span_id
+        assert spans["in_task"].parent_id == root_id
+        assert spans["in_thread"].parent_id == root_id
+
+
+class TestExport:
+    @pytest.fixture
+    def tracer(self) -> Tracer:
+        tracer = Tracer()
+        with tracer.span("root", url="https://x"):
+            tracer.record("http.dns", 1_000, 3_000, host="x")
+        return tracer
+
+    def test_chrome_trace(self, tracer: Tracer, tmp_path: Path) -> None:
+        path = tmp_path / "out" / "trace.json"
+        assert tracer.export(path, "chrome") == 2
+
+        events = json.loads(path.read_text())["traceEvents"]
+        dns, root = events  # Sorted by start time
+        assert dns["name"] == "http.dns"
+        assert dns["ph"] == "X"
+        assert dns["ts"] == 1.0 and dns["dur"] == 2.0
+        assert dns["tid"] == root["tid"]
+        assert dns["args"]["parent_id"] == root["args"]["span_id"]
+        assert root["args"]["url"] == "https://x"
+
+    def test_otlp_trace(self, tracer: Tracer, tmp_path: Path) -> None:
+        path = tmp_path / "trace.json"
+        tracer.export(path, "otlp")
+
+        data = json.loads(path.read_text())
+        spans = data["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        dns, root = spans
+        assert len(root["traceId"]) == 32 and len(root["spanId"]) == 16
+        assert root["parentSpanId"] == ""
+        assert dns["parentSpanId"] == root["spanId"]
+        assert dns["startTimeUnixNano"] == "1000"
+        assert dns["attributes"] == [{"key": "host", "value": {"stringValue": "x"}}]
+
+    def test_unknown_format(self, tracer: Tracer, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            tracer.export(tmp_path / "trace.json", "zipkin")
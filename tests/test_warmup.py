@@ -0,0 +1,93 @@
+import asyncio
+import json
+from pathlib import Path
+
+from mcp_server_mql5.core.warmup import (
+    CacheWarmer,
+    hot_terms_from_logs,
+    load_terms_file,
+)
+
+
+def write_log(path: Path, terms: list[str], operation: str = "full_search") -> None:
+    lines = [json.dumps({"operation": operation, "search_term": t}) for t in terms]
+    path.write_text("\n".join(lines + ["not json"]) + "\n", encoding="utf-8")
+
+
+class TestTermSources:
+    def test_load_terms_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "terms.txt"
+        path.write_text("# comment\nOrderSend\n\n  iMA  \n", encoding="utf-8")
+
+        assert load_terms_file(path) == ["OrderSend", "iMA"]
+        assert load_terms_file(tmp_path / "missing.txt") == []
+
+    def test_hot_terms_from_logs(self, tmp_path: Path) -> None:
+        write_log(tmp_path / "mcp_server.json.log.1", ["ordersend", "iMA"])
+        write_log(tmp_path / "mcp_server.json.log", ["OrderSend", "OrderSend "])
+        write_log(tmp_path / "other.json.log", ["iMA"] * 5, operation="batch_search")
+
+        # Most searched first, in the most recent spelling
+        assert hot_terms_from_logs(tmp_path, 10, "full_search") == ["OrderSend", "iMA"]
+        assert hot_terms_from_logs(tmp_path, 1, "full_search") == ["OrderSend"]
+
+
+class TestCacheWarmer:
+    async def test_warms_each_term(self) -> None:
+        cached = {"iMA"}
+
+        async def warm(term: str) -> bool:
+            if term == "bad":
+                raise ValueError("boom")
+            return term in cached
+
+        warmer = CacheWarmer(
+            warm=warm,
+            terms=lambda: ["OrderSend", "iMA", "bad"],
+            is_idle=lambda: True,
+            start_delay=0,
+        )
+        await warmer.run()
+
+        stats = warmer.stats()
+        assert stats["rounds"] == 1
+        assert stats["warmed"] == 1
+        assert stats["already_cached"] == 1
+        assert stats["failed"] == 1
+
+    async def test_waits_for_idle(self) -> None:
+        busy = [True, True, False]
+        warmed: list[str] = []
+
+        async def warm(term: str) -> bool:
+            warmed.append(term)
+            return False
+
+        warmer = CacheWarmer(
+            warm=warm,
+            terms=lambda: ["OrderSend"],
+            is_idle=lambda: not busy.pop(0),
+            start_delay=0,
+            poll_interval=0.01,
+        )
+        await warmer.run_once()
+
+        assert warmed == ["OrderSend"]
+        assert warmer.idle_waits == 2
+
+    async def test_scheduled_rounds_until_cancelled(self) -> None:
+        async def warm(term: str) -> bool:
+            return True
+
+        warmer = CacheWarmer(
+            warm=warm,
+            terms=lambda: ["OrderSend"],
+            is_idle=lambda: True,
+            interval=0.01,
+            start_delay=0,
+        )
+        task = asyncio.create_task(warmer.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        assert warmer.rounds > 1
@@ -1,11 +1,93 @@
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
 import pytest
+from aiohttp import web
 
+from mcp_server_mql5.core.http_cache import HTTPCache
+from mcp_server_mql5.core.resilience import CircuitBreaker, CircuitOpenError
+from mcp_server_mql5.core.tracing import tracer
+from mcp_server_mql5.core.utils import RateLimiter
 from mcp_server_mql5.core.web_client import WebClient
 
 
+def mock_session(method: str, status: int, text: str = "") -> MagicMock:
+    """Builds a session mock whose `method` returns a response context manager."""
+    mock_response = AsyncMock()
+    mock_response.status = status
+    mock_response.text.return_value = text
+
+    # Setup the context manager returned by session.get()/post()
+    # when we do: async with session.get(...) as response
+    mock_ctx = MagicMock()
+    mock_ctx.__aenter__.return_value = mock_response
+    mock_ctx.__aexit__.return_value = None
+
+    session = MagicMock()
+    getattr(session, method).return_value = mock_ctx
+    return session
+
+
+@pytest.fixture
+async def local_server() -> AsyncGenerator[str, None]:
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(text=f"hello {request.query.get('q', '')}")
+
+    async def etag_handler(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(
+            text="doc page", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}
+        )
+
+    async def large_handler(request: web.Request) -> web.Response:
+        return web.Response(text="x" * 1_000_000)
+
+    calls = {"flaky": 0, "slow_once": 0}
+
+    async def flaky_handler(request: web.Request) -> web.Response:
+        # Fails twice, then succeeds
+        calls["flaky"] += 1
+        if calls["flaky"] <= 2:
+            return web.Response(status=503)
+        return web.Response(text="recovered")
+
+    async def slow_once_handler(request: web.Request) -> web.Response:
+        # The first request hangs, later ones answer at once
+        calls["slow_once"] += 1
+        if calls["slow_once"] == 1:
+            await asyncio.sleep(0.6)
+        return web.Response(text=f"answer {calls['slow_once']}")
+
+    async def down_handler(request: web.Request) -> web.Response:
+        return web.Response(status=500)
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    app.router.add_get("/doc", etag_handler)
+    app.router.add_get("/large", large_handler)
+    app.router.add_get("/flaky", flaky_handler)
+    app.router.add_get("/slow_once", slow_once_handler)
+    app.router.add_get("/down", down_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    yield f"http://127.0.0.1:{port}/"
+    await runner.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff() -> Generator[None, None, None]:
+    with patch("mcp_server_mql5.core.web_client.HTTP_RETRY_BACKOFF", 0.01):
+        yield
+
+
 @pytest.mark.asyncio
 class TestWebClient:
     @pytest.fixture
@@ -13,66 +95,250 @@ class TestWebClient:
         return WebClient()
 
     async def test_get_success(self, client: Any) -> None:
-        # Setup the mock response object
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.text.return_value = "content"
-
-        # Setup the context manager returned by session.get()
-        # when we do: async with session.get(...) as response
-        mock_get_ctx = MagicMock()
-        mock_get_ctx.__aenter__.return_value = mock_response
-        mock_get_ctx.__aexit__.return_value = None
-
-        # Setup the session object
-        mock_session = MagicMock()
-        mock_session.get.return_value = mock_get_ctx
-
-        # Setup the context manager returned by aiohttp.ClientSession()
-        # when we do: async with aiohttp.ClientSession() as session
-        mock_session_ctx = MagicMock()
-        mock_session_ctx.__aenter__.return_value = mock_session
-        mock_session_ctx.__aexit__.return_value = None
-
-        with patch("aiohttp.ClientSession", return_value=mock_session_ctx):
+        session = mock_session("get", 200, "content")
+        with patch.object(client, "_get_session", return_value=session):
             result = await client.get("http://test.com")
             assert result == "content"
 
     async def test_get_failure(self, client: Any) -> None:
-        mock_response = AsyncMock()
-        mock_response.status = 404
+        session = mock_session("get", 404)
+        with patch.object(client, "_get_session", return_value=session):
+            result = await client.get("http://test.com")
+            assert result is None
 
-        mock_get_ctx = MagicMock()
-        mock_get_ctx.__aenter__.return_value = mock_response
-        mock_get_ctx.__aexit__.return_value = None
+    async def test_post_success(self, client: Any) -> None:
+        session = mock_session("post", 200, "posted")
+        with patch.object(client, "_get_session", return_value=session):
+            result = await client.post("http://test.com", data={})
+            assert result == "posted"
 
-        mock_session = MagicMock()
-        mock_session.get.return_value = mock_get_ctx
+    async def test_get_consults_rate_limiter(self) -> None:
+        limiter = RateLimiter()
+        limiter.wait_if_needed = AsyncMock(return_value=0.0)  # type: ignore
+        client = WebClient(rate_limiter=limiter)
 
-        mock_session_ctx = MagicMock()
-        mock_session_ctx.__aenter__.return_value = mock_session
-        mock_session_ctx.__aexit__.return_value = None
+        session = mock_session("get", 200, "content")
+        with patch.object(client, "_get_session", return_value=session):
+            await client.get("https://www.mql5.com/en/docs")
 
-        with patch("aiohttp.ClientSession", return_value=mock_session_ctx):
-            result = await client.get("http://test.com")
-            assert result is None
+        limiter.wait_if_needed.assert_awaited_once_with("www.mql5.com")
 
-    async def test_post_success(self, client: Any) -> None:
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.text.return_value = "posted"
+    async def test_session_is_reused(self, client: Any, local_server: str) -> None:
+        try:
+            assert await client.get(local_server, params={"q": "a"}) == "hello a"
+            session = client._session
+            assert await client.get(local_server, params={"q": "b"}) == "hello b"
 
-        mock_post_ctx = MagicMock()
-        mock_post_ctx.__aenter__.return_value = mock_response
-        mock_post_ctx.__aexit__.return_value = None
+            assert client._session is session
+            assert client.stats() == {
+                "new_connections": 1,
+                "reused_connections": 1,
+                "bytes_read": 0,
+                "partial_reads": 0,
+                "retried": 0,
+                "hedged": 0,
+                "hedge_wins": 0,
+                "stale_served": 0,
+                "fetches": 2,
+                "coalesced": 0,
+            }
+        finally:
+            await client.close()
 
-        mock_session = MagicMock()
-        mock_session.post.return_value = mock_post_ctx
+        assert client._session is None
+        assert session.closed
 
-        mock_session_ctx = MagicMock()
-        mock_session_ctx.__aenter__.return_value = mock_session
-        mock_session_ctx.__aexit__.return_value = None
+    async def test_get_uses_disk_cache(self, local_server: str, tmp_path: Path) -> None:
+        http_cache = HTTPCache(tmp_path / "cache.sqlite3")
+        client = WebClient(http_cache=http_cache)
+        try:
+            first = await client.get(local_server, params={"q": "a"})
+            # Fresh entry: served from disk, no request sent
+            with patch.object(client, "_get_session") as get_session:
+                assert await client.get(local_server, params={"q": "a"}) == first
+                get_session.assert_not_called()
+        finally:
+            await client.close()
 
-        with patch("aiohttp.ClientSession", return_value=mock_session_ctx):
-            result = await client.post("http://test.com", data={})
-            assert result == "posted"
+    async def test_get_revalidates_with_etag(
+        self, local_server: str, tmp_path: Path
+    ) -> None:
+        http_cache = HTTPCache(tmp_path / "cache.sqlite3")
+        client = WebClient(http_cache=http_cache)
+        try:
+            assert await client.get(f"{local_server}doc") == "doc page"
+            # no-cache: the second call sends If-None-Match and gets a 304
+            assert await client.get(f"{local_server}doc") == "doc page"
+            assert http_cache.revalidations == 1
+        finally:
+            await client.close()
+
+    async def test_get_bytes(self, local_server: str, tmp_path: Path) -> None:
+        http_cache = HTTPCache(tmp_path / "cache.sqlite3")
+        client = WebClient(http_cache=http_cache, retries=0)
+        try:
+            assert await client.get_bytes(local_server, params={"q": "é"}) == (
+                "hello é".encode()
+            )
+            # Stored as text: readable by both methods
+            with patch.object(client, "_get_session") as get_session:
+                assert await client.get(local_server, params={"q": "é"}) == "hello é"
+                assert await client.get_bytes(local_server, params={"q": "é"}) == (
+                    "hello é".encode()
+                )
+                get_session.assert_not_called()
+            assert await client.get_bytes(f"{local_server}down") is None
+        finally:
+            await client.close()
+
+    async def test_concurrent_gets_are_coalesced(self, local_server: str) -> None:
+        client = WebClient(retries=0)
+        url = f"{local_server}slow_once"
+        try:
+            # A waiter that gives up does not cancel the shared request
+            cancelled = asyncio.ensure_future(client.get(url))
+            results = asyncio.gather(*(client.get(url) for _ in range(4)))
+            await asyncio.sleep(0.05)
+            cancelled.cancel()
+
+            assert await results == ["answer 1"] * 4
+            # Other parameters, raw bodies and later calls are fetched again
+            assert await client.get(url, params={"q": "a"}) == "answer 2"
+            assert await client.get_bytes(url) == b"answer 3"
+            assert await client.get(url) == "answer 4"
+        finally:
+            await client.close()
+
+        assert client.fetches == 4
+        assert client.coalesced == 4
+        assert len(client._flights) == 0
+
+    async def test_coalesced_gets_share_failures(self, local_server: str) -> None:
+        client = WebClient(retries=0)
+        try:
+            results = await asyncio.gather(
+                *(client.get(f"{local_server}down") for _ in range(3))
+            )
+        finally:
+            await client.close()
+
+        assert results == [None] * 3
+        assert (client.fetches, client.coalesced) == (1, 2)
+
+    async def test_get_records_spans(self, client: Any, local_server: str) -> None:
+        tracer.clear()
+        try:
+            assert await client.get(local_server, params={"q": "a"}) == "hello a"
+        finally:
+            await client.close()
+
+        spans = {span.name: span for span in tracer.spans()}
+        get, request = spans["http.get"], spans["http.request"]
+        assert request.parent_id == get.span_id
+        assert spans["http.connect"].parent_id == request.span_id
+        assert request.attributes == {"status": 200, "body_bytes": len("hello a")}
+        assert get.attributes["cache"] == "miss"
+
+    async def test_get_partial_stops_early(
+        self, client: Any, local_server: str
+    ) -> None:
+        chunks: list[str] = []
+
+        async def feed(text: str) -> bool:
+            chunks.append(text)
+            return True
+
+        try:
+            read = await client.get_partial(f"{local_server}large", feed)
+        finally:
+            await client.close()
+
+        assert len(chunks) == 1
+        assert read is not None and 0 < read < 1_000_000
+        assert client.stats()["partial_reads"] == 1
+
+    async def test_get_partial_reads_to_end_and_caches(
+        self, local_server: str, tmp_path: Path
+    ) -> None:
+        http_cache = HTTPCache(tmp_path / "cache.sqlite3")
+        client = WebClient(http_cache=http_cache)
+        chunks: list[str] = []
+
+        async def feed(text: str) -> bool:
+            chunks.append(text)
+            return False
+
+        try:
+            assert await client.get_partial(local_server, feed) == len("hello ")
+            assert "".join(chunks) == "hello "
+            # Stored complete: the next read is served from disk
+            chunks.clear()
+            assert await client.get_partial(local_server, feed) == 0
+            assert chunks == ["hello "]
+        finally:
+            await client.close()
+
+
+@pytest.mark.asyncio
+class TestFailureHandling:
+    async def test_retries_until_success(self, local_server: str) -> None:
+        client = WebClient(retries=2)
+        try:
+            assert await client.get(f"{local_server}flaky") == "recovered"
+        finally:
+            await client.close()
+        assert client.retried == 2
+
+    async def test_gives_up_after_retries(self, local_server: str) -> None:
+        client = WebClient(retries=1)
+        try:
+            assert await client.get(f"{local_server}down") is None
+        finally:
+            await client.close()
+        assert client.retried == 1
+
+    async def test_read_timeout_is_retried(self, local_server: str) -> None:
+        client = WebClient(retries=1)
+        client.timeout = aiohttp.ClientTimeout(total=0.2)
+        try:
+            assert await client.get(f"{local_server}slow_once") == "answer 2"
+        finally:
+            await client.close()
+        assert client.retried == 1
+
+    async def test_hedged_request_wins(self, local_server: str) -> None:
+        client = WebClient(retries=0, hedge_delay=0.05)
+        try:
+            start = asyncio.get_running_loop().time()
+            assert await client.get(f"{local_server}slow_once") == "answer 2"
+            assert asyncio.get_running_loop().time() - start < 0.5
+        finally:
+            await client.close()
+        assert client.hedged == 1
+        assert client.hedge_wins == 1
+
+    async def test_breaker_opens_and_serves_stale(
+        self, local_server: str, tmp_path: Path
+    ) -> None:
+        http_cache = HTTPCache(tmp_path / "cache.sqlite3", default_ttl=0)
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client = WebClient(http_cache=http_cache, breaker=breaker, retries=1)
+        try:
+            # Cache a page, then make its host fail
+            assert await client.get(f"{local_server}?q=a") == "hello a"
+            with patch.object(client, "_get_session") as get_session:
+                get_session.side_effect = aiohttp.ClientConnectionError("down")
+
+                # Retries exhausted: the stale copy is served
+                assert await client.get(f"{local_server}?q=a") == "hello a"
+                assert breaker.state("127.0.0.1") == "open"
+
+                # Open circuit: no request at all
+                get_session.reset_mock()
+                assert await client.get(f"{local_server}?q=a") == "hello a"
+                get_session.assert_not_called()
+                with pytest.raises(CircuitOpenError):
+                    await client.get(f"{local_server}?q=b")
+        finally:
+            await client.close()
+        assert client.stale_served == 2